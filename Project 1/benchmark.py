@@ -0,0 +1,95 @@
+from search.algorithms import State
+import getopt
+import time
+import search.algorithms as algorithms
+from search.algorithms import dijkstra
+from search.algorithms import bi_bs
+from search.heap import BucketQueue
+from search.heap import IndexedHeap
+from search.map import Map
+import sys
+
+class CountingHeap(IndexedHeap):
+    """
+    IndexedHeap that remembers every instance created, so that the benchmark can sum the heap
+    operations performed by a search after it returns.
+    """
+    instances = []
+
+    def __init__(self, lazy=False):
+        IndexedHeap.__init__(self, lazy)
+        CountingHeap.instances.append(self)
+
+class CountingBucketQueue(BucketQueue):
+    """
+    BucketQueue that is remembered with the instances of CountingHeap; its sifts are the empty buckets
+    scanned.
+    """
+    def __init__(self, resolution=0.5):
+        BucketQueue.__init__(self, resolution)
+        CountingHeap.instances.append(self)
+
+def heap_operations():
+    """
+    Returns the number of pushes, pops, decrease-keys, and sifts performed by the heaps created since
+    the last call, and forgets these heaps.
+    """
+    ops = [0, 0, 0, 0]
+    for heap in CountingHeap.instances:
+        ops[0] += heap.pushes
+        ops[1] += heap.pops
+        ops[2] += heap.decreases
+        ops[3] += heap.sifts
+    CountingHeap.instances = []
+    return ops
+
+def main():
+    """
+    Benchmarks Dijkstra's and Bi-BS on the test instances, reporting the wall time and the number of heap
+    operations of each algorithm. Run it with --lazy to use the lazy-deletion mode of the OPEN list, or with
+    --buckets to use a search.heap.BucketQueue.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['lazy', 'buckets', 'help'])
+
+    lazy = False
+    buckets = False
+    for o, _ in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Benchmark the test instances: benchmark.py")
+            print("Benchmark the test instances with a lazy-deletion OPEN list: benchmark.py --lazy")
+            print("Benchmark the test instances with a bucket queue as the OPEN list: benchmark.py --buckets")
+            exit()
+        elif o in ("--lazy"):
+            lazy = True
+        elif o == "--buckets":
+            buckets = True
+    test_instances = "test-instances/testinstances.txt"
+    gridded_map = Map("dao-map/brc000d.map")
+    algorithms.IndexedHeap = CountingHeap
+    algorithms.BucketQueue = CountingBucketQueue
+
+    instances = []
+    file = open(test_instances, "r")
+    for instance_string in file:
+        list_instance = instance_string.split(",")
+        instances.append((int(list_instance[0]), int(list_instance[1]), int(list_instance[2]), int(list_instance[3])))
+    file.close()
+
+    print("%-12s %10s %10s %10s %10s %10s %10s" % ("algorithm", "time (s)", "expanded", "pushes", "pops", "decreases", "sifts"))
+    for name, search in (("Dijkstra", dijkstra), ("Bi-BS", bi_bs)):
+        total_time = 0
+        total_expanded = 0
+        total_ops = [0, 0, 0, 0]
+        for x_start, y_start, x_goal, y_goal in instances:
+            start = State(x_start, y_start)
+            goal = State(x_goal, y_goal)
+            begin = time.perf_counter()
+            _, expanded = search(start, goal, gridded_map, lazy, buckets=buckets)
+            total_time += time.perf_counter() - begin
+            total_expanded += expanded
+            total_ops = [a + b for a, b in zip(total_ops, heap_operations())]
+        print("%-12s %10.2f %10d %10d %10d %10d %10d" % (name, total_time, total_expanded, *total_ops))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import getopt
+import os
+import random
+import time
+import numpy as np
+from search.algorithms import State
+from search.algorithms import bi_bs
+from search.algorithms import bi_bs_ch
+from search.ch import build_hierarchy
+from search.ch import load_hierarchy
+from search.map import Map
+from search.roads import RoadGraph
+from road_benchmark import write_synthetic_network
+import sys
+
+def write_synthetic_map(file_name, size, seed, block=16):
+    """
+    Writes a size x size map in the movingai.org format, block lines at a time. Every block x block square
+    of the map has a rectangular obstacle of random size that leaves at least 2 cells free on each side, so
+    every traversable cell is reachable from every other one.
+    """
+    random_generator = np.random.default_rng(seed)
+    blocks = -(-size // block)
+    with open(file_name, "w") as map_file:
+        map_file.write("type octile\nheight %d\nwidth %d\nmap\n" % (size, size))
+        for block_y in range(blocks):
+            x0, y0 = random_generator.integers(2, block // 2, (2, blocks))
+            x1 = x0 + random_generator.integers(0, block - 2 - x0)
+            y1 = y0 + random_generator.integers(0, block - 2 - y0)
+            rows = min(block, size - block_y * block)
+            row = np.arange(rows)[:, None]
+            column = np.arange(blocks * block)[None, :] % block
+            obstacle = (row >= np.repeat(y0, block)) & (row < np.repeat(y1, block)) & \
+                       (column >= np.repeat(x0, block)) & (column < np.repeat(x1, block))
+            chars = np.where(obstacle[:, :size], ord('T'), ord('.')).astype(np.uint8)
+            chars = np.concatenate([chars, np.full((rows, 1), ord('\n'), dtype=np.uint8)], axis=1)
+            map_file.write(chars.tobytes().decode())
+
+def main():
+    """
+    Builds the contraction hierarchy of a map, of a synthetic map (--size), or of a road network (see
+    search.ch), or loads it if it was built before, reporting the preprocessing time, the shortcuts added, and the size of the hierarchy file.
+    Then solves the same problems with Bi-BS on the graph and with the hierarchy queries of Bi-BS-CH,
+    reporting the time and the nodes expanded of each, and checking that the costs agree (and, for the test
+    instances of the map, that they are the expected ones). Run it with --help to see the options available.
+
+    Grid maps are a hard case for contraction hierarchies: open areas have many shortest paths of the same
+    cost, so contracting a cell adds many shortcuts and the hierarchy gets dense. On generated maps the
+    queries expand 3-10 times fewer nodes than Bi-BS but run only 2.5-5 times faster, not orders of
+    magnitude, and the build time grows faster than the number of cells (it is done in pure Python, with one
+    witness search per arc entering every contracted node).
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'size=', 'graph=', 'coordinates=', 'rows=', 'hierarchy=',
+                                                   'queries=', 'max-settled=', 'simulate-settled=', 'rebuild', 'folder=', 'seed=', 'keep'])
+
+    map_file = "dao-map/brc000d.map"
+    size = None
+    graph_file = None
+    coordinates_file = None
+    rows = None
+    hierarchy_file = None
+    queries = 100
+    max_settled = 500
+    simulate_settled = 5
+    rebuild = False
+    folder = "."
+    seed = 0
+    keep = False
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Build the hierarchy of dao-map/brc000d.map and solve the test instances: ch_benchmark.py")
+            print("Use another map and 200 random problems: ch_benchmark.py --map dao-map/other.map --queries 200")
+            print("Run on a synthetic map of 128 x 128 cells: ch_benchmark.py --size 128")
+            print("Run on a DIMACS road network: ch_benchmark.py --graph USA-road-d.NY.gr --coordinates USA-road-d.NY.co")
+            print("Run on a synthetic network of 300 x 300 intersections: ch_benchmark.py --rows 300")
+            print("Store the hierarchy in another file and build it again: ch_benchmark.py --hierarchy /tmp/brc000d.ch --rebuild")
+            print("Stop the witness searches after 100 nodes: ch_benchmark.py --max-settled 100 --rebuild")
+            print("Estimate the priorities with witness searches of 20 nodes: ch_benchmark.py --simulate-settled 20 --rebuild")
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--size":
+            size = int(a)
+        elif o == "--graph":
+            graph_file = a
+        elif o == "--coordinates":
+            coordinates_file = a
+        elif o == "--rows":
+            rows = int(a)
+        elif o == "--hierarchy":
+            hierarchy_file = a
+        elif o == "--queries":
+            queries = int(a)
+        elif o == "--max-settled":
+            max_settled = int(a)
+        elif o == "--simulate-settled":
+            simulate_settled = int(a)
+        elif o == "--rebuild":
+            rebuild = True
+        elif o == "--folder":
+            folder = a
+        elif o == "--seed":
+            seed = int(a)
+        elif o == "--keep":
+            keep = True
+
+    synthetic = None
+    if graph_file is None and rows is not None:
+        graph_file = os.path.join(folder, "synthetic-road-%d-%d.gr" % (rows, seed))
+        coordinates_file = graph_file[:-3] + ".co"
+        synthetic = graph_file[:-3]
+        if not os.path.exists(graph_file):
+            write_synthetic_network(graph_file, coordinates_file, rows, seed)
+    elif graph_file is None and size is not None:
+        map_file = os.path.join(folder, "synthetic-%d-%d.map" % (size, seed))
+        synthetic = map_file
+        if not os.path.exists(map_file):
+            write_synthetic_map(map_file, size, seed)
+    if graph_file is not None:
+        graph = RoadGraph(graph_file, coordinates_file)
+        print("%d nodes, %d arcs" % (graph.nodes, graph.arcs))
+    else:
+        graph = Map(map_file)
+    if hierarchy_file is None:
+        hierarchy_file = (graph_file or map_file) + ".ch"
+
+    if rebuild or not os.path.exists(hierarchy_file):
+        begin = time.perf_counter()
+        hierarchy = build_hierarchy(graph, max_settled, lambda contracted, nodes, shortcuts, seconds:
+                                    print("%d of %d nodes contracted, %d shortcuts, %.0f s" % (contracted, nodes, shortcuts, seconds)),
+                                    simulate_settled)
+        print("hierarchy built in %.1f s, %d shortcuts" % (time.perf_counter() - begin, hierarchy.shortcuts))
+        hierarchy.save(hierarchy_file)
+    begin = time.perf_counter()
+    hierarchy = load_hierarchy(hierarchy_file)
+    print("hierarchy loaded in %.3f s: %d upward arcs (%d shortcuts), %.1f MB" % (time.perf_counter() - begin, hierarchy.arcs,
+                                                                                 hierarchy.shortcuts, os.path.getsize(hierarchy_file) / 2 ** 20))
+
+    # (x, y, x_goal, y_goal, expected cost or None)
+    problems = []
+    if graph_file is None and map_file == "dao-map/brc000d.map":
+        file = open("test-instances/testinstances.txt", "r")
+        for instance_string in file:
+            list_instance = instance_string.split(",")
+            problems.append((int(list_instance[0]), int(list_instance[1]), int(list_instance[2]), int(list_instance[3]),
+                             float(list_instance[4])))
+        file.close()
+    else:
+        random.seed(seed)
+        while len(problems) < queries:
+            start = graph.random_state()
+            goal = graph.random_state()
+            problems.append((start.get_x(), start.get_y(), goal.get_x(), goal.get_y(), None))
+
+    costs = {}
+    print("%-10s %10s %12s %10s" % ("algorithm", "time (s)", "expanded", "wrong"))
+    for name, search, searched in (("Bi-BS", bi_bs, graph), ("Bi-BS-CH", bi_bs_ch, hierarchy)):
+        total_time = 0
+        total_expanded = 0
+        wrong = 0
+        for problem, (x, y, x_goal, y_goal, expected) in enumerate(problems):
+            begin = time.perf_counter()
+            cost, expanded = search(State(x, y), State(x_goal, y_goal), searched)
+            total_time += time.perf_counter() - begin
+            total_expanded += expanded
+            if expected is not None and abs(cost - expected) > 1e-6:
+                wrong += 1
+            costs.setdefault(problem, []).append(cost)
+        print("%-10s %10.2f %12d %10d" % (name, total_time, total_expanded, wrong))
+    different = sum(1 for found in costs.values() if abs(found[0] - found[1]) > 1e-6)
+    if different:
+        print("%d problems with different costs" % different)
+
+    if synthetic is not None and not keep:
+        # the map or the network, its caches, and its hierarchy
+        for file_name in os.listdir(folder or "."):
+            if file_name.startswith(os.path.basename(synthetic)):
+                os.remove(os.path.join(folder, file_name))
+
+if __name__ == "__main__":
+    main()
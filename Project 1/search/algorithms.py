@@ -0,0 +1,456 @@
+from search.heap import BucketQueue
+from search.heap import IndexedHeap
+class State:
+    """
+    Class to represent a state on grid-based pathfinding problems. The class contains one static variable:
+    map_width containing the width of the map. Although this is a property of the map and not of the state, 
+    the width is used to compute the hash value of the state, which is used in the closed_hash list. 
+
+    Each state has the values of x, y, g. The attributes are declared in __slots__, so states do not
+    carry a __dict__.
+    """
+    __slots__ = ('_x', '_y', '_g')
+    map_width = 0
+    map_height = 0
+    
+    def __init__(self, x, y):
+        """
+        Constructor - requires the values of x and y of the state. All the other variables are
+        initialized with the value of 0.
+        """
+        self._x = x
+        self._y = y
+        self._g = 0
+        
+    def __repr__(self):
+        """
+        This method is invoked when we call a print instruction with a state. It will print [x, y],
+        where x and y are the coordinates of the state on the map. 
+        """
+        state_str = "[" + str(self._x) + ", " + str(self._y) + "]"
+        return state_str
+    
+    def __lt__(self, other):
+        """
+        Less-than operator; used to sort the nodes in the open_heap list
+        """
+        return self._g < other._g
+    
+    def state_hash(self):
+        """
+        Given a state (x, y), this method returns the value of x * map_width + y. This is a perfect 
+        hash function for the problem (i.e., no two states will have the same hash value). This function
+        is used to implement the closed_hash list of the algorithms. 
+        """
+        return self._y * State.map_width + self._x
+    
+    def __eq__(self, other):
+        """
+        Method that is invoked if we use the operator == for states. It returns True if self and other
+        represent the same state; it returns False otherwise. 
+        """
+        return self._x == other._x and self._y == other._y
+
+    def get_x(self):
+        """
+        Returns the x coordinate of the state
+        """
+        return self._x
+    
+    def get_y(self):
+        """
+        Returns the y coordinate of the state
+        """
+        return self._y
+    
+    def get_g(self):
+        """
+        Returns the g-value of the state
+        """
+        return self._g
+        
+    def set_g(self, cost):
+        """
+        Sets the g-value of the state
+        """
+        self._g = cost
+# for plotting purposes
+d_num = 1
+b_num = 1
+
+# if buckets is True OPEN is a search.heap.BucketQueue instead of an IndexedHeap (O(1) push and pop)
+# On grids a shorter g is rarely found for a node in OPEN (725 times in 526k expansions on a 256x256 map), so
+# the heapq list re-heapified on those rare updates that this code used before was faster than the IndexedHeap
+# (5.9 s against 10.5 s; buckets=True takes 6.7 s). The IndexedHeap is kept because on the road networks of
+# search.roads updates are frequent and heapify is O(n): 15.7 s against 7.0 s on 400 x 400 intersections.
+def dijkstra(s_initial, s_goal, graph, lazy=False, observer=None, buckets=False):
+    global d_num
+    # rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(s_initial, s_goal):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    open_heap = BucketQueue() if buckets else IndexedHeap(lazy)
+    open_heap.push(s_initial.state_hash(), s_initial.get_g(), s_initial)
+
+    closed_hash = {}
+    closed_hash[s_initial.state_hash()] = s_initial
+
+    expanded_diskstra = 0
+
+    while not len(open_heap) == 0:
+        n = open_heap.pop()
+        if n == s_goal:
+            # uncomment the following 2 lines for generating maps in folder plots
+            # graph.plot_map(closed_hash, s_initial, s_goal, 'solution-maps/dijkstra/' + str(d_num))
+            # d_num += 1
+            if observer is not None:
+                observer.terminate(n.get_g(), expanded_diskstra)
+            return n.get_g(), expanded_diskstra
+        expanded_diskstra += 1
+        if observer is not None:
+            observer.expand(n.state_hash(), n.get_g(), 0)
+        # children come from the neighbor masks of the map as (state_hash, action cost) pairs;
+        # a State is only created the first time a child is generated
+        for child_hash, step in graph.neighbors(n.state_hash()):
+            child_g = n.get_g() + step
+            if child_hash not in closed_hash:
+                # adding child in open_heap and closed_hash
+                child = State(child_hash % graph.width, child_hash // graph.width)
+                child.set_g(child_g)
+                open_heap.push(child_hash, child_g, child)
+                closed_hash[child_hash] = child
+                if observer is not None:
+                    observer.generate(child_hash, child_g, 0)
+            elif child_g < closed_hash[child_hash].get_g():
+                # updating closed_hash and open_heap with new g value
+                closed_hash[child_hash].set_g(child_g)
+                # not updating parent because path isn't necessary
+                # decrease-key in open_heap
+                if child_hash in open_heap:
+                    open_heap.decrease_key(child_hash, child_g)
+                if observer is not None:
+                    observer.reopen(child_hash, child_g, 0)
+    # graph.plot_map(closed_hash, s_initial, s_goal, 'solution-maps/dijkstra/' + str(d_num))
+    # d_num += 1
+    if observer is not None:
+        observer.terminate(-1, expanded_diskstra)
+    return -1, expanded_diskstra
+
+# buckets selects the OPEN lists as in dijkstra; dijkstra and bi_bs also run on the weighted graphs of
+# search.roads.RoadGraph, whose nodes are the states (node, 0)
+def bi_bs(s_initial, s_goal, graph, lazy=False, observer=None, buckets=False):
+    global b_num
+    # rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(s_initial, s_goal):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    openA = BucketQueue() if buckets else IndexedHeap(lazy)
+    openB = BucketQueue() if buckets else IndexedHeap(lazy)
+    openA.push(s_initial.state_hash(), s_initial.get_g(), s_initial)
+    openB.push(s_goal.state_hash(), s_goal.get_g(), s_goal)
+
+    closedA = {}
+    closedB = {}
+    closedA[s_initial.state_hash()] = s_initial
+    closedB[s_goal.state_hash()] = s_goal
+
+    cost = 999999999
+    expanded_astar = 0
+
+    while len(openA) != 0 and len(openB) != 0:
+        if cost < openA.top().get_g() + openB.top().get_g():
+            if observer is not None:
+                observer.terminate(cost, expanded_astar)
+            return cost, expanded_astar
+        if  openA.top() < openB.top():
+            n = openA.pop()
+            expanded_astar += 1
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 0)
+            for child_hash, step in graph.neighbors(n.state_hash()):
+                child_g = n.get_g() + step
+                if child_hash in closedB:
+                    if observer is not None and closedB[child_hash].get_g() + child_g < cost:
+                        observer.meet(child_hash, closedB[child_hash].get_g() + child_g)
+                    cost = min(cost, closedB[child_hash].get_g() + child_g)
+                if child_hash in closedA and child_g < closedA[child_hash].get_g():
+                    closedA[child_hash].set_g(child_g)
+                    # parent updation not necessary
+                    if child_hash in openA:
+                        openA.decrease_key(child_hash, child_g)
+                    if observer is not None:
+                        observer.reopen(child_hash, child_g, 0)
+                if child_hash not in closedA:
+                    child = State(child_hash % graph.width, child_hash // graph.width)
+                    child.set_g(child_g)
+                    openA.push(child_hash, child_g, child)
+                    closedA[child_hash] = child
+                    if observer is not None:
+                        observer.generate(child_hash, child_g, 0)
+        else:
+            n = openB.pop()
+            expanded_astar += 1
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 1)
+            # the backward search follows the arcs entering the node, which on a grid are its neighbors
+            for child_hash, step in graph.predecessors(n.state_hash()):
+                child_g = n.get_g() + step
+                if child_hash in closedA:
+                    if observer is not None and closedA[child_hash].get_g() + child_g < cost:
+                        observer.meet(child_hash, closedA[child_hash].get_g() + child_g)
+                    cost = min(cost, closedA[child_hash].get_g() + child_g)
+                if child_hash in closedB and child_g < closedB[child_hash].get_g():
+                    closedB[child_hash].set_g(child_g)
+                    # parent updation not necessary
+                    if child_hash in openB:
+                        openB.decrease_key(child_hash, child_g)
+                    if observer is not None:
+                        observer.reopen(child_hash, child_g, 1)
+                if child_hash not in closedB:
+                    child = State(child_hash % graph.width, child_hash // graph.width)
+                    child.set_g(child_g)
+                    openB.push(child_hash, child_g, child)
+                    closedB[child_hash] = child
+                    if observer is not None:
+                        observer.generate(child_hash, child_g, 1)
+    # graph.plot_map(closedB, s_initial, s_goal, 'solution-maps/bibs/' + str(b_num))
+    # b_num += 1
+    if observer is not None:
+        observer.terminate(-1, expanded_astar)
+    return -1, expanded_astar
+
+
+
+#Creating an code to implement the query of a contraction hierarchy (see search.ch): a bidirectional search like
+#bi_bs, where the forward search only follows the arcs to nodes of higher rank and the backward search only the
+#arcs entering from nodes of higher rank, so both climb the hierarchy and settle few nodes. The searches meet as
+#in bi_bs, but the stopping rule of bi_bs does not hold for them (the best path is found at its node of highest
+#rank, which can be settled after both OPEN lists are above cost / 2): each search stops instead when the top of
+#its OPEN is no better than cost, and the query ends when both have stopped.
+def bi_bs_ch(s_initial, s_goal, hierarchy, lazy=False, observer=None, buckets=False):
+    # rejecting the problems whose start and goal are in different components of the graph
+    if not hierarchy.same_component(s_initial, s_goal):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    openA = BucketQueue() if buckets else IndexedHeap(lazy)
+    openB = BucketQueue() if buckets else IndexedHeap(lazy)
+    openA.push(s_initial.state_hash(), s_initial.get_g(), s_initial)
+    openB.push(s_goal.state_hash(), s_goal.get_g(), s_goal)
+
+    closedA = {}
+    closedB = {}
+    closedA[s_initial.state_hash()] = s_initial
+    closedB[s_goal.state_hash()] = s_goal
+
+    cost = 0 if s_initial == s_goal else 999999999
+    expanded_astar = 0
+
+    while True:
+        # a search whose OPEN is empty or no better than cost has stopped
+        forward = len(openA) != 0 and openA.top().get_g() < cost
+        backward = len(openB) != 0 and openB.top().get_g() < cost
+        if not forward and not backward:
+            break
+        if forward and (not backward or openA.top() < openB.top()):
+            n = openA.pop()
+            expanded_astar += 1
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 0)
+            # upward arcs and shortcuts
+            for child_hash, step in hierarchy.neighbors(n.state_hash()):
+                child_g = n.get_g() + step
+                if child_hash in closedB:
+                    if observer is not None and closedB[child_hash].get_g() + child_g < cost:
+                        observer.meet(child_hash, closedB[child_hash].get_g() + child_g)
+                    cost = min(cost, closedB[child_hash].get_g() + child_g)
+                if child_hash in closedA and child_g < closedA[child_hash].get_g():
+                    closedA[child_hash].set_g(child_g)
+                    # parent updation not necessary
+                    if child_hash in openA:
+                        openA.decrease_key(child_hash, child_g)
+                    if observer is not None:
+                        observer.reopen(child_hash, child_g, 0)
+                if child_hash not in closedA:
+                    child = State(child_hash % hierarchy.width, child_hash // hierarchy.width)
+                    child.set_g(child_g)
+                    openA.push(child_hash, child_g, child)
+                    closedA[child_hash] = child
+                    if observer is not None:
+                        observer.generate(child_hash, child_g, 0)
+        else:
+            n = openB.pop()
+            expanded_astar += 1
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 1)
+            # arcs and shortcuts entering from nodes of higher rank, followed backward
+            for child_hash, step in hierarchy.predecessors(n.state_hash()):
+                child_g = n.get_g() + step
+                if child_hash in closedA:
+                    if observer is not None and closedA[child_hash].get_g() + child_g < cost:
+                        observer.meet(child_hash, closedA[child_hash].get_g() + child_g)
+                    cost = min(cost, closedA[child_hash].get_g() + child_g)
+                if child_hash in closedB and child_g < closedB[child_hash].get_g():
+                    closedB[child_hash].set_g(child_g)
+                    # parent updation not necessary
+                    if child_hash in openB:
+                        openB.decrease_key(child_hash, child_g)
+                    if observer is not None:
+                        observer.reopen(child_hash, child_g, 1)
+                if child_hash not in closedB:
+                    child = State(child_hash % hierarchy.width, child_hash // hierarchy.width)
+                    child.set_g(child_g)
+                    openB.push(child_hash, child_g, child)
+                    closedB[child_hash] = child
+                    if observer is not None:
+                        observer.generate(child_hash, child_g, 1)
+    if cost == 999999999:
+        # no path between start and goal (possible in a directed graph)
+        cost = -1
+    if observer is not None:
+        observer.terminate(cost, expanded_astar)
+    return cost, expanded_astar
+
+#Creating an code to implement Fringe Search -- the f-limited iterations of IDA* but without repeating the work of
+#the previous iterations: the nodes whose f-value is above the limit are kept in a "later" list and become the
+#"now" list of the next iteration. There is no heap (OPEN is two plain lists) and no State objects, only the g-values
+#of the nodes visited, which makes it lighter than A* on huge maps.
+def fringe_search(start_state, goal_state, graph, observer=None):
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    goal = goal_state.state_hash()
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    width = graph.width
+
+    #the octile distance -- the cost of the path if there were no obstacles
+    def func_heuristic(index):
+        X_change = abs(index % width - goal_x)
+        Y_change = abs(index // width - goal_y)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    start = start_state.state_hash()
+    #cache of the g-values of the nodes visited; an entry (index, g) of the lists is stale if cache[index] != g
+    cache = {start: 0}
+    now = [(start, 0)]
+    later = []
+    f_limit = func_heuristic(start)
+    expanded_fringe = 0
+
+    while now:
+        f_min = float('inf')
+        while now:
+            index, g = now.pop()
+            if cache[index] != g:
+                continue
+            f = g + func_heuristic(index)
+            if f > f_limit:
+                #the node waits for the next iteration
+                f_min = min(f_min, f)
+                later.append((index, g))
+                continue
+            if index == goal:
+                if observer is not None:
+                    observer.terminate(g, expanded_fringe)
+                return g, expanded_fringe
+            expanded_fringe += 1
+            if observer is not None:
+                observer.expand(index, g, 0)
+            #children are pushed on top of now, so that they are visited right after their parent
+            for hash_i, step in graph.neighbors(index):
+                g_i = g + step
+                if hash_i in cache and cache[hash_i] <= g_i:
+                    continue
+                if observer is not None:
+                    if hash_i in cache:
+                        observer.reopen(hash_i, g_i, 0)
+                    else:
+                        observer.generate(hash_i, g_i, 0)
+                cache[hash_i] = g_i
+                now.append((hash_i, g_i))
+        f_limit = f_min
+        later.reverse()
+        now, later = later, []
+    if observer is not None:
+        observer.terminate(-1, expanded_fringe)
+    return -1, expanded_fringe
+
+
+#Creating an code to implement IDA* -- a depth-first search bounded by an f-value threshold, repeated with the smallest
+#f-value above the previous threshold until the goal is found. The depth-first search is iterative (the paths can be
+#thousands of steps long) and only keeps the current path in memory, plus a transposition table of at most
+#table_size entries with the smallest g-value with which each node was reached in the current iteration: a node
+#reached again with a g-value that is not smaller is pruned. When the table is full new nodes are not stored, which
+#costs time (duplicate paths are searched again) but never memory or optimality.
+def IDA_star(start_state, goal_state, graph, table_size=1 << 20, observer=None):
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    goal = goal_state.state_hash()
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    width = graph.width
+
+    #the octile distance -- the cost of the path if there were no obstacles
+    def func_heuristic(index):
+        X_change = abs(index % width - goal_x)
+        Y_change = abs(index // width - goal_y)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    start = start_state.state_hash()
+    #the goal is only detected on the children generated, so a problem already solved is answered here
+    if start == goal:
+        if observer is not None:
+            observer.terminate(0, 0)
+        return 0, 0
+    threshold = func_heuristic(start)
+    expanded_ida = 0
+
+    while threshold != float('inf'):
+        table = {start: 0}
+        on_path = {start}
+        next_threshold = float('inf')
+        #every entry of the stack is a node of the current path with its g-value and its children not yet visited
+        stack = [(start, 0, iter(graph.neighbors(start)))]
+        expanded_ida += 1
+        if observer is not None:
+            observer.expand(start, 0, 0)
+        while stack:
+            index, g, children = stack[-1]
+            for hash_i, step in children:
+                g_i = g + step
+                if hash_i in on_path:
+                    continue
+                if hash_i in table and table[hash_i] <= g_i:
+                    continue
+                f_i = g_i + func_heuristic(hash_i)
+                if f_i > threshold:
+                    next_threshold = min(next_threshold, f_i)
+                    continue
+                if hash_i == goal:
+                    if observer is not None:
+                        observer.terminate(g_i, expanded_ida)
+                    return g_i, expanded_ida
+                if hash_i in table or len(table) < table_size:
+                    table[hash_i] = g_i
+                on_path.add(hash_i)
+                stack.append((hash_i, g_i, iter(graph.neighbors(hash_i))))
+                expanded_ida += 1
+                if observer is not None:
+                    observer.expand(hash_i, g_i, 0)
+                break
+            else:
+                #all children visited -- backtracking
+                stack.pop()
+                on_path.discard(index)
+        threshold = next_threshold
+    if observer is not None:
+        observer.terminate(-1, expanded_ida)
+    return -1, expanded_ida
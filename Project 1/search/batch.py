@@ -0,0 +1,110 @@
+import json
+import os
+import resource
+import time
+import tracemalloc
+from multiprocessing import Pool
+from search.algorithms import State
+from search.registry import MapRegistry
+from search.registry import attach_map
+
+# map and algorithms of the current worker process; set once by _init_worker
+_worker_map = None
+_worker_algorithms = None
+_worker_trace_memory = False
+
+def read_instances(file_name):
+    """
+    Reads a file of test instances in the format of test-instances/testinstances.txt (one problem
+    per line: x and y of the start, x and y of the goal, and the optimal solution cost). Returns a list
+    of tuples (x_start, y_start, x_goal, y_goal, cost).
+    """
+    instances = []
+    file = open(file_name, "r")
+    for instance_string in file:
+        if not instance_string.strip():
+            continue
+        list_instance = instance_string.split(",")
+        instances.append((int(list_instance[0]), int(list_instance[1]), int(list_instance[2]),
+                          int(list_instance[3]), float(list_instance[4])))
+    file.close()
+    return instances
+
+def finished_jobs(output_file):
+    """
+    Returns the set of pairs (instance, algorithm) already stored in an output file of run_batch, so
+    that an interrupted run can be resumed. Incomplete lines (e.g., from a killed run) are ignored.
+    """
+    done = set()
+    if not os.path.exists(output_file):
+        return done
+    with open(output_file) as results:
+        for line in results:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            done.add((result["instance"], result["algorithm"]))
+    return done
+
+def _init_worker(map_name, registry_folder, algorithms, trace_memory):
+    """
+    Initializer of the worker processes: the map published by run_batch is attached once per worker, not
+    once per job
+    """
+    global _worker_map, _worker_algorithms, _worker_trace_memory
+    _worker_map = attach_map(map_name, registry_folder)
+    _worker_algorithms = algorithms
+    _worker_trace_memory = trace_memory
+
+def _run_job(job):
+    instance, algorithm, (x_start, y_start, x_goal, y_goal, expected) = job
+    start = State(x_start, y_start)
+    goal = State(x_goal, y_goal)
+    if _worker_trace_memory:
+        tracemalloc.start()
+    begin = time.perf_counter()
+    cost, expanded = _worker_algorithms[algorithm](start, goal, _worker_map)
+    wall_time = time.perf_counter() - begin
+    result = {"instance": instance, "algorithm": algorithm, "start": [x_start, y_start], "goal": [x_goal, y_goal],
+              "cost": cost, "expected": expected, "expanded": expanded, "time": wall_time,
+              "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "pid": os.getpid()}
+    if _worker_trace_memory:
+        result["peak_traced_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return result
+
+def run_batch(map_file, instances, algorithms, output_file, workers=None, trace_memory=False):
+    """
+    Solves every instance with every algorithm on a pool of worker processes (workers=None uses one
+    worker per CPU). map_file is converted once and published with a MapRegistry, which every worker
+    attaches, so all the workers share a single copy of the map. algorithms maps names to module-level functions
+    receiving (start, goal, map) and returning (cost, nodes expanded).
+
+    The results are appended to output_file as JSON lines as soon as they are finished: instance index,
+    algorithm, start, goal, cost, expected cost, nodes expanded, wall time, and the peak resident memory
+    of the worker (ru_maxrss, in KB). If trace_memory is True the peak memory allocated by each job
+    (tracemalloc, which slows the search down) is also stored. Jobs already present in output_file are
+    skipped, so an interrupted run can be resumed by calling run_batch again.
+
+    Returns the number of jobs solved in this call.
+    """
+    done = finished_jobs(output_file)
+    jobs = [(instance, algorithm, instances[instance]) for instance in range(len(instances))
+            for algorithm in algorithms if (instance, algorithm) not in done]
+    if not jobs:
+        return 0
+    registry = MapRegistry()
+    map_name = registry.publish(map_file, "batch-%d-%s" % (os.getpid(), os.path.basename(map_file)))
+    with registry, open(output_file, "a") as results, \
+            Pool(workers, initializer=_init_worker, initargs=(map_name, registry.folder, algorithms, trace_memory)) as pool:
+        # terminating the partial line left by an interrupted run
+        if results.tell() > 0:
+            with open(output_file, "rb") as previous:
+                previous.seek(-1, os.SEEK_END)
+                if previous.read(1) != b"\n":
+                    results.write("\n")
+        for result in pool.imap_unordered(_run_job, jobs):
+            results.write(json.dumps(result) + "\n")
+            results.flush()
+    return len(jobs)
@@ -0,0 +1,289 @@
+import heapq
+import mmap
+import struct
+import time
+import numpy as np
+from search.algorithms import State
+
+# header of a hierarchy file: magic string, width and height of the graph, size in bytes of the weights (4 or 8),
+# number of upward arcs of the forward and of the backward search, and number of shortcuts
+_HEADER = struct.Struct("<8sIIIQQQ")
+_MAGIC = b"CHIERAR1"
+
+def _witness_distances(out, source, excluded, targets, limit, max_settled):
+    """
+    Dijkstra's algorithm from source over the arcs out (node -> {node: weight}) of the nodes not contracted
+    yet, skipping the node excluded (the node being contracted). Stops when every node in targets is settled,
+    when the distance exceeds limit, or after max_settled nodes. Returns the distances found, which are the
+    costs of paths that exist even if the search stopped before settling them.
+    """
+    distance = {source: 0}
+    open_heap = [(0, source)]
+    remaining = len(targets)
+    settled = 0
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    while open_heap and settled < max_settled:
+        g, node = heappop(open_heap)
+        if g > distance[node]:
+            continue
+        if node in targets:
+            remaining -= 1
+            if remaining == 0:
+                break
+        settled += 1
+        for child, weight in out[node].items():
+            child_g = g + weight
+            if child_g <= limit and child != excluded:
+                known = distance.get(child)
+                if known is None or child_g < known:
+                    distance[child] = child_g
+                    heappush(open_heap, (child_g, child))
+    return distance
+
+def _shortcuts(node, out, into, max_settled):
+    """
+    Returns the shortcuts (u, x, weight) needed to contract node: one for every pair of arcs u -> node -> x
+    whose path is the only shortest path from u to x among the nodes not contracted yet, as far as a witness
+    search of at most max_settled nodes from u can tell
+    """
+    shortcuts = []
+    for u, weight_in in into[node].items():
+        targets = {x: weight_in + weight_out for x, weight_out in out[node].items() if x != u}
+        if not targets:
+            continue
+        distance = _witness_distances(out, u, node, targets, max(targets.values()), max_settled)
+        for x, via in targets.items():
+            if distance.get(x, via + 1) > via:
+                shortcuts.append((u, x, via))
+    return shortcuts
+
+def _priority(node, shortcuts, out, into, contracted_neighbors, level):
+    """
+    Returns the priority of contracting node (see build_hierarchy)
+    """
+    return 2 * (len(shortcuts) - len(out[node]) - len(into[node])) + contracted_neighbors[node] + level[node]
+
+def build_hierarchy(graph, max_settled=500, report=None, simulate_settled=5):
+    """
+    Builds the contraction hierarchy of graph, any graph with width, height, is_valid_pair, neighbors, and
+    components (search.map.Map or search.roads.RoadGraph), whose nodes are the state_hashes of the valid
+    pairs. The nodes are contracted one at a time, in the order of their priority: twice the edge difference
+    (the shortcuts added by contracting the node minus the arcs removed with it), plus the number of
+    neighbors already contracted and the level of the node (one more than the highest level of its contracted
+    neighbors), which spread the contractions over the graph and keep the hierarchy shallow. Priorities are
+    updated lazily: a node whose neighbors changed since its priority was computed is contracted only if its
+    recomputed priority is still the smallest. A priority is only an estimate, so its shortcuts are counted
+    with witness searches of at most simulate_settled nodes, which are much cheaper than the ones made when
+    the node is contracted; most nodes have their priority computed several times.
+
+    Contracting a node removes it from the graph and adds a shortcut between two of its neighbors if the
+    path through the node is shorter than any other path found by a witness search of at most max_settled
+    nodes (a search that stops early adds shortcuts that may not be needed, but never misses one). If report
+    is given it is called with (nodes contracted, number of nodes, shortcuts, seconds elapsed) every 10000
+    contractions. Returns a ContractionHierarchy.
+    """
+    begin = time.perf_counter()
+    nodes = graph.width * graph.height
+    valid = np.zeros(nodes, dtype=bool)
+    out = {}
+    into = {}
+    for node in range(nodes):
+        if graph.is_valid_pair(node % graph.width, node // graph.width):
+            valid[node] = True
+            out[node] = {}
+            into[node] = {}
+    for node in out:
+        for child, weight in graph.neighbors(node):
+            # parallel arcs keep the smallest weight
+            if child in out and child != node and weight < out[node].get(child, weight + 1):
+                out[node][child] = weight
+                into[child][node] = weight
+
+    # nodes whose priority is up to date: the priority of a node only changes when a neighbor is contracted,
+    # which removes it from pending. The shortcuts of a node are computed again when it is contracted, with
+    # max_settled, also because a witness may go through a node contracted since its priority was computed
+    # (contractions keep the distances between the nodes left, not the ones that avoid a given node)
+    pending = set()
+    contracted_neighbors = dict.fromkeys(out, 0)
+    level = dict.fromkeys(out, 0)
+    open_heap = []
+    for node in out:
+        shortcuts = _shortcuts(node, out, into, simulate_settled)
+        pending.add(node)
+        open_heap.append((_priority(node, shortcuts, out, into, contracted_neighbors, level), node))
+    heapq.heapify(open_heap)
+
+    rank = np.full(nodes, -1, dtype=np.int64)
+    upward = []
+    downward = []
+    added = 0
+    contracted = 0
+    while open_heap:
+        _, node = heapq.heappop(open_heap)
+        if node not in pending:
+            # lazy update: the priority is recomputed and the node goes back if it is no longer the smallest
+            shortcuts = _shortcuts(node, out, into, simulate_settled)
+            priority = _priority(node, shortcuts, out, into, contracted_neighbors, level)
+            if open_heap and priority > open_heap[0][0]:
+                heapq.heappush(open_heap, (priority, node))
+                pending.add(node)
+                continue
+        pending.discard(node)
+        shortcuts = _shortcuts(node, out, into, max_settled)
+
+        rank[node] = contracted
+        contracted += 1
+        # the arcs left are to and from nodes contracted later, i.e., of higher rank
+        upward.append((node, out[node]))
+        downward.append((node, into[node]))
+        for neighbor in set(out[node]) | set(into[node]):
+            out[neighbor].pop(node, None)
+            into[neighbor].pop(node, None)
+            contracted_neighbors[neighbor] += 1
+            level[neighbor] = max(level[neighbor], level[node] + 1)
+            pending.discard(neighbor)
+        for u, x, weight in shortcuts:
+            if weight < out[u].get(x, weight + 1):
+                out[u][x] = weight
+                into[x][u] = weight
+                added += 1
+        del out[node], into[node]
+        if report is not None and contracted % 10000 == 0:
+            report(contracted, len(contracted_neighbors), added, time.perf_counter() - begin)
+
+    labels = np.where(valid, np.asarray(graph.components, dtype=np.int64) + 1, 0).astype(np.int32)
+    return ContractionHierarchy(graph.width, graph.height, rank.astype(np.int32), labels,
+                                *(_csr(nodes, upward) + _csr(nodes, downward) + (added,)))
+
+def _csr(nodes, arcs):
+    """
+    Returns offsets, targets, and weights (see search.roads.build_csr) of the arcs given as a list of
+    (node, {node: weight})
+    """
+    offsets = np.zeros(nodes + 1, dtype=np.int64)
+    for node, children in arcs:
+        offsets[node + 1] = len(children)
+    np.cumsum(offsets, out=offsets)
+    targets = np.zeros(offsets[-1], dtype=np.int32)
+    weights = np.zeros(offsets[-1])
+    for node, children in arcs:
+        targets[offsets[node]:offsets[node + 1]] = list(children.keys())
+        weights[offsets[node]:offsets[node + 1]] = list(children.values())
+    return offsets, targets, weights
+
+def _layout(nodes, up_arcs, down_arcs, weight_size):
+    """
+    Returns the offsets in a hierarchy file of rank, labels, and of the offsets, targets, and weights of the
+    upward arcs of both searches, and the size of the file; every array is aligned to 8 bytes
+    """
+    sizes = [4 * nodes, 4 * nodes, 8 * (nodes + 1), 4 * up_arcs, weight_size * up_arcs,
+             8 * (nodes + 1), 4 * down_arcs, weight_size * down_arcs]
+    positions = []
+    position = _HEADER.size
+    for size in sizes:
+        position = (position + 7) // 8 * 8
+        positions.append(position)
+        position += size
+    return positions, position
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of a graph (see build_hierarchy): every node has a rank (its position in the
+    contraction order) and the graph is replaced by the arcs and shortcuts between nodes of increasing rank.
+    neighbors(node) yields the arcs from node to nodes of higher rank, the only ones followed by the forward
+    search of a query, and predecessors(node) the arcs entering node from nodes of higher rank, followed
+    backward by the backward search (see bi_bs_ch in search.algorithms). width, height, and the states are the
+    ones of the graph.
+
+    The hierarchy is stored with save in a binary file (a header followed by the arrays, with 4-byte weights if
+    they are all exact in single precision) and opened with load_hierarchy, which memory-maps it.
+    """
+    def __init__(self, width, height, rank, labels, up_offsets, up_targets, up_weights, down_offsets, down_targets,
+                 down_weights, shortcuts):
+        self.width = width
+        self.height = height
+        State.map_width = width
+        State.map_height = height
+        self.rank = rank
+        self.labels = labels
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.down_offsets = down_offsets
+        self.down_targets = down_targets
+        self.down_weights = down_weights
+        self.shortcuts = shortcuts
+        self.arcs = len(up_targets) + len(down_targets)
+        self.version = 0
+        # memoryviews give Python numbers when indexed, which are faster than numpy scalars in the searches
+        self._up_offsets = memoryview(up_offsets)
+        self._up_targets = memoryview(up_targets)
+        self._up_weights = memoryview(up_weights)
+        self._down_offsets = memoryview(down_offsets)
+        self._down_targets = memoryview(down_targets)
+        self._down_weights = memoryview(down_weights)
+        self._labels = memoryview(labels)
+
+    def same_component(self, a, b):
+        """
+        Returns True if states a and b are nodes of the graph in the same (weakly) connected component
+        """
+        label = self._labels[a.state_hash()]
+        return label != 0 and label == self._labels[b.state_hash()]
+
+    def neighbors(self, index):
+        """
+        Receives a node and returns the pairs (node, weight) of the arcs and shortcuts to nodes of higher rank
+        """
+        begin = self._up_offsets[index]
+        end = self._up_offsets[index + 1]
+        return zip(self._up_targets[begin:end], self._up_weights[begin:end])
+
+    def predecessors(self, index):
+        """
+        Receives a node and returns the pairs (node, weight) of the arcs and shortcuts entering it from nodes of
+        higher rank
+        """
+        begin = self._down_offsets[index]
+        end = self._down_offsets[index + 1]
+        return zip(self._down_targets[begin:end], self._down_weights[begin:end])
+
+    def save(self, file_name):
+        """
+        Stores the hierarchy in file_name
+        """
+        weights = np.concatenate([np.asarray(self.up_weights, dtype=np.float64), np.asarray(self.down_weights, dtype=np.float64)])
+        weight_type = np.float32 if np.array_equal(weights.astype(np.float32), weights) else np.float64
+        weight_size = np.dtype(weight_type).itemsize
+        nodes = self.width * self.height
+        positions, size = _layout(nodes, len(self.up_targets), len(self.down_targets), weight_size)
+        arrays = [np.asarray(self.rank, dtype=np.int32), np.asarray(self.labels, dtype=np.int32),
+                  np.asarray(self.up_offsets, dtype=np.int64), np.asarray(self.up_targets, dtype=np.int32),
+                  np.asarray(self.up_weights, dtype=weight_type), np.asarray(self.down_offsets, dtype=np.int64),
+                  np.asarray(self.down_targets, dtype=np.int32), np.asarray(self.down_weights, dtype=weight_type)]
+        with open(file_name, "wb") as hierarchy_file:
+            hierarchy_file.write(_HEADER.pack(_MAGIC, self.width, self.height, weight_size, len(self.up_targets),
+                                              len(self.down_targets), self.shortcuts))
+            for position, array in zip(positions, arrays):
+                hierarchy_file.write(b"\0" * (position - hierarchy_file.tell()))
+                hierarchy_file.write(array.tobytes())
+
+def load_hierarchy(file_name):
+    """
+    Returns the ContractionHierarchy stored in file_name by ContractionHierarchy.save; its arrays are
+    read-only views of the file, memory-mapped
+    """
+    with open(file_name, "rb") as hierarchy_file:
+        mapping = mmap.mmap(hierarchy_file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, width, height, weight_size, up_arcs, down_arcs, shortcuts = _HEADER.unpack_from(mapping, 0)
+    if magic != _MAGIC:
+        raise ValueError("%s is not a contraction hierarchy" % file_name)
+    nodes = width * height
+    positions, _ = _layout(nodes, up_arcs, down_arcs, weight_size)
+    weight_type = np.float32 if weight_size == 4 else np.float64
+    types = [np.int32, np.int32, np.int64, np.int32, weight_type, np.int64, np.int32, weight_type]
+    counts = [nodes, nodes, nodes + 1, up_arcs, up_arcs, nodes + 1, down_arcs, down_arcs]
+    arrays = [np.frombuffer(mapping, dtype=dtype, count=count, offset=position)
+              for dtype, count, position in zip(types, counts, positions)]
+    return ContractionHierarchy(width, height, *arrays, shortcuts)
@@ -0,0 +1,329 @@
+import heapq
+
+class IndexedHeap:
+    """
+    Addressable binary heap used as the OPEN list of the search algorithms. Every entry is stored together
+    with a key (the state_hash of the state it represents), and the heap keeps a position index from keys
+    to entries. This allows the algorithms to lower the priority of a node already in OPEN (decrease-key)
+    in O(log n) instead of calling heapq.heapify on the whole list, which is O(n).
+
+    The heap supports two modes:
+
+    - eager (default): the position index maps a key to the position of its entry in the list and
+      decrease_key moves the entry up the heap.
+    - lazy: decrease_key pushes a new entry with heapq and marks the old one as removed; removed entries
+      are discarded when they reach the top of the heap.
+
+    The attributes pushes, pops, decreases, and sifts count the heap operations performed; sifts is the
+    number of entries moved while restoring the heap property.
+    """
+    _REMOVED = object()
+
+    def __init__(self, lazy=False):
+        """
+        Constructor - creates an empty heap. If lazy is True the heap uses lazy deletion instead of an
+        in-place decrease-key.
+        """
+        self._lazy = lazy
+        self._heap = []
+        self._index = {}
+        self._counter = 0
+        self.pushes = 0
+        self.pops = 0
+        self.decreases = 0
+        self.sifts = 0
+
+    def __len__(self):
+        """
+        Returns the number of (live) entries in the heap
+        """
+        return len(self._index)
+
+    def __contains__(self, key):
+        """
+        Returns True if an entry with the given key is in the heap
+        """
+        return key in self._index
+
+    def items(self):
+        """
+        Returns a list with the pairs (key, item) of the (live) entries in the heap, in no particular order
+        """
+        if self._lazy:
+            return [(entry[2], entry[3]) for entry in self._index.values()]
+        return [(entry[1], entry[2]) for entry in self._heap]
+
+    def push(self, key, priority, item):
+        """
+        Inserts item with the given key and priority. The key must not be in the heap already.
+        """
+        self.pushes += 1
+        if self._lazy:
+            entry = [priority, self._counter, key, item]
+            self._counter += 1
+            self._index[key] = entry
+            heapq.heappush(self._heap, entry)
+            return
+        entry = [priority, key, item]
+        self._heap.append(entry)
+        self._index[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def pop(self):
+        """
+        Removes and returns the item with the smallest priority
+        """
+        self.pops += 1
+        if self._lazy:
+            while True:
+                entry = heapq.heappop(self._heap)
+                if entry[3] is not IndexedHeap._REMOVED:
+                    del self._index[entry[2]]
+                    return entry[3]
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        del self._index[top[1]]
+        if heap:
+            heap[0] = last
+            self._index[last[1]] = 0
+            self._sift_down(0)
+        return top[2]
+
+    def top(self):
+        """
+        Returns the item with the smallest priority without removing it from the heap
+        """
+        if self._lazy:
+            self._discard_removed()
+            return self._heap[0][3]
+        return self._heap[0][2]
+
+    def top_priority(self):
+        """
+        Returns the smallest priority in the heap
+        """
+        if self._lazy:
+            self._discard_removed()
+        return self._heap[0][0]
+
+    def decrease_key(self, key, priority):
+        """
+        Lowers the priority of the entry with the given key. Calls with a priority that is not
+        smaller than the current one are ignored.
+        """
+        if self._lazy:
+            entry = self._index[key]
+            if priority >= entry[0]:
+                return
+            self.decreases += 1
+            item = entry[3]
+            entry[3] = IndexedHeap._REMOVED
+            new_entry = [priority, self._counter, key, item]
+            self._counter += 1
+            self._index[key] = new_entry
+            heapq.heappush(self._heap, new_entry)
+            return
+        position = self._index[key]
+        entry = self._heap[position]
+        if priority >= entry[0]:
+            return
+        self.decreases += 1
+        entry[0] = priority
+        self._sift_up(position)
+
+    def _discard_removed(self):
+        """
+        Removes the entries marked as removed from the top of the heap (lazy mode)
+        """
+        while self._heap[0][3] is IndexedHeap._REMOVED:
+            heapq.heappop(self._heap)
+
+    def _sift_up(self, position):
+        """
+        Moves the entry at the given position up until its parent has a priority that is not larger
+        """
+        heap = self._heap
+        index = self._index
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            parent_entry = heap[parent]
+            if entry[0] < parent_entry[0]:
+                heap[position] = parent_entry
+                index[parent_entry[1]] = position
+                position = parent
+                self.sifts += 1
+                continue
+            break
+        heap[position] = entry
+        index[entry[1]] = position
+
+    def _sift_down(self, position):
+        """
+        Moves the entry at the given position down until both of its children have a priority that
+        is not smaller
+        """
+        heap = self._heap
+        index = self._index
+        size = len(heap)
+        entry = heap[position]
+        child = 2 * position + 1
+        while child < size:
+            right = child + 1
+            if right < size and heap[right][0] < heap[child][0]:
+                child = right
+            if heap[child][0] < entry[0]:
+                heap[position] = heap[child]
+                index[heap[position][1]] = position
+                position = child
+                child = 2 * position + 1
+                self.sifts += 1
+                continue
+            break
+        heap[position] = entry
+        index[entry[1]] = position
+
+class BucketQueue:
+    """
+    Bucket (Dial) priority queue with the interface of IndexedHeap, for priorities that are multiples of
+    resolution (0.5 for the f-values of the grid: the action costs are 1 and 1.5 and the octile distance
+    has the same granularity). Entries are kept in one bucket per priority, so push and pop take O(1)
+    amortized time instead of O(log n); pop scans the empty buckets between the smallest priority and the
+    next one, which are few because the priorities of OPEN lie in a narrow range.
+
+    Within a bucket the entries are split again by the g-value of their items (item.get_g() when pushed,
+    with the same resolution), and pop returns an entry with the largest g-value: among the nodes with the
+    same f-value, the deepest one is expanded first, which on open maps reaches the goal after expanding
+    fewer of the ties. decrease_key marks the old entry as removed and pushes a new one (lazy deletion).
+
+    The attributes pushes, pops, decreases, and sifts count the operations as in IndexedHeap; sifts is the
+    number of empty buckets scanned.
+    """
+    def __init__(self, resolution=0.5):
+        self._scale = 1 / resolution
+        # priority bucket -> [largest g bucket, {g bucket: list of entries}]; an entry is
+        # [priority bucket, g bucket, key, item]
+        self._buckets = {}
+        self._index = {}
+        self._min = None
+        # entry returned by the last call to _top_entry, until the queue changes
+        self._top = None
+        self.pushes = 0
+        self.pops = 0
+        self.decreases = 0
+        self.sifts = 0
+
+    def __len__(self):
+        """
+        Returns the number of (live) entries in the queue
+        """
+        return len(self._index)
+
+    def __contains__(self, key):
+        """
+        Returns True if an entry with the given key is in the queue
+        """
+        return key in self._index
+
+    def items(self):
+        """
+        Returns a list with the pairs (key, item) of the (live) entries in the queue, in no particular order
+        """
+        return [(entry[2], entry[3]) for entry in self._index.values()]
+
+    def _insert(self, key, priority, item):
+        scaled_priority = priority * self._scale
+        scaled_g = item.get_g() * self._scale
+        bucket_f = int(scaled_priority)
+        bucket_g = int(scaled_g)
+        if bucket_f != scaled_priority or bucket_g != scaled_g:
+            raise ValueError("%s or %s is not a multiple of the resolution of the queue" % (priority, item.get_g()))
+        entry = [bucket_f, bucket_g, key, item]
+        self._index[key] = entry
+        self._top = None
+        bucket = self._buckets.get(bucket_f)
+        if bucket is None:
+            self._buckets[bucket_f] = [bucket_g, {bucket_g: [entry]}]
+        else:
+            if bucket_g > bucket[0]:
+                bucket[0] = bucket_g
+            level = bucket[1].get(bucket_g)
+            if level is None:
+                bucket[1][bucket_g] = [entry]
+            else:
+                level.append(entry)
+        if self._min is None or bucket_f < self._min:
+            self._min = bucket_f
+
+    def push(self, key, priority, item):
+        """
+        Inserts item with the given key and priority. The key must not be in the queue already.
+        """
+        self.pushes += 1
+        self._insert(key, priority, item)
+
+    def _top_entry(self):
+        """
+        Returns the live entry with the smallest priority and, among those, the largest g-value, removing
+        the removed entries and the empty buckets found on the way
+        """
+        if self._top is not None:
+            return self._top
+        buckets = self._buckets
+        index = self._index
+        while True:
+            bucket = buckets.get(self._min)
+            if bucket is None or not bucket[1]:
+                buckets.pop(self._min, None)
+                self._min += 1
+                self.sifts += 1
+                continue
+            levels = bucket[1]
+            level = levels.get(bucket[0])
+            while level:
+                entry = level[-1]
+                if index.get(entry[2]) is entry:
+                    self._top = entry
+                    return entry
+                level.pop()
+            # the level of the largest g-value is empty -- moving down to the next one
+            levels.pop(bucket[0], None)
+            bucket[0] -= 1
+
+    def pop(self):
+        """
+        Removes and returns the item with the smallest priority (the largest g-value among ties)
+        """
+        self.pops += 1
+        entry = self._top_entry()
+        self._buckets[entry[0]][1][entry[1]].pop()
+        del self._index[entry[2]]
+        self._top = None
+        if not self._index:
+            self._buckets = {}
+            self._min = None
+        return entry[3]
+
+    def top(self):
+        """
+        Returns the item that pop would return without removing it from the queue
+        """
+        return self._top_entry()[3]
+
+    def top_priority(self):
+        """
+        Returns the smallest priority in the queue
+        """
+        return self._top_entry()[0] / self._scale
+
+    def decrease_key(self, key, priority):
+        """
+        Lowers the priority of the entry with the given key (and updates its g-value to the current one of
+        its item). Calls with a priority that is not smaller than the current one are ignored.
+        """
+        entry = self._index[key]
+        if priority * self._scale >= entry[0]:
+            return
+        self.decreases += 1
+        self._insert(key, priority, entry[3])
@@ -0,0 +1,327 @@
+from search.algorithms import State
+from search.cache import load_sidecar, save_sidecar
+import numpy as np
+import random
+
+class Map:
+    """
+    Class to store the map. The maps in folder dao-map are from movingai.org.
+    """
+    def __init__(self, file_name):
+        self.file_name = file_name        
+        self.map_file = open(self.file_name)
+        self.type_map = self.map_file.readline()
+        self.height = int(self.map_file.readline().split(' ')[1])
+        self.width = int(self.map_file.readline().split(' ')[1])
+        
+        State.map_width = self.width
+        State.map_height = self.height
+        
+        # the grid is memory-mapped from the binary cache next to the map file when the cache is up to date
+        self.data_int = load_sidecar(self.file_name, "grid")
+        if self.data_int is None or self.data_int.shape != (self.height, self.width):
+            self.read_map()
+            self.convert_data()
+            save_sidecar(self.file_name, "grid", self.data_int)
+        self.compute_neighbor_masks()
+        self.map_file.close()
+
+        self._components = load_sidecar(self.file_name, "components")
+        if self._components is None or self._components.shape != (self.height * self.width,):
+            self._components = self.compute_components()
+            save_sidecar(self.file_name, "components", self._components)
+        self._components_stale = False
+
+        # number of cells changed with set_traversable since the map was loaded
+        self.version = 0
+        
+    def read_map(self):
+        """
+        Reads map from the file and stores it in memory as a (height, width) numpy array with the byte
+        of every character of the map.
+        """
+        line = self.map_file.readline()
+        while 'map' not in line:
+            line = self.map_file.readline()
+        data = np.frombuffer(self.map_file.read().encode(), dtype=np.uint8)
+        # dropping the line breaks; every line of a movingai.org map has exactly width characters
+        data = data[(data != ord('\n')) & (data != ord('\r'))]
+        self.data_chars = data[:self.height * self.width].reshape(self.height, self.width)
+        
+    def convert_data(self):
+        """
+        Converts the map, initially in the movingai.org format, to a uint8 matrix where traversable
+        cells have the value of 0 and non-traversable cells have the value of 1.
+        
+        The movingai.com maps are encoded as follows. 
+        
+        . - passable terrain
+        G - passable terrain
+        @ - out of bounds
+        O - out of bounds
+        T - trees (unpassable)
+        S - swamp (passable from regular terrain)
+        W - water (traversable, but not passable from terrain)
+        """
+        passable = (self.data_chars == ord('.')) | (self.data_chars == ord('G'))
+        self.data_int = (~passable).astype(np.uint8)
+        del self.data_chars
+    
+    def compute_neighbor_masks(self):
+        """
+        Precomputes, for every cell of the map, an 8-bit mask of the neighbors that can be reached with
+        a single action. Bit k of the mask of a cell is set if the k-th move of Map.moves leads to a
+        traversable cell inside the map. Each move is stored as a tuple (dx, dy, index offset, cost), where
+        the index offset is added to the state_hash of a cell to obtain the state_hash of the neighbor.
+
+        The masks are stored in a bytearray indexed by state_hash, and move_table[mask] contains the
+        (index offset, cost) pairs of the moves allowed by mask, so that successors can be generated
+        without bounds checks or lookups in data_int.
+        """
+        self.compute_moves()
+        passable = np.pad(self.data_int == 0, 1, constant_values=False)
+        masks = np.zeros((self.height, self.width), dtype=np.uint8)
+        for bit, (i, j, _, _) in enumerate(self.moves):
+            masks |= passable[1 + j:1 + j + self.height, 1 + i:1 + i + self.width].astype(np.uint8) << bit
+        self.neighbor_mask = bytearray(masks.tobytes())
+
+    def compute_moves(self):
+        """
+        Computes Map.moves, the bit of every move in the neighbor masks (move_bit), and move_table (see
+        compute_neighbor_masks); they only depend on the width of the map.
+        """
+        self.moves = []
+        for i in range(-1, 2):
+            for j in range(-1, 2):
+                if i == 0 and j == 0:
+                    continue
+                self.moves.append((i, j, j * self.width + i, self.cost(i, j)))
+
+        self.move_bit = {(i, j): bit for bit, (i, j, _, _) in enumerate(self.moves)}
+        self.move_table = []
+        for mask in range(256):
+            self.move_table.append(tuple((offset, cost) for bit, (_, _, offset, cost) in enumerate(self.moves) if mask & (1 << bit)))
+
+    @classmethod
+    def from_arrays(cls, file_name, data_int, neighbor_mask, components):
+        """
+        Creates a map from its grid (a (height, width) uint8 array as data_int), its neighbor masks (any
+        buffer of bytes indexed by state_hash), and its component labels without reading the map file, e.g.,
+        from the arrays shared by search.registry.MapRegistry. Read-only arrays are copied by
+        set_traversable before the first change.
+        """
+        graph = cls.__new__(cls)
+        graph.file_name = file_name
+        graph.height, graph.width = data_int.shape
+        State.map_width = graph.width
+        State.map_height = graph.height
+        graph.data_int = data_int
+        graph.compute_moves()
+        graph.neighbor_mask = neighbor_mask
+        graph._components = components
+        graph._components_stale = False
+        graph.version = 0
+        return graph
+
+    def compute_components(self):
+        """
+        Labels the connected components of the map with a flood fill over the traversable cells. Returns
+        an int32 array indexed by state_hash where traversable cells in the same component share a label
+        larger than 0 and non-traversable cells have the label 0.
+        """
+        labels = np.zeros(self.height * self.width, dtype=np.int32)
+        visited = bytearray(self.height * self.width)
+        label = 0
+        for cell in np.flatnonzero(self.data_int.reshape(-1) == 0).tolist():
+            if visited[cell]:
+                continue
+            label += 1
+            visited[cell] = 1
+            component = [cell]
+            stack = [cell]
+            while stack:
+                index = stack.pop()
+                for neighbor, _ in self.neighbors(index):
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        component.append(neighbor)
+                        stack.append(neighbor)
+            labels[component] = label
+        return labels
+
+    @property
+    def components(self):
+        """
+        Component labels of the cells (see compute_components). After set_traversable blocks a cell that
+        may disconnect its component, the labels are recomputed the next time they are used.
+        """
+        if self._components_stale:
+            self._components = self.compute_components()
+            self._components_stale = False
+        return self._components
+
+    @components.setter
+    def components(self, labels):
+        self._components = labels
+        self._components_stale = False
+
+    def same_component(self, a, b):
+        """
+        Returns True if states a and b are traversable and in the same connected component of the map,
+        i.e., if there is a path between them. The search algorithms call this method before searching,
+        so that problems without a solution are rejected without expanding any node.
+        """
+        label = self.components[a.state_hash()]
+        return label != 0 and label == self.components[b.state_hash()]
+
+    def set_traversable(self, x, y, traversable):
+        """
+        Makes the cell (x, y) traversable or non-traversable (e.g., a door that opens or closes) and updates
+        the neighbor masks of the cells around it and the component labels. Returns True if the cell changed.
+
+        The change is only made in memory: the map file and its caches are not modified. Data derived from
+        the map by other objects (e.g., JPS+ tables, landmarks, path databases) is not updated either;
+        Map.version counts the changes, so that these objects can detect them.
+        """
+        if (self.data_int[y][x] == 0) == traversable:
+            return False
+        if not self.data_int.flags.writeable:
+            # the grid was memory-mapped from the read-only cache
+            self.data_int = np.array(self.data_int)
+        if not isinstance(self.neighbor_mask, bytearray):
+            self.neighbor_mask = bytearray(self.neighbor_mask)
+        self.data_int[y][x] = 0 if traversable else 1
+        self.version += 1
+
+        index = y * self.width + x
+        around = []
+        for i, j, offset, _ in self.moves:
+            if 0 <= x + i < self.width and 0 <= y + j < self.height:
+                neighbor = index + offset
+                # the move from the neighbor back to (x, y)
+                bit = 1 << self.move_bit[(-i, -j)]
+                if traversable:
+                    self.neighbor_mask[neighbor] |= bit
+                else:
+                    self.neighbor_mask[neighbor] &= ~bit
+                if self.data_int[y + j][x + i] == 0:
+                    around.append((i, j))
+
+        if self._components_stale:
+            return True
+        labels = self._components
+        if not labels.flags.writeable:
+            labels = self._components = np.array(labels)
+        if traversable:
+            # the cell joins (and connects) the components around it
+            joined = {int(labels[index + j * self.width + i]) for i, j in around}
+            if not joined:
+                labels[index] = labels.max() + 1
+            else:
+                label = min(joined)
+                if len(joined) > 1:
+                    labels[np.isin(labels, list(joined))] = label
+                labels[index] = label
+        else:
+            labels[index] = 0
+            # the component can only be split if the traversable cells around (x, y) are not connected among
+            # themselves; then the labels are recomputed when they are needed
+            if around:
+                reached = {around[0]}
+                stack = [around[0]]
+                while stack:
+                    i, j = stack.pop()
+                    for cell in around:
+                        if cell not in reached and abs(cell[0] - i) <= 1 and abs(cell[1] - j) <= 1:
+                            reached.add(cell)
+                            stack.append(cell)
+                if len(reached) < len(around):
+                    self._components_stale = True
+        return True
+
+    def toggle(self, x, y):
+        """
+        Switches the cell (x, y) between traversable and non-traversable (see set_traversable)
+        """
+        return self.set_traversable(x, y, self.data_int[y][x] != 0)
+
+    def plot_map(self, closed_data, start, goal, filename):
+        import matplotlib.pyplot as plt
+
+        data_plot = self.data_int.astype(np.float64)
+        data_plot *= 100
+
+        for i in range(0, self.height):
+            for j in range(0, self.width):
+                if data_plot[i][j] == 0:
+                    data_plot[i][j] = -100
+
+        for _, state in closed_data.items():
+            data_plot[state.get_y()][state.get_x()] = 1
+
+        data_plot[start.get_y()][start.get_x()] = -50
+        data_plot[goal.get_y()][goal.get_x()] = -50
+
+        plt.axis('off')
+        plt.imshow(data_plot, cmap='Greys', interpolation='nearest')
+        plt.savefig(filename)
+        # plt.show()
+
+    def random_state(self):
+        """
+        Generates a valid random state for a given map. 
+        """
+        x = random.randint(0, self.width - 1)
+        y = random.randint(0, self.height - 1)
+        while self.data_int[y][x] == 1:
+            x = random.randint(0, self.width - 1)
+            y = random.randint(0, self.height - 1)
+        state = State(x, y)
+        return state
+    
+    def is_valid_pair(self, x, y):
+        """
+        Verifies if an x-y pair is valid for a map.
+        """
+        if x < 0 or y < 0:
+            return False
+        if x >= self.width or y >= self.height:
+            return False
+        if self.data_int[y][x] == 1:
+            return False
+        return True
+    
+    def cost(self, x, y):
+        """
+        Returns the cost of an action.
+        
+        Diagonal moves cost 1.5; each action in the 4 cardinal directions costs 1.0
+        """
+        if x == 0 or y == 0:
+            return 1
+        else:
+            return 1.5
+    
+    def neighbors(self, index):
+        """
+        Receives the state_hash of a traversable cell and yields a pair (state_hash, cost) for every
+        neighbor of the cell, where cost is the cost of the action that reaches the neighbor. No State
+        objects are created.
+        """
+        for offset, cost in self.move_table[self.neighbor_mask[index]]:
+            yield index + offset, cost
+
+    # the grid is undirected: the cells from which a cell is reached in one move are its neighbors (used by
+    # the backward searches, see search.roads.RoadGraph.predecessors)
+    predecessors = neighbors
+
+    def successors(self, state):
+        """
+        Transition function: receives a state and returns a list with the neighbors of that state in the space
+        """
+        children = []
+        for index, cost in self.neighbors(state.state_hash()):
+            s = State(index % self.width, index // self.width)
+            s.set_g(state.get_g() + cost)
+            children.append(s)
+        return children
\ No newline at end of file
@@ -0,0 +1,283 @@
+import math
+import random
+import numpy as np
+from search.algorithms import State
+from search.cache import load_sidecar, save_sidecar
+
+def _problem_line(file_name):
+    """
+    Returns the fields of the problem line ("p ...") of a file in a DIMACS format, or None if the first line
+    that is not a comment is not a problem line (an edge list or a list of coordinates)
+    """
+    with open(file_name) as graph_file:
+        for line in graph_file:
+            if line.startswith("p "):
+                return line.split()
+            if line.strip() and line[0] not in "c#%":
+                return None
+    return None
+
+def _read_rows(file_name, prefix, chunk_bytes):
+    """
+    Yields the numbers on the lines of file_name that start with prefix (without it), or on all the lines
+    that are not comments if prefix is None, as float64 arrays with one row per line; the file is parsed
+    about chunk_bytes at a time
+    """
+    with open(file_name) as rows_file:
+        while True:
+            lines = rows_file.readlines(chunk_bytes)
+            if not lines:
+                return
+            if prefix is not None:
+                rows = [line[len(prefix):] for line in lines if line.startswith(prefix)]
+            else:
+                rows = [line for line in lines if line.strip() and line[0] not in "#%"]
+            if rows:
+                yield np.array(" ".join(rows).split(), dtype=np.float64).reshape(len(rows), -1)
+
+def read_arcs(file_name, directed=True, chunk_bytes=1 << 22):
+    """
+    Reads the arcs of a graph stored in file_name, either in the DIMACS shortest path format (a line
+    "p sp nodes arcs" and one line "a u v w" per arc, with nodes numbered from 1) or as an edge list (one
+    line "u v w" or "u v" per edge, weight 1 if omitted, with nodes numbered from 0; lines starting with # or
+    % are comments). The edges of an edge list are added in both directions unless directed is True.
+
+    Returns the number of nodes and the sources, targets (int64, numbered from 0), and weights (float64) of
+    the arcs. The file is parsed about chunk_bytes at a time, and the arrays of a DIMACS graph are allocated
+    once with the number of arcs of its problem line.
+    """
+    problem = _problem_line(file_name)
+    if problem is not None:
+        nodes = int(problem[2])
+        sources = np.zeros(int(problem[3]), dtype=np.int64)
+        targets = np.zeros(int(problem[3]), dtype=np.int64)
+        weights = np.zeros(int(problem[3]))
+        arcs = 0
+        for values in _read_rows(file_name, "a ", chunk_bytes):
+            sources[arcs:arcs + len(values)] = values[:, 0] - 1
+            targets[arcs:arcs + len(values)] = values[:, 1] - 1
+            weights[arcs:arcs + len(values)] = values[:, 2]
+            arcs += len(values)
+        return nodes, sources[:arcs], targets[:arcs], weights[:arcs]
+
+    sources = []
+    targets = []
+    weights = []
+    for values in _read_rows(file_name, None, chunk_bytes):
+        sources.append(values[:, 0].astype(np.int64))
+        targets.append(values[:, 1].astype(np.int64))
+        weights.append(values[:, 2].copy() if values.shape[1] > 2 else np.ones(len(values)))
+    sources = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+    targets = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+    weights = np.concatenate(weights) if weights else np.zeros(0)
+    nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+    if not directed:
+        sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        weights = np.concatenate([weights, weights])
+    return nodes, sources, targets, weights
+
+def read_coordinates(file_name, nodes, chunk_bytes=1 << 22):
+    """
+    Reads the coordinates of the nodes from file_name, either in the DIMACS format (one line "v id x y" per
+    node, with x and y the longitude and the latitude in millionths of degree, nodes numbered from 1) or one
+    line "id x y" per node (nodes numbered from 0). Returns a (2, nodes) float64 array with the x and y of
+    every node; DIMACS longitudes are multiplied by the cosine of the mean latitude, so that distances are
+    not stretched along the x axis.
+    """
+    dimacs = _problem_line(file_name) is not None
+    coordinates = np.zeros((2, nodes))
+    for values in _read_rows(file_name, "v " if dimacs else None, chunk_bytes):
+        ids = values[:, 0].astype(np.int64) - (1 if dimacs else 0)
+        coordinates[0, ids] = values[:, 1]
+        coordinates[1, ids] = values[:, 2]
+    if dimacs:
+        coordinates[0] *= math.cos(math.radians(coordinates[1].mean() / 1e6))
+    return coordinates
+
+def build_csr(nodes, sources, targets, weights):
+    """
+    Returns the compressed sparse row (CSR) representation of the arcs: offsets (int64, nodes + 1 entries)
+    and the targets (int32) and weights (float64) of the arcs sorted by source, so that the arcs leaving
+    node u are targets[offsets[u]:offsets[u + 1]]
+    """
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=nodes), out=offsets[1:])
+    return offsets, targets[order].astype(np.int32), weights[order].astype(np.float64)
+
+def label_components(nodes, sources, targets):
+    """
+    Labels the weakly connected components of the graph (the components when the direction of the arcs is
+    ignored) by hooking and pointer jumping on whole arrays: every node points to a node of its component
+    with a smaller number until all of them point to the smallest one. Returns an int32 array with the label
+    of every node.
+    """
+    labels = np.arange(nodes, dtype=np.int64)
+    while True:
+        label_sources = labels[sources]
+        label_targets = labels[targets]
+        if np.array_equal(label_sources, label_targets):
+            return labels.astype(np.int32)
+        np.minimum.at(labels, label_sources, label_targets)
+        np.minimum.at(labels, label_targets, label_sources)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+class RoadGraph:
+    """
+    Weighted directed graph, e.g., a road network from the 9th DIMACS implementation challenge, stored in
+    compressed sparse row form (see build_csr) for the arcs leaving every node and for the arcs entering it.
+    The arrays are built once from the graph file (see read_arcs) and memory-mapped from the sidecar caches
+    next to it afterwards, so a graph with millions of nodes is opened in milliseconds and only the parts
+    that a search reaches are read from disk.
+
+    The nodes are numbered from 0 and the state of node u is State(u, 0): width is the number of nodes, so
+    state_hash is u and the algorithms that only use width, neighbors, predecessors, same_component, and
+    heuristic_to run unchanged (dijkstra and bi_bs, A_star and bi_A_stars). With the coordinates of the nodes
+    (see read_coordinates) heuristic_to returns the straight-line distance to the goal times the largest
+    factor that keeps it below the weight of every arc (so it is consistent whatever the unit of the
+    weights, e.g., distances or travel times); without them the heuristic is 0.
+
+    same_component uses the weakly connected components, so a goal that is only unreachable because of the
+    direction of the arcs is detected by exhausting the search.
+    """
+    def __init__(self, file_name, coordinates=None, directed=True):
+        self.file_name = file_name
+        prefix = "csr" if directed else "csr-undirected"
+        names = ["offsets", "targets", "weights", "reverse-offsets", "reverse-sources", "reverse-weights", "components"]
+        arrays = [load_sidecar(file_name, prefix + "-" + name) for name in names]
+        if any(array is None for array in arrays):
+            nodes, sources, targets, weights = read_arcs(file_name, directed)
+            arrays = list(build_csr(nodes, sources, targets, weights) + build_csr(nodes, targets, sources, weights))
+            arrays.append(label_components(nodes, sources, targets))
+            del sources, targets, weights
+            for i, name in enumerate(names):
+                save_sidecar(file_name, prefix + "-" + name, arrays[i])
+                # the cache is memory-mapped instead of keeping the array in memory, if it could be written
+                cached = load_sidecar(file_name, prefix + "-" + name)
+                if cached is not None:
+                    arrays[i] = cached
+        self.offsets, self.targets, self.weights, self.reverse_offsets, self.reverse_sources, \
+            self.reverse_weights, self.components = arrays
+        self.nodes = len(self.offsets) - 1
+        self.arcs = len(self.targets)
+        self.width = self.nodes
+        self.height = 1
+        State.map_width = self.width
+        State.map_height = self.height
+        self.version = 0
+
+        # memoryviews give Python numbers when indexed, which are faster than numpy scalars in the searches
+        self._offsets = memoryview(self.offsets)
+        self._targets = memoryview(self.targets)
+        self._weights = memoryview(self.weights)
+        self._reverse_offsets = memoryview(self.reverse_offsets)
+        self._reverse_sources = memoryview(self.reverse_sources)
+        self._reverse_weights = memoryview(self.reverse_weights)
+        self._components = memoryview(self.components)
+
+        self.coordinates = None
+        self.scale = 0.0
+        if coordinates is not None:
+            self.coordinates = load_sidecar(coordinates, "xy")
+            if self.coordinates is None or self.coordinates.shape != (2, self.nodes):
+                self.coordinates = read_coordinates(coordinates, self.nodes)
+                save_sidecar(coordinates, "xy", self.coordinates)
+            # the scale depends on the arcs and on the coordinates; it is cached with the arrays of the graph
+            scale = load_sidecar(file_name, prefix + "-scale", depends=[coordinates])
+            if scale is None:
+                scale = np.array([self.heuristic_scale()])
+                save_sidecar(file_name, prefix + "-scale", scale, depends=[coordinates])
+            self.scale = float(scale[0])
+            self._x = memoryview(np.ascontiguousarray(self.coordinates[0]))
+            self._y = memoryview(np.ascontiguousarray(self.coordinates[1]))
+
+    def heuristic_scale(self, chunk=1 << 20):
+        """
+        Returns the largest factor by which the straight-line distance between the ends of every arc can be
+        multiplied without exceeding the weight of the arc (slightly reduced against rounding errors). The
+        arcs are checked chunk at a time.
+        """
+        scale = math.inf
+        for begin in range(0, self.arcs, chunk):
+            arcs = np.arange(begin, min(begin + chunk, self.arcs))
+            u = np.searchsorted(self.offsets, arcs, side='right') - 1
+            v = np.asarray(self.targets[begin:begin + chunk])
+            distance = np.hypot(self.coordinates[0][u] - self.coordinates[0][v], self.coordinates[1][u] - self.coordinates[1][v])
+            positive = distance > 0
+            if positive.any():
+                scale = min(scale, float((self.weights[begin:begin + chunk][positive] / distance[positive]).min()))
+        return 0.0 if scale == math.inf else scale * (1 - 1e-9)
+
+    def state(self, node):
+        """
+        Returns the state of a node
+        """
+        return State(node, 0)
+
+    def is_valid_pair(self, x, y):
+        """
+        Verifies if an x-y pair is a node of the graph.
+        """
+        return 0 <= x < self.nodes and y == 0
+
+    def same_component(self, a, b):
+        """
+        Returns True if states a and b are in the same weakly connected component of the graph
+        """
+        return self._components[a.state_hash()] == self._components[b.state_hash()]
+
+    def random_state(self):
+        """
+        Returns the state of a random node
+        """
+        return State(random.randrange(self.nodes), 0)
+
+    def neighbors(self, index):
+        """
+        Receives a node and returns the pairs (node, weight) of the arcs leaving it
+        """
+        begin = self._offsets[index]
+        end = self._offsets[index + 1]
+        return zip(self._targets[begin:end], self._weights[begin:end])
+
+    def predecessors(self, index):
+        """
+        Receives a node and returns the pairs (node, weight) of the arcs entering it, for backward searches
+        """
+        begin = self._reverse_offsets[index]
+        end = self._reverse_offsets[index + 1]
+        return zip(self._reverse_sources[begin:end], self._reverse_weights[begin:end])
+
+    def heuristic_to(self, goal_state):
+        """
+        Returns a function that receives a node and returns a consistent estimate of the cost of reaching
+        goal_state from it (see RoadGraph)
+        """
+        if self.coordinates is None or self.scale == 0:
+            return lambda index: 0
+        x = self._x
+        y = self._y
+        goal = goal_state.state_hash()
+        goal_x = x[goal]
+        goal_y = y[goal]
+        scale = self.scale
+        hypot = math.hypot
+
+        def heuristic(index):
+            return scale * hypot(x[index] - goal_x, y[index] - goal_y)
+        return heuristic
+
+    def successors(self, state):
+        """
+        Transition function: receives a state and returns a list with the states reached by the arcs leaving it
+        """
+        children = []
+        for index, cost in self.neighbors(state.state_hash()):
+            s = State(index, 0)
+            s.set_g(state.get_g() + cost)
+            children.append(s)
+        return children
@@ -0,0 +1,131 @@
+import json
+import os
+import resource
+import time
+import tracemalloc
+import numpy as np
+from search.algorithms import State
+from search.map import Map
+
+def read_scenarios(file_name):
+    """
+    Reads a scenario file in the movingai.com .scen format and yields one tuple per problem without loading
+    the whole file: (bucket, map name, map width, map height, x_start, y_start, x_goal, y_goal, optimal
+    length). The first line of the file is the version line ("version 1") and the fields of every other line
+    are separated by tabs.
+
+    The optimal lengths in movingai.com scenarios use diagonal moves of cost √2 that cannot cut corners, so
+    they are not the optimal costs under the action costs of Map.cost.
+    """
+    with open(file_name) as scenarios:
+        for line in scenarios:
+            if not line.strip() or line.startswith("version"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            yield (int(fields[0]), fields[1], int(fields[2]), int(fields[3]), int(fields[4]), int(fields[5]),
+                   int(fields[6]), int(fields[7]), float(fields[8]))
+
+def _percentile(times, q):
+    return float(np.percentile(times, q)) if times else 0.0
+
+def run_suite(scenario_files, algorithms, maps_folder=None, limit=None, trace_memory=False, progress=None):
+    """
+    Solves the problems of the scenario files with every algorithm (a dictionary from names to functions
+    receiving (start, goal, map) and returning (cost, nodes expanded)). The maps are loaded from maps_folder
+    (the folder of the scenario file if None) with the file names given in the scenarios; problems are read
+    one at a time and a map is loaded again only when the map of the scenarios changes. If limit is given,
+    only the first limit problems of every file are solved.
+
+    Returns a dictionary with the statistics of every algorithm per bucket (see summarize) and the number of
+    problems in which the algorithms returned different costs. If trace_memory is True the peak memory
+    allocated by the searches of each bucket (tracemalloc, which slows the search down) is also reported.
+    progress, if given, is called with the number of problems solved so far.
+    """
+    samples = {name: {} for name in algorithms}
+    disagreements = 0
+    solved = 0
+    for scenario_file in scenario_files:
+        folder = maps_folder if maps_folder is not None else os.path.dirname(scenario_file)
+        gridded_map = None
+        map_name = None
+        for count, scenario in enumerate(read_scenarios(scenario_file)):
+            if limit is not None and count >= limit:
+                break
+            bucket, name, _, _, x_start, y_start, x_goal, y_goal, _ = scenario
+            if name != map_name:
+                gridded_map = Map(os.path.join(folder, os.path.basename(name)))
+                map_name = name
+            # State.map_width is shared by all maps; it must be the width of the current one
+            State.map_width = gridded_map.width
+            State.map_height = gridded_map.height
+            costs = set()
+            for algorithm, search in algorithms.items():
+                start = State(x_start, y_start)
+                goal = State(x_goal, y_goal)
+                if trace_memory:
+                    tracemalloc.start()
+                begin = time.perf_counter()
+                cost, expanded = search(start, goal, gridded_map)
+                wall_time = time.perf_counter() - begin
+                peak = 0
+                if trace_memory:
+                    peak = tracemalloc.get_traced_memory()[1] // 1024
+                    tracemalloc.stop()
+                costs.add(cost)
+                sample = samples[algorithm].setdefault(bucket, {"times": [], "expanded": 0, "peak_kb": 0})
+                sample["times"].append(wall_time)
+                sample["expanded"] += expanded
+                sample["peak_kb"] = max(sample["peak_kb"], peak)
+            if len(costs) > 1:
+                disagreements += 1
+            solved += 1
+            if progress is not None:
+                progress(solved)
+    return {"algorithms": {name: summarize(buckets, trace_memory) for name, buckets in samples.items()},
+            "problems": solved, "disagreements": disagreements,
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+def summarize(buckets, trace_memory):
+    """
+    Receives the wall times and nodes expanded of an algorithm per bucket and returns, for every bucket (as a
+    string, as in JSON), the number of problems, the nodes expanded, the total wall time, the expansions per
+    second, the 50th, 90th, and 99th percentiles and the maximum of the wall time per problem, and the peak
+    memory allocated by a search (only if trace_memory is True).
+    """
+    summary = {}
+    for bucket in sorted(buckets):
+        times = buckets[bucket]["times"]
+        total_time = sum(times)
+        stats = {"problems": len(times), "expanded": buckets[bucket]["expanded"], "time": total_time,
+                 "expansions_per_second": buckets[bucket]["expanded"] / total_time if total_time > 0 else 0.0,
+                 "p50": _percentile(times, 50), "p90": _percentile(times, 90), "p99": _percentile(times, 99),
+                 "max": max(times) if times else 0.0}
+        if trace_memory:
+            stats["peak_kb"] = buckets[bucket]["peak_kb"]
+        summary[str(bucket)] = stats
+    return summary
+
+def save_baseline(results, file_name):
+    with open(file_name, "w") as baseline:
+        json.dump(results, baseline, indent=1, sort_keys=True)
+
+def load_baseline(file_name):
+    with open(file_name) as baseline:
+        return json.load(baseline)
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Compares the results of run_suite with a baseline saved by save_baseline. Returns a list of tuples
+    (algorithm, bucket, metric, baseline value, current value, regression) for the nodes expanded, the
+    total wall time, and the 90th percentile of the wall time of every bucket solved in both runs, where
+    regression is True if the current value is more than tolerance (a fraction) above the baseline.
+    """
+    rows = []
+    for algorithm, buckets in results["algorithms"].items():
+        for bucket, stats in buckets.items():
+            old = baseline.get("algorithms", {}).get(algorithm, {}).get(bucket)
+            if old is None:
+                continue
+            for metric in ("expanded", "time", "p90"):
+                rows.append((algorithm, bucket, metric, old[metric], stats[metric], stats[metric] > old[metric] * (1 + tolerance)))
+    return rows
@@ -0,0 +1,156 @@
+from array import array
+import numpy as np
+
+FORWARD = 0
+BACKWARD = 1
+
+EXPAND = 0
+GENERATE = 1
+REOPEN = 2
+MEET = 3
+TERMINATE = 4
+EVENT_NAMES = ("expand", "generate", "reopen", "meet", "terminate")
+
+# one record of a trace: 10 bytes per event
+TRACE_DTYPE = np.dtype([("event", "u1"), ("direction", "u1"), ("index", "<i4"), ("g", "<f4")])
+
+class SearchObserver:
+    """
+    Receives the events of a search. Every search algorithm accepts an optional observer argument; when it
+    is None (the default) the algorithms only pay one comparison per event, and when it is given they call
+    the methods below. This class ignores every event, so observers only override the events they need.
+
+    index is the state_hash of the node, g its g-value when the event happens, and direction FORWARD or
+    BACKWARD (the unidirectional searches are always FORWARD).
+    """
+    def expand(self, index, g, direction):
+        """
+        The node is removed from OPEN and its children are generated
+        """
+        pass
+
+    def generate(self, index, g, direction):
+        """
+        The node is reached for the first time
+        """
+        pass
+
+    def reopen(self, index, g, direction):
+        """
+        A node already reached is reached again with a smaller g-value (its entry in OPEN is updated, or it
+        will be expanded again)
+        """
+        pass
+
+    def meet(self, index, cost):
+        """
+        A bidirectional search found a cheaper solution through the node; cost is the new best cost
+        """
+        pass
+
+    def terminate(self, cost, expanded):
+        """
+        The search returned cost (-1 if no solution was found) after expanding expanded nodes
+        """
+        pass
+
+class TraceRecorder(SearchObserver):
+    """
+    Observer that records every event of the searches it observes in compact typed arrays (10 bytes per
+    event), which can be saved as a .npy file of TRACE_DTYPE records and analyzed with hot_spots,
+    expansion_map, and direction_counts. A meet record stores the cost in g and a terminate record stores
+    the cost in g and the number of nodes expanded in index.
+    """
+    def __init__(self):
+        self._events = array('B')
+        self._directions = array('B')
+        self._indices = array('i')
+        self._values = array('f')
+
+    def __len__(self):
+        return len(self._events)
+
+    def _record(self, event, direction, index, g):
+        self._events.append(event)
+        self._directions.append(direction)
+        self._indices.append(index)
+        self._values.append(g)
+
+    def expand(self, index, g, direction):
+        self._record(EXPAND, direction, index, g)
+
+    def generate(self, index, g, direction):
+        self._record(GENERATE, direction, index, g)
+
+    def reopen(self, index, g, direction):
+        self._record(REOPEN, direction, index, g)
+
+    def meet(self, index, cost):
+        self._record(MEET, FORWARD, index, cost)
+
+    def terminate(self, cost, expanded):
+        self._record(TERMINATE, FORWARD, expanded, cost)
+
+    def clear(self):
+        """
+        Forgets the events recorded so far
+        """
+        self.__init__()
+
+    def to_array(self):
+        """
+        Returns the events recorded as a NumPy array of TRACE_DTYPE records, in the order they happened
+        """
+        trace = np.empty(len(self._events), dtype=TRACE_DTYPE)
+        trace["event"] = np.frombuffer(self._events, dtype=np.uint8)
+        trace["direction"] = np.frombuffer(self._directions, dtype=np.uint8)
+        trace["index"] = np.frombuffer(self._indices, dtype=np.int32)
+        trace["g"] = np.frombuffer(self._values, dtype=np.float32)
+        return trace
+
+    def save(self, file_name):
+        np.save(file_name, self.to_array())
+
+def load_trace(file_name):
+    """
+    Loads a trace saved by TraceRecorder.save
+    """
+    trace = np.load(file_name)
+    if trace.dtype != TRACE_DTYPE:
+        raise ValueError("%s is not a search trace" % file_name)
+    return trace
+
+def expansion_map(trace, width, height, direction=None):
+    """
+    Returns an int32 array of shape (height, width) with the number of times every cell was expanded in
+    the trace (only in the given direction if direction is not None), e.g. for plotting with imshow.
+    """
+    selected = trace["event"] == EXPAND
+    if direction is not None:
+        selected &= trace["direction"] == direction
+    counts = np.bincount(trace["index"][selected], minlength=width * height)
+    return counts.astype(np.int32).reshape(height, width)
+
+def hot_spots(trace, width, count=10, direction=None):
+    """
+    Returns the count cells expanded the most times in the trace (only in the given direction if direction
+    is not None) as a list of ((x, y), expansions), only including the cells expanded more than once:
+    re-expansions, cells expanded by both directions, or by several iterations of the search.
+    """
+    selected = trace["event"] == EXPAND
+    if direction is not None:
+        selected &= trace["direction"] == direction
+    expanded, times = np.unique(trace["index"][selected], return_counts=True)
+    order = np.argsort(-times, kind="stable")[:count]
+    return [((int(expanded[i]) % width, int(expanded[i]) // width), int(times[i])) for i in order if times[i] > 1]
+
+def direction_counts(trace):
+    """
+    Returns a dictionary with the number of events of every kind (by name, as in EVENT_NAMES) per direction
+    ("forward" and "backward"); meet and terminate events are counted as forward.
+    """
+    counts = {}
+    for direction, name in ((FORWARD, "forward"), (BACKWARD, "backward")):
+        events = trace["event"][trace["direction"] == direction]
+        counts[name] = {EVENT_NAMES[event]: int(np.count_nonzero(events == event)) for event in range(len(EVENT_NAMES))}
+    return counts
@@ -0,0 +1,56 @@
+import getopt
+from search.algorithms import A_star
+from search.algorithms import bi_A_stars
+from search.algorithms import Middle_Meet
+from search.algorithms import NBS
+from search.algorithms import fringe_search
+from search.algorithms import IDA_star
+from search.batch import read_instances
+from search.batch import run_batch
+from search.jps import jps
+from search.jps import jps_plus
+import sys
+
+ALGORITHMS = {"A*": A_star, "Bi-A*": bi_A_stars, "MM": Middle_Meet, "NBS": NBS, "JPS": jps, "JPS+": jps_plus, "Fringe": fringe_search, "IDA*": IDA_star}
+
+def main():
+    """
+    Solves the test instances with a pool of worker processes, writing one JSON line per (instance, algorithm)
+    pair to the output file. Run it with --help to see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'instances=', 'output=', 'workers=', 'algorithms=', 'memory'])
+
+    map_file = "dao-map/brc000d.map"
+    test_instances = "test-instances/testinstances.txt"
+    output_file = "results.jsonl"
+    workers = None
+    algorithms = ALGORITHMS
+    trace_memory = False
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Solve the test instances with all algorithms on all CPUs: batch.py")
+            print("Choose the map, instances, and output file: batch.py --map dao-map/brc000d.map --instances test-instances/testinstances.txt --output results.jsonl")
+            print("Use 4 workers and only A* and MM: batch.py --workers 4 --algorithms A*,MM")
+            print("Also record the peak memory allocated by each search (slower): batch.py --memory")
+            print("Runs are resumed: instances already in the output file are not solved again.")
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--instances":
+            test_instances = a
+        elif o == "--output":
+            output_file = a
+        elif o == "--workers":
+            workers = int(a)
+        elif o == "--algorithms":
+            algorithms = {name: ALGORITHMS[name] for name in a.split(",")}
+        elif o == "--memory":
+            trace_memory = True
+
+    solved = run_batch(map_file, read_instances(test_instances), algorithms, output_file, workers, trace_memory)
+    print("Solved " + str(solved) + " problems; results in " + output_file)
+
+if __name__ == "__main__":
+    main()
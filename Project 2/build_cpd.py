@@ -0,0 +1,35 @@
+import getopt
+import time
+from search.cpd import build_cpd
+import sys
+
+def main():
+    """
+    Builds the compressed path database of a map offline and stores it next to the map file, where
+    search.cpd.CPD memory-maps it. Run it with --help to see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'workers=', 'backend='])
+
+    map_file = "dao-map/brc000d.map"
+    workers = None
+    backend = "wavefront"
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Build the database of the default map on all CPUs: build_cpd.py")
+            print("Choose the map and use 4 workers: build_cpd.py --map dao-map/brc000d.map --workers 4")
+            print("Use the heapq Dijkstra instead of the NumPy wavefront: build_cpd.py --backend dijkstra")
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--workers":
+            workers = int(a)
+        elif o == "--backend":
+            backend = a
+
+    begin = time.perf_counter()
+    offsets, starts, moves = build_cpd(map_file, workers, backend=backend)
+    print("Built %d runs (%d bytes) in %.2f s" % (len(starts), offsets.nbytes + starts.nbytes + moves.nbytes, time.perf_counter() - begin))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import getopt
+import random
+import time
+from search.algorithms import State
+from search.map import Map
+from search.query_cache import QueryCache
+from search.query_cache import find_path
+import sys
+
+def main():
+    """
+    Replays a workload of path queries with and without a QueryCache in front of the search. Every query is
+    a new random (start, goal) pair, a pair asked before (in either order), or a pair of cells on the path
+    of an earlier query. Reports the time of both runs and the counters of the cache. Run it with --help to
+    see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'queries=', 'repeat=', 'subpath=', 'max-bytes=', 'seed='])
+
+    map_file = "dao-map/brc000d.map"
+    queries = 500
+    repeat = 0.3
+    subpath = 0.3
+    max_bytes = 16 * 1024 * 1024
+    seed = 0
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Replay 500 queries, 30% repeated and 30% on earlier paths: cache_benchmark.py")
+            print("Choose the map, the number of queries, and the fractions of repeated and sub-path queries: cache_benchmark.py --map dao-map/brc000d.map --queries 1000 --repeat 0.5 --subpath 0.1")
+            print("Limit the memory of the cache to 1 MB: cache_benchmark.py --max-bytes 1048576")
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--queries":
+            queries = int(a)
+        elif o == "--repeat":
+            repeat = float(a)
+        elif o == "--subpath":
+            subpath = float(a)
+        elif o == "--max-bytes":
+            max_bytes = int(a)
+        elif o == "--seed":
+            seed = int(a)
+
+    gridded_map = Map(map_file)
+    random_generator = random.Random(seed)
+    random.seed(seed)
+    workload = []
+    paths = []
+    for _ in range(queries):
+        r = random_generator.random()
+        if r < repeat and workload:
+            start, goal = random_generator.choice(workload)
+            if random_generator.random() < 0.5:
+                start, goal = goal, start
+        elif r < repeat + subpath and paths:
+            path = random_generator.choice(paths)
+            start, goal = random_generator.choice(path), random_generator.choice(path)
+        else:
+            start, goal = gridded_map.random_state(), gridded_map.random_state()
+            # the paths are only needed to generate the sub-path queries of the workload
+            _, path, _ = find_path(start, goal, gridded_map)
+            if path is not None:
+                paths.append(path)
+        workload.append((start, goal))
+
+    begin = time.perf_counter()
+    expected = [find_path(State(start.get_x(), start.get_y()), State(goal.get_x(), goal.get_y()), gridded_map)[0]
+                for start, goal in workload]
+    search_time = time.perf_counter() - begin
+
+    cache = QueryCache(max_bytes=max_bytes)
+    begin = time.perf_counter()
+    costs = [cache.cost(State(start.get_x(), start.get_y()), State(goal.get_x(), goal.get_y()), gridded_map)
+             for start, goal in workload]
+    cache_time = time.perf_counter() - begin
+
+    print("%d queries: %.2f s without the cache, %.2f s with the cache" % (queries, search_time, cache_time))
+    stats = cache.stats()
+    print("hits %d, sub-path hits %d, misses %d, evictions %d, hit rate %.1f%%, %d paths cached (%d KB)" % (
+        stats["hits"], stats["subpath_hits"], stats["misses"], stats["evictions"], 100 * stats["hit_rate"],
+        stats["entries"], stats["bytes"] // 1024))
+    print("%d queries with a different cost" % sum(1 for a, b in zip(expected, costs) if a != b))
+
+if __name__ == "__main__":
+    main()
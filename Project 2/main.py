@@ -3,6 +3,7 @@ import getopt
 from search.algorithms import A_star
 from search.algorithms import bi_A_stars
 from search.algorithms import Middle_Meet
+from search.algorithms import NBS
 from search.map import Map
 import sys
 def main():
@@ -26,6 +27,7 @@ def main():
     nodes_expanded_biastar = []   
     nodes_expanded_astar = []   
     nodes_expanded_mm = []
+    nodes_expanded_nbs = []
     
     start_states = []
     goal_states = []
@@ -77,6 +79,17 @@ def main():
             print("Solution cost encountered: ", cost)
             print("Solution cost expected: ", solution_costs[i])
             print()
+
+        cost, expanded_nbs = NBS(start,goal,gridded_map)
+        nodes_expanded_nbs.append(expanded_nbs)
+
+        if cost != solution_costs[i]:
+            print("There is a mismatch in the solution cost found by NBS and what was expected for the problem:")
+            print("Start state: ", start)
+            print("Goal state: ", goal)
+            print("Solution cost encountered: ", cost)
+            print("Solution cost expected: ", solution_costs[i])
+            print()
     
     print('Finished running all tests. The implementation of an algorithm is likely correct if you do not see mismatch messages for it.')
 
@@ -85,6 +98,8 @@ def main():
         plotter = PlotResults()
         plotter.plot_results(nodes_expanded_mm, nodes_expanded_astar, "Nodes Expanded (MM)", "Nodes Expanded (A*)", "nodes_expanded_mm_astar")
         plotter.plot_results(nodes_expanded_mm, nodes_expanded_biastar, "Nodes Expanded (MM)", "Nodes Expanded (Bi-A*)", "nodes_expanded_mm_biastar")
+        plotter.plot_results(nodes_expanded_nbs, nodes_expanded_mm, "Nodes Expanded (NBS)", "Nodes Expanded (MM)", "nodes_expanded_nbs_mm")
+        plotter.plot_results(nodes_expanded_nbs, nodes_expanded_biastar, "Nodes Expanded (NBS)", "Nodes Expanded (Bi-A*)", "nodes_expanded_nbs_biastar")
         
 
 if __name__ == "__main__":
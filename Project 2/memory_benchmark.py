@@ -0,0 +1,85 @@
+import getopt
+import multiprocessing
+import resource
+import time
+import tracemalloc
+from search.algorithms import State
+from search.algorithms import A_star
+from search.algorithms import fringe_search
+from search.algorithms import IDA_star
+from search.batch import read_instances
+from search.map import Map
+import sys
+
+ALGORITHMS = {"A*": A_star, "Fringe": fringe_search, "IDA*": IDA_star}
+
+def measure(map_file, instances, algorithm, trace_memory):
+    """
+    Solves the instances with one algorithm and returns the wall time, the number of nodes expanded, the
+    number of wrong costs, the resident memory after loading the map and at the end (peak, in KB), and
+    the peak memory allocated by a single search if trace_memory is True (tracemalloc, in KB).
+    """
+    gridded_map = Map(map_file)
+    search = ALGORITHMS[algorithm]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    total_time = 0
+    total_expanded = 0
+    wrong = 0
+    peak_traced = 0
+    for x_start, y_start, x_goal, y_goal, expected in instances:
+        start = State(x_start, y_start)
+        goal = State(x_goal, y_goal)
+        if trace_memory:
+            tracemalloc.start()
+        begin = time.perf_counter()
+        cost, expanded = search(start, goal, gridded_map)
+        total_time += time.perf_counter() - begin
+        if trace_memory:
+            peak_traced = max(peak_traced, tracemalloc.get_traced_memory()[1] // 1024)
+            tracemalloc.stop()
+        total_expanded += expanded
+        if cost != expected:
+            wrong += 1
+    return total_time, total_expanded, wrong, baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, peak_traced
+
+def main():
+    """
+    Compares the memory and the wall time of A*, Fringe Search, and IDA* on the test instances. Every
+    algorithm runs in a new process, so that the peak resident memory (ru_maxrss) of one algorithm is not
+    inflated by the others. Run it with --help to see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'instances=', 'algorithms=', 'memory'])
+
+    map_file = "dao-map/brc000d.map"
+    test_instances = "test-instances/testinstances.txt"
+    algorithms = ["A*", "Fringe"]
+    trace_memory = False
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Compare A* and Fringe Search on the test instances: memory_benchmark.py")
+            print("Also run IDA* (it takes minutes on the hardest instances): memory_benchmark.py --algorithms A*,Fringe,IDA*")
+            print("Also record the peak memory allocated by each search (slower): memory_benchmark.py --memory")
+            print("Choose the map and instances: memory_benchmark.py --map dao-map/brc000d.map --instances test-instances/testinstances.txt")
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--instances":
+            test_instances = a
+        elif o == "--algorithms":
+            algorithms = a.split(",")
+        elif o == "--memory":
+            trace_memory = True
+
+    instances = read_instances(test_instances)
+    context = multiprocessing.get_context("spawn")
+    print("%-8s %10s %10s %8s %14s %14s %14s" % ("algorithm", "time (s)", "expanded", "wrong", "map RSS (MB)", "peak RSS (MB)", "search (MB)"))
+    for algorithm in algorithms:
+        with context.Pool(1) as pool:
+            total_time, expanded, wrong, baseline, peak, traced = pool.apply(measure, (map_file, instances, algorithm, trace_memory))
+        print("%-8s %10.2f %10d %8d %14.1f %14.1f %14s" % (algorithm, total_time, expanded, wrong, baseline / 1024, peak / 1024,
+                                                         "%.1f" % (traced / 1024) if trace_memory else "-"))
+
+if __name__ == "__main__":
+    main()
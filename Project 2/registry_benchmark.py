@@ -0,0 +1,82 @@
+import getopt
+import multiprocessing
+import time
+import numpy as np
+from search.map import Map
+from search.registry import MapRegistry
+from search.registry import attach_map
+import sys
+
+def private_memory():
+    """
+    Returns the memory of the current process that is not shared with other processes, in KB (Linux only:
+    Private_Clean + Private_Dirty of /proc/self/smaps_rollup)
+    """
+    total = 0
+    with open("/proc/self/smaps_rollup") as rollup:
+        for line in rollup:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+def read_map(graph):
+    np.asarray(graph.data_int).sum()
+    np.frombuffer(graph.neighbor_mask, dtype=np.uint8).sum()
+    np.asarray(graph.components).sum()
+
+def start_worker(map_file, map_name, registry_folder):
+    """
+    Runs in a new worker process: gets the map (loading map_file, or attaching the map published as map_name
+    if map_name is not None), reads all of its data, as the searches of the worker would, and returns the
+    time taken to get the map and the private memory added by it (in KB)
+    """
+    before = private_memory()
+    begin = time.perf_counter()
+    graph = Map(map_file) if map_name is None else attach_map(map_name, registry_folder)
+    startup = time.perf_counter() - begin
+    read_map(graph)
+    return startup, private_memory() - before
+
+def main():
+    """
+    Compares workers that load a map themselves with workers that attach the copy published by a
+    MapRegistry: the time a worker takes to get the map and the memory that the map adds to every worker
+    and to all of them. Run it with --help to see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'workers='])
+
+    map_file = "dao-map/brc000d.map"
+    worker_counts = [1, 2, 4, 8]
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Compare 1, 2, 4, and 8 workers on brc000d: registry_benchmark.py")
+            print("Choose the map and the numbers of workers: registry_benchmark.py --map dao-map/brc000d.map --workers 1,4,16")
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--workers":
+            worker_counts = [int(count) for count in a.split(",")]
+
+    context = multiprocessing.get_context("spawn")
+    with MapRegistry() as registry:
+        begin = time.perf_counter()
+        map_name = registry.publish(map_file, "benchmark-" + map_file.replace("/", "_"))
+        print("map published in %.1f ms" % (1000 * (time.perf_counter() - begin)))
+        # this process keeps both copies mapped: a page mapped by a single worker would count as private to it
+        resident = [Map(map_file), attach_map(map_name, registry.folder)]
+        for graph in resident:
+            read_map(graph)
+        print("%-8s %8s %16s %18s %18s" % ("workers", "map", "startup (ms)", "per worker (MB)", "all workers (MB)"))
+        for workers in worker_counts:
+            for mode, name in (("loaded", None), ("attached", map_name)):
+                with context.Pool(workers) as pool:
+                    # one job per worker; the pool is started before so that the import time is not measured
+                    pool.map(int, range(workers))
+                    results = pool.starmap(start_worker, [(map_file, name, registry.folder)] * workers, chunksize=1)
+                startup = max(result[0] for result in results)
+                memory = [result[1] / 1024 for result in results]
+                print("%-8d %8s %16.1f %18.1f %18.1f" % (workers, mode, 1000 * startup, max(memory), sum(memory)))
+
+if __name__ == "__main__":
+    main()
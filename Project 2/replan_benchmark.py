@@ -0,0 +1,106 @@
+import getopt
+import random
+import time
+from search.algorithms import A_star
+from search.dstar import DStarLite
+from search.map import Map
+import sys
+
+def main():
+    """
+    Compares D* Lite replanning against A* from scratch on a map whose cells change. For every problem the
+    agent follows its path and, after every few steps, random cells of the map are toggled (some of them on
+    the current path, so that it must be repaired); both algorithms then compute the new path from the
+    current position of the agent. Run it with --help to see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'problems=', 'rounds=', 'edits=', 'on-path=', 'seed='])
+
+    map_file = "dao-map/brc000d.map"
+    problems = 10
+    rounds = 10
+    edits = 10
+    on_path = 0.2
+    seed = 0
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Replan 10 problems with 10 rounds of 10 random edits each: replan_benchmark.py")
+            print("Choose the map and the number of problems, rounds, and edits per round: replan_benchmark.py --map dao-map/brc000d.map --problems 20 --rounds 5 --edits 50")
+            print("Choose the fraction of the edits that block a cell of the current path: replan_benchmark.py --on-path 0.5")
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--problems":
+            problems = int(a)
+        elif o == "--rounds":
+            rounds = int(a)
+        elif o == "--edits":
+            edits = int(a)
+        elif o == "--on-path":
+            on_path = float(a)
+        elif o == "--seed":
+            seed = int(a)
+
+    gridded_map = Map(map_file)
+    random_generator = random.Random(seed)
+    random.seed(seed)
+    totals = {"D* Lite": [0, 0], "A*": [0, 0]}
+    initial = [0, 0]
+    wrong = 0
+    replans = 0
+    for _ in range(problems):
+        start = gridded_map.random_state()
+        goal = gridded_map.random_state()
+        while not gridded_map.same_component(start, goal):
+            goal = gridded_map.random_state()
+        begin = time.perf_counter()
+        planner = DStarLite(gridded_map, start, goal)
+        _, expanded = planner.plan()
+        initial[0] += time.perf_counter() - begin
+        initial[1] += expanded
+
+        for _ in range(rounds):
+            path = planner.path()
+            if path is None:
+                break
+            # the agent moves a few steps along its path
+            start = path[min(len(path) - 1, 5)]
+            planner.move_start(start)
+            path = path[min(len(path) - 1, 5):]
+            changed = []
+            for _ in range(edits):
+                if len(path) > 2 and random_generator.random() < on_path:
+                    cell = path[random_generator.randrange(1, len(path) - 1)]
+                    x, y = cell.get_x(), cell.get_y()
+                else:
+                    x, y = random_generator.randrange(gridded_map.width), random_generator.randrange(gridded_map.height)
+                if (x, y) in ((start.get_x(), start.get_y()), (goal.get_x(), goal.get_y())):
+                    continue
+                if gridded_map.toggle(x, y):
+                    changed.append((x, y))
+
+            # the component labels are recomputed here if an edit may have split a component, so that this
+            # cost (shared by both algorithms) is not charged to the first one
+            gridded_map.components
+            begin = time.perf_counter()
+            planner.update_cells(changed)
+            cost, expanded = planner.plan()
+            totals["D* Lite"][0] += time.perf_counter() - begin
+            totals["D* Lite"][1] += expanded
+
+            begin = time.perf_counter()
+            expected, expanded = A_star(start, goal, gridded_map)
+            totals["A*"][0] += time.perf_counter() - begin
+            totals["A*"][1] += expanded
+            replans += 1
+            if cost != expected:
+                wrong += 1
+
+    print("Initial D* Lite plans: %.2f s, %d nodes expanded" % (initial[0], initial[1]))
+    print("%-10s %10s %12s %16s" % ("replanning", "time (s)", "expanded", "expanded/replan"))
+    for name, (total_time, expanded) in totals.items():
+        print("%-10s %10.2f %12d %16.1f" % (name, total_time, expanded, expanded / max(replans, 1)))
+    print("%d replans, %d with a different cost" % (replans, wrong))
+
+if __name__ == "__main__":
+    main()
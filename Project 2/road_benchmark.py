@@ -0,0 +1,137 @@
+import getopt
+import os
+import random
+import resource
+import time
+import numpy as np
+from search.algorithms import A_star
+from search.algorithms import bi_A_stars
+from search.roads import RoadGraph
+import sys
+
+ALGORITHMS = {"A*": A_star, "Bi-A*": bi_A_stars}
+
+def write_synthetic_network(graph_file, coordinates_file, rows, seed):
+    """
+    Writes a road network of rows x rows intersections in the DIMACS formats (.gr and .co): the
+    intersections are on a jittered grid of about 100 m, 10% of the streets are missing, 5% are one-way,
+    and the weight of a street is its length in meters times a random detour factor between 1 and 1.5.
+    """
+    random_generator = np.random.default_rng(seed)
+    nodes = rows * rows
+    row, column = np.divmod(np.arange(nodes), rows)
+    # microdegrees of longitude and latitude around New York
+    x = -74000000 + column * 1000 + random_generator.integers(-300, 300, nodes)
+    y = 40700000 + row * 1000 + random_generator.integers(-300, 300, nodes)
+    sources = []
+    targets = []
+    for step, ok in ((1, column < rows - 1), (rows, row < rows - 1), (rows + 1, (column < rows - 1) & (row < rows - 1))):
+        u = np.flatnonzero(ok & (random_generator.random(nodes) < (0.9 if step != rows + 1 else 0.1)))
+        sources.append(u)
+        targets.append(u + step)
+    u = np.concatenate(sources)
+    v = np.concatenate(targets)
+    meters = np.hypot((x[u] - x[v]) * np.cos(np.radians(40.7)), y[u] - y[v]) * 0.111
+    weights = np.ceil(meters * random_generator.uniform(1, 1.5, len(u))).astype(np.int64)
+    one_way = random_generator.random(len(u)) < 0.05
+    arcs = (np.concatenate([u, v[~one_way]]), np.concatenate([v, u[~one_way]]), np.concatenate([weights, weights[~one_way]]))
+    with open(graph_file, "w") as graph:
+        graph.write("p sp %d %d\n" % (nodes, len(arcs[0])))
+        graph.write("\n".join("a %d %d %d" % arc for arc in zip((arcs[0] + 1).tolist(), (arcs[1] + 1).tolist(), arcs[2].tolist())))
+        graph.write("\n")
+    with open(coordinates_file, "w") as coordinates:
+        coordinates.write("p aux sp co %d\n" % nodes)
+        coordinates.write("\n".join("v %d %d %d" % node for node in zip(range(1, nodes + 1), x.tolist(), y.tolist())))
+        coordinates.write("\n")
+
+def main():
+    """
+    Runs A* (with the straight-line heuristic of RoadGraph) and Bi-A* on random queries of a road network
+    in the DIMACS format, reporting the time to open the graph and, for every algorithm, the time, the
+    nodes expanded, the nodes expanded per second, and the peak resident memory. Without --graph a
+    synthetic network is written first. Run it with --help to see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'graph=', 'coordinates=', 'rows=', 'queries=', 'algorithms=',
+                                                   'folder=', 'seed=', 'keep'])
+
+    graph_file = None
+    coordinates_file = None
+    rows = 1000
+    queries = 20
+    algorithms = ["A*", "Bi-A*"]
+    folder = "."
+    seed = 0
+    keep = False
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Run 20 queries on a synthetic network of 1000 x 1000 intersections: road_benchmark.py")
+            print("Run on a DIMACS road network: road_benchmark.py --graph USA-road-d.NY.gr --coordinates USA-road-d.NY.co")
+            print("Choose the size of the synthetic network and the number of queries: road_benchmark.py --rows 2000 --queries 50")
+            print("Write the synthetic network (and keep it) in another folder: road_benchmark.py --folder /tmp --keep")
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--graph":
+            graph_file = a
+        elif o == "--coordinates":
+            coordinates_file = a
+        elif o == "--rows":
+            rows = int(a)
+        elif o == "--queries":
+            queries = int(a)
+        elif o == "--algorithms":
+            algorithms = a.split(",")
+        elif o == "--folder":
+            folder = a
+        elif o == "--seed":
+            seed = int(a)
+        elif o == "--keep":
+            keep = True
+
+    synthetic = graph_file is None
+    if synthetic:
+        graph_file = os.path.join(folder, "synthetic-road-%d-%d.gr" % (rows, seed))
+        coordinates_file = graph_file[:-3] + ".co"
+        if not os.path.exists(graph_file):
+            begin = time.perf_counter()
+            write_synthetic_network(graph_file, coordinates_file, rows, seed)
+            print("network written in %.1f s" % (time.perf_counter() - begin))
+
+    begin = time.perf_counter()
+    graph = RoadGraph(graph_file, coordinates_file)
+    print("%d nodes, %d arcs, opened in %.2f s, peak RSS %.0f MB" % (graph.nodes, graph.arcs, time.perf_counter() - begin,
+                                                                      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+    random_generator = random.Random(seed)
+    problems = []
+    while len(problems) < queries:
+        start = graph.state(random_generator.randrange(graph.nodes))
+        goal = graph.state(random_generator.randrange(graph.nodes))
+        if graph.same_component(start, goal):
+            problems.append((start, goal))
+
+    costs = {}
+    print("%-8s %10s %12s %14s %14s" % ("algorithm", "time (s)", "expanded", "expanded/s", "peak RSS (MB)"))
+    for algorithm in algorithms:
+        total_time = 0
+        total_expanded = 0
+        for problem, (start, goal) in enumerate(problems):
+            begin = time.perf_counter()
+            cost, expanded = ALGORITHMS[algorithm](graph.state(start.get_x()), graph.state(goal.get_x()), graph)
+            total_time += time.perf_counter() - begin
+            total_expanded += expanded
+            costs.setdefault(problem, set()).add(cost)
+        print("%-8s %10.2f %12d %14.0f %14.0f" % (algorithm, total_time, total_expanded, total_expanded / total_time,
+                                                 resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+    different = sum(1 for found in costs.values() if len(found) > 1)
+    if different:
+        print("%d problems with different costs" % different)
+
+    if synthetic and not keep:
+        # the network and its caches
+        for file_name in os.listdir(folder or "."):
+            if file_name.startswith(os.path.basename(graph_file)[:-3]):
+                os.remove(os.path.join(folder, file_name))
+
+if __name__ == "__main__":
+    main()
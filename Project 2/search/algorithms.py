@@ -1,4 +1,6 @@
-import heapq 
+from search.heap import BucketQueue
+from search.heap import IndexedHeap
+import time
 
 class State:
     """
@@ -9,7 +11,11 @@ class State:
     Each state has the values of x, y, g, and cost. The cost is used as the criterion for sorting the nodes
     in the OPEN list for A*, Bi-A*, and Middle_Meet. For A* and Bi-A* the cost should be the f-value of the node, while
     for Middle_Meet the cost should be the p-value of the node. 
+
+    The attributes are declared in __slots__, so states do not carry a __dict__; search.engine keeps the
+    search data of a query in flat arrays instead of State objects.
     """
+    __slots__ = ('_x', '_y', '_g', '_cost')
     map_width = 0
     
     def __init__(self, x, y):
@@ -92,11 +98,23 @@ a_num = 1
 bi_num = 1
 m_num = 1
 #Creating an code to implement the A* Algorithm -- A* is an algorithm that sorts the nodes in the heap (OPEN) by their respective f values
-def A_star(start_state, goal_state, graph):
+#If landmarks (search.landmarks.Landmarks) is given the heuristic is max(h_octile, h_ALT)
+#If buckets is True OPEN is a search.heap.BucketQueue instead of an IndexedHeap -- O(1) push and pop, and the ties of f are broken
+#toward the largest g
+#Graphs that are not grids (search.roads.RoadGraph) give their own heuristic with heuristic_to instead of the octile distance
+def A_star(start_state, goal_state, graph, lazy=False, landmarks=None, observer=None, buckets=False):
     #Defining The initial states in A* algorithm
     global a_num
-    list_heap = [start_state]
-    heapq.heapify(list_heap)
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    if landmarks is not None:
+        h_alt = landmarks.heuristic_to(goal_state)
+    h_graph = graph.heuristic_to(goal_state) if hasattr(graph, "heuristic_to") else None
+    list_heap = BucketQueue() if buckets else IndexedHeap(lazy)
+    list_heap.push(start_state.state_hash(), start_state.get_cost(), start_state)
 
     Dict_hash = {}
     Dict_hash[start_state.state_hash()] = start_state
@@ -104,54 +122,176 @@ def A_star(start_state, goal_state, graph):
     expand_a_algo = 0
 
     while not len(list_heap) == 0:
-        n = heapq.heappop(list_heap)
+        n = list_heap.pop()
         if n == goal_state:
+            if observer is not None:
+                observer.terminate(n.get_g(), expand_a_algo)
             return n.get_g(), expand_a_algo
-        bacha = graph.successors(n)
         expand_a_algo += 1
-        for i in bacha:
-            X_change = abs(i.get_x()-goal_state.get_x())
-            Y_change = abs(i.get_y()-goal_state.get_y())
-
-            #Using the fourmulae for the hueristic given in the class notes..
-            func_heuristic = 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
-            i.set_cost(i.get_g() + func_heuristic)
-            hash_i = i.state_hash()
-            if hash_i not in Dict_hash.keys():
+        if observer is not None:
+            observer.expand(n.state_hash(), n.get_g(), 0)
+        #The children come from the neighbor masks of the map as (state_hash, action cost) pairs --
+        #a State is only created when a node is generated for the first time
+        for hash_i, step in graph.neighbors(n.state_hash()):
+            g_i = n.get_g() + step
+            y_i, x_i = divmod(hash_i, graph.width)
+            if h_graph is None:
+                X_change = abs(x_i-goal_state.get_x())
+                Y_change = abs(y_i-goal_state.get_y())
+
+                #Using the fourmulae for the hueristic given in the class notes..
+                func_heuristic = 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+            else:
+                func_heuristic = h_graph(hash_i)
+            if landmarks is not None:
+                func_heuristic = max(func_heuristic, h_alt(hash_i))
+            f_i = g_i + func_heuristic
+            if hash_i not in Dict_hash:
                 # adding i in list_heap and Dict_hash
-                heapq.heappush(list_heap, i)
+                i = State(x_i, y_i)
+                i.set_g(g_i)
+                i.set_cost(f_i)
+                list_heap.push(hash_i, f_i, i)
                 Dict_hash[hash_i] = i
-            if hash_i in Dict_hash.keys() and i < Dict_hash[hash_i]:
-                #Updating -- Dict_hash and list_heap with the given new g_value 
-                Dict_hash[hash_i].set_g(i.get_g())
-                #In this condition we dont update the parent  --- PATH isnt neccessary
-                #Heapifying -- list_heap
-                Dict_hash[hash_i].set_cost(i.get_g() + func_heuristic)
-                heapq.heapify(list_heap)
-            if i.state_hash() not in Dict_hash.keys():
-                # adding i in list_heap and Dict_hash
-                heapq.heappush(list_heap, i)
-                Dict_hash[i.state_hash()] = i
-            elif i.state_hash() in Dict_hash.keys() and i < Dict_hash[i.state_hash()]:
+                if observer is not None:
+                    observer.generate(hash_i, g_i, 0)
+            elif f_i < Dict_hash[hash_i].get_cost():
                 #Updating -- Dict_hash and list_heap with the given new g_value 
-                Dict_hash[i.state_hash()].set_g(i.get_g())
+                Dict_hash[hash_i].set_g(g_i)
                 #In this condition we dont update the parent  --- PATH isnt neccessary
-                #Heapifying -- list_heap
-                Dict_hash[hash_i].set_cost(i.get_g() + func_heuristic)
-                heapq.heapify(list_heap)
+                #Moving the node up in list_heap -- decrease-key instead of heapifying the whole list
+                Dict_hash[hash_i].set_cost(f_i)
+                if hash_i in list_heap:
+                    list_heap.decrease_key(hash_i, f_i)
+                if observer is not None:
+                    observer.reopen(hash_i, g_i, 0)
     #Plotting the map
     #graph.plot_map(Dict_hash, start_state, goal_state, 'solution-maps/A_star/' + str(a_num))
     #a_num += 1
+    if observer is not None:
+        observer.terminate(-1, expand_a_algo)
     return -1, expand_a_algo
 
 
+#Creating an code to implement ARA* (Anytime Repairing A*) -- weighted A* (f = g + epsilon*h) started with a large epsilon, so
+#that a first solution is found quickly, and repeated with smaller epsilons while there is time left. Each search reuses the
+#g-values and the OPEN list of the previous one: the nodes whose g-value improved after being expanded (INCONS) are moved
+#back to OPEN instead of expanding them again in the same search.
+#After every solution the cost is at most bound times the optimal cost, where bound = min(epsilon, cost / min(g + h)) over
+#OPEN and INCONS; if report is given it is called with (cost, bound, nodes expanded, seconds elapsed) for every solution.
+#The search stops when bound reaches 1 (the solution is optimal) or after time_limit seconds, returning the best solution
+#found so far (-1 if the time ran out before the first one).
+def ARA_star(start_state, goal_state, graph, time_limit=None, weight=3.0, decrement=0.5, lazy=False, report=None, observer=None):
+    begin = time.perf_counter()
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    goal = goal_state.state_hash()
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    width = graph.width
+
+    #the octile distance, as in A_star
+    def func_heuristic(index):
+        X_change = abs(index % width - goal_x)
+        Y_change = abs(index // width - goal_y)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    start = start_state.state_hash()
+    epsilon = weight
+    start_state.set_g(0)
+    start_state.set_cost(epsilon*func_heuristic(start))
+    list_heap = IndexedHeap(lazy)
+    list_heap.push(start, start_state.get_cost(), start_state)
+    Dict_hash = {start: start_state}
+    closed = set()
+    incons = {}
+    cost = -1
+    expand_ara = 0
+
+    while True:
+        #improving the solution with the current epsilon -- until no node in OPEN can lead to a cheaper one
+        while len(list_heap) != 0:
+            if goal in Dict_hash and Dict_hash[goal].get_g() <= list_heap.top_priority():
+                break
+            if time_limit is not None and time.perf_counter() - begin > time_limit:
+                if observer is not None:
+                    observer.terminate(cost, expand_ara)
+                return cost, expand_ara
+            n = list_heap.pop()
+            closed.add(n.state_hash())
+            expand_ara += 1
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 0)
+            for hash_i, step in graph.neighbors(n.state_hash()):
+                g_i = n.get_g() + step
+                if hash_i in Dict_hash and g_i >= Dict_hash[hash_i].get_g():
+                    continue
+                if hash_i not in Dict_hash:
+                    Dict_hash[hash_i] = State(hash_i % width, hash_i // width)
+                    if observer is not None:
+                        observer.generate(hash_i, g_i, 0)
+                elif observer is not None:
+                    observer.reopen(hash_i, g_i, 0)
+                i = Dict_hash[hash_i]
+                i.set_g(g_i)
+                i.set_cost(g_i + epsilon*func_heuristic(hash_i))
+                if hash_i in closed:
+                    #already expanded in this search -- it waits in INCONS for the next one
+                    incons[hash_i] = i
+                elif hash_i in list_heap:
+                    list_heap.decrease_key(hash_i, i.get_cost())
+                else:
+                    list_heap.push(hash_i, i.get_cost(), i)
+        if goal not in Dict_hash:
+            if observer is not None:
+                observer.terminate(-1, expand_ara)
+            return -1, expand_ara
+        cost = Dict_hash[goal].get_g()
+
+        candidates = list_heap.items() + list(incons.items())
+        lower_bound = min((i.get_g() + func_heuristic(hash_i) for hash_i, i in candidates), default=float('inf'))
+        bound = max(1.0, min(epsilon, cost / lower_bound)) if lower_bound > 0 else 1.0
+        if report is not None:
+            report(cost, bound, expand_ara, time.perf_counter() - begin)
+        if bound <= 1 or (time_limit is not None and time.perf_counter() - begin > time_limit):
+            if observer is not None:
+                observer.terminate(cost, expand_ara)
+            return cost, expand_ara
+
+        #next search -- smaller epsilon, INCONS moved to OPEN, and every f-value recomputed with the new epsilon
+        epsilon = max(1.0, epsilon - decrement)
+        list_heap = IndexedHeap(lazy)
+        for hash_i, i in candidates:
+            i.set_cost(i.get_g() + epsilon*func_heuristic(hash_i))
+            list_heap.push(hash_i, i.get_cost(), i)
+        incons = {}
+        closed = set()
+
+
 #Creating an code to implement the Bi-A* Algorithm -- in which we bassically run the A* from both the directions.
 #Bi-A* encounters a solution path once a state is visited in both searches.
-def bi_A_stars(start_state,goal_state,graph):
+#buckets selects the OPEN lists as in A_star, and the heuristic of graphs that are not grids is the one given by the graph, as in A_star;
+#the backward search follows the arcs entering the nodes (graph.predecessors), which on a grid are the neighbors.
+def bi_A_stars(start_state,goal_state,graph,lazy=False,observer=None,buckets=False):
     #Defining The initial states in the bi_A_stars algorithm
     global bi_num
-    list_openf = [start_state]
-    list_openb = [goal_state]
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    if hasattr(graph, "heuristic_to"):
+        h_graph_f = graph.heuristic_to(goal_state)
+        h_graph_b = graph.heuristic_to(start_state)
+    else:
+        h_graph_f = h_graph_b = None
+    list_openf = BucketQueue() if buckets else IndexedHeap(lazy)
+    list_openb = BucketQueue() if buckets else IndexedHeap(lazy)
+    list_openf.push(start_state.state_hash(), start_state.get_cost(), start_state)
+    list_openb.push(goal_state.state_hash(), goal_state.get_cost(), goal_state)
     dict_closedf = {}
     dict_closedb = {}
     dict_closedf[start_state.state_hash()] = start_state
@@ -160,59 +300,93 @@ def bi_A_stars(start_state,goal_state,graph):
     expand_bi_a_star = 0
 
     while len(list_openf)!=0 and len(list_openb)!=0:
-        if cost<=list_openf[0].get_cost() or cost<=list_openb[0].get_cost():
+        if cost<=list_openf.top().get_cost() or cost<=list_openb.top().get_cost():
+            if observer is not None:
+                observer.terminate(cost, expand_bi_a_star)
             return cost, expand_bi_a_star
         #Doing forward expansion
-        if list_openf[0] < list_openb[0]:
-            n = heapq.heappop(list_openf)
+        if list_openf.top() < list_openb.top():
+            n = list_openf.pop()
             expand_bi_a_star +=1
-            bacha = graph.successors(n)
-            for i in bacha:
-                X_change = abs(i.get_x()-goal_state.get_x())
-                Y_change = abs(i.get_y()-goal_state.get_y())
-                func_heuristic = 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
-                i.set_cost(i.get_g() + func_heuristic)
-                hash_i = i.state_hash()
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 0)
+            for hash_i, step in graph.neighbors(n.state_hash()):
+                g_i = n.get_g() + step
+                y_i, x_i = divmod(hash_i, graph.width)
+                if h_graph_f is None:
+                    X_change = abs(x_i-goal_state.get_x())
+                    Y_change = abs(y_i-goal_state.get_y())
+                    func_heuristic = 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+                else:
+                    func_heuristic = h_graph_f(hash_i)
+                f_i = g_i + func_heuristic
                 if hash_i in dict_closedb:
-                    cost = min(cost, dict_closedb[i.state_hash()].get_cost() + i.get_cost())
-                if hash_i in dict_closedf and i < dict_closedf[hash_i]:
+                    if observer is not None and dict_closedb[hash_i].get_cost() + f_i < cost:
+                        observer.meet(hash_i, dict_closedb[hash_i].get_cost() + f_i)
+                    cost = min(cost, dict_closedb[hash_i].get_cost() + f_i)
+                if hash_i in dict_closedf and f_i < dict_closedf[hash_i].get_cost():
                     # updating closed_hash and open_heap with new g value
-                    dict_closedf[hash_i].set_g(i.get_g())
+                    dict_closedf[hash_i].set_g(g_i)
                     #In this condition we dont update the parent  --- PATH isnt neccessary
-                    # heapify open_heap
-                    dict_closedf[hash_i].set_cost(i.get_g() + func_heuristic)
-                    heapq.heapify(list_openf)
+                    # decrease-key in open_heap
+                    dict_closedf[hash_i].set_cost(f_i)
+                    if hash_i in list_openf:
+                        list_openf.decrease_key(hash_i, f_i)
+                    if observer is not None:
+                        observer.reopen(hash_i, g_i, 0)
                 if hash_i not in dict_closedf:
                     # adding i in open_heap and closed_hash
-                    heapq.heappush(list_openf, i)
+                    i = State(x_i, y_i)
+                    i.set_g(g_i)
+                    i.set_cost(f_i)
+                    list_openf.push(hash_i, f_i, i)
                     dict_closedf[hash_i] = i
+                    if observer is not None:
+                        observer.generate(hash_i, g_i, 0)
         #doing backward expansion
         else:
-            n = heapq.heappop(list_openb)
+            n = list_openb.pop()
             expand_bi_a_star +=1
-            bacha = graph.successors(n)
-            for i in bacha:
-                X_change = abs(i.get_x()-start_state.get_x())
-                Y_change = abs(i.get_y()-start_state.get_y())
-                func_heuristic = 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
-                i.set_cost(i.get_g() + func_heuristic)
-                hash_i = i.state_hash()
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 1)
+            for hash_i, step in graph.predecessors(n.state_hash()):
+                g_i = n.get_g() + step
+                y_i, x_i = divmod(hash_i, graph.width)
+                if h_graph_b is None:
+                    X_change = abs(x_i-start_state.get_x())
+                    Y_change = abs(y_i-start_state.get_y())
+                    func_heuristic = 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+                else:
+                    func_heuristic = h_graph_b(hash_i)
+                f_i = g_i + func_heuristic
                 if hash_i in dict_closedf:
-                    cost = min(cost, dict_closedf[i.state_hash()].get_cost() + i.get_cost())
-                if hash_i in dict_closedb and i < dict_closedb[hash_i]:
+                    if observer is not None and dict_closedf[hash_i].get_cost() + f_i < cost:
+                        observer.meet(hash_i, dict_closedf[hash_i].get_cost() + f_i)
+                    cost = min(cost, dict_closedf[hash_i].get_cost() + f_i)
+                if hash_i in dict_closedb and f_i < dict_closedb[hash_i].get_cost():
                     # updating closed_hash and open_heap with new g value
-                    dict_closedb[hash_i].set_g(i.get_g())
+                    dict_closedb[hash_i].set_g(g_i)
                     #In this condition we dont update the parent  --- PATH isnt neccessary
-                    # heapify open_heap
-                    dict_closedb[hash_i].set_cost(i.get_g() + func_heuristic)
-                    heapq.heapify(list_openb)
+                    # decrease-key in open_heap
+                    dict_closedb[hash_i].set_cost(f_i)
+                    if hash_i in list_openb:
+                        list_openb.decrease_key(hash_i, f_i)
+                    if observer is not None:
+                        observer.reopen(hash_i, g_i, 1)
                 if hash_i not in dict_closedb:
                     # adding i in open_heap and closed_hash
-                    heapq.heappush(list_openb, i)
+                    i = State(x_i, y_i)
+                    i.set_g(g_i)
+                    i.set_cost(f_i)
+                    list_openb.push(hash_i, f_i, i)
                     dict_closedb[hash_i] = i
+                    if observer is not None:
+                        observer.generate(hash_i, g_i, 1)
     #plotting the map 
     #graph.plot_map(dict_closedb, start_state, goal_state, 'solution-maps/bi_A_stars/' + str(bi_num))
     #bi_num += 1
+    if observer is not None:
+        observer.terminate(-1, expand_bi_a_star)
     return -1,expand_bi_a_star
 
 
@@ -231,11 +405,19 @@ def func_heuristic(self,goal_state):
 
 
 #Creating an code to implement the MM Algorithm -- The bidirectional search algorithm that uses the p-function is known as Meet in the Middle (MM 
-def Middle_Meet(start_state,goal_state,graph):
+#buckets selects the OPEN lists as in A_star.
+def Middle_Meet(start_state,goal_state,graph,lazy=False,observer=None,buckets=False):
     #Defining The initial states in the meet in the middle algorithm 
     global m_num
-    list_openf = [start_state]
-    list_openb = [goal_state]
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    list_openf = BucketQueue() if buckets else IndexedHeap(lazy)
+    list_openb = BucketQueue() if buckets else IndexedHeap(lazy)
+    list_openf.push(start_state.state_hash(), start_state.get_cost(), start_state)
+    list_openb.push(goal_state.state_hash(), goal_state.get_cost(), goal_state)
     dict_closedf = {}
     dict_closedb = {}
     dict_closedf[start_state.state_hash()] = start_state
@@ -245,57 +427,341 @@ def Middle_Meet(start_state,goal_state,graph):
 
     while len(list_openf)!=0 and len(list_openb)!=0:
         if  cost <= max(
-            (list_openf[0].get_g() + list_openb[0].get_g()), 
-            (func_heuristic(list_openf[0],goal_state)),
-            (func_heuristic(list_openb[0],start_state)),
-            (min(list_openf[0].get_cost(), list_openb[0].get_cost()))):
+            (list_openf.top().get_g() + list_openb.top().get_g()), 
+            (func_heuristic(list_openf.top(),goal_state)),
+            (func_heuristic(list_openb.top(),start_state)),
+            (min(list_openf.top().get_cost(), list_openb.top().get_cost()))):
+            if observer is not None:
+                observer.terminate(cost/2.0, expanded_Middle_Meet)
             return cost/2.0, expanded_Middle_Meet
         #Doing forward implementation
-        if list_openf[0] < list_openb[0]:
-            n = heapq.heappop(list_openf)
+        if list_openf.top() < list_openb.top():
+            n = list_openf.pop()
             expanded_Middle_Meet +=1
-            bacha = graph.successors(n)
-            for i in bacha:
-                #implementing the heuristic function
-                i.set_cost(P_value(i,goal_state))
-                hash_i = i.state_hash()
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 0)
+            for hash_i, step in graph.neighbors(n.state_hash()):
+                g_i = n.get_g() + step
+                y_i, x_i = divmod(hash_i, graph.width)
+                #implementing the heuristic function -- p(n) = max(f(n), 2 × g(n)) as in P_value
+                X_change = abs(x_i-goal_state.get_x())
+                Y_change = abs(y_i-goal_state.get_y())
+                p_i = max(g_i + 1.5*min(X_change, Y_change)+abs(X_change-Y_change), 2*g_i)
                 if hash_i in dict_closedb:
-                    cost = min(cost, dict_closedb[i.state_hash()].get_cost() + i.get_cost())
-                if hash_i in dict_closedf and i < dict_closedf[hash_i]:
+                    if observer is not None and dict_closedb[hash_i].get_cost() + p_i < cost:
+                        observer.meet(hash_i, (dict_closedb[hash_i].get_cost() + p_i)/2.0)
+                    cost = min(cost, dict_closedb[hash_i].get_cost() + p_i)
+                if hash_i in dict_closedf and p_i < dict_closedf[hash_i].get_cost():
                     # updating closed_hash and open_heap with new g value
-                    dict_closedf[hash_i].set_g(i.get_g())
+                    dict_closedf[hash_i].set_g(g_i)
                     #In this condition we dont update the parent  --- PATH isnt neccessary
-                    # heapify open_heap
-                    dict_closedf[hash_i].set_cost(i.get_cost())
-                    heapq.heapify(list_openf)
+                    # decrease-key in open_heap
+                    dict_closedf[hash_i].set_cost(p_i)
+                    if hash_i in list_openf:
+                        list_openf.decrease_key(hash_i, p_i)
+                    if observer is not None:
+                        observer.reopen(hash_i, g_i, 0)
                 if hash_i not in dict_closedf:
                     # adding i in open_heap and closed_hash
-                    heapq.heappush(list_openf, i)
+                    i = State(x_i, y_i)
+                    i.set_g(g_i)
+                    i.set_cost(p_i)
+                    list_openf.push(hash_i, p_i, i)
                     dict_closedf[hash_i] = i
+                    if observer is not None:
+                        observer.generate(hash_i, g_i, 0)
         #Doing backward implementation
         else:
-            n = heapq.heappop(list_openb)
+            n = list_openb.pop()
             expanded_Middle_Meet +=1
-            bacha = graph.successors(n)
-            for i in bacha:
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), 1)
+            for hash_i, step in graph.neighbors(n.state_hash()):
+                g_i = n.get_g() + step
+                y_i, x_i = divmod(hash_i, graph.width)
                 #implementing the heuristic function 
-                i.set_cost(P_value(i,start_state))
-                hash_i = i.state_hash()
+                X_change = abs(x_i-start_state.get_x())
+                Y_change = abs(y_i-start_state.get_y())
+                p_i = max(g_i + 1.5*min(X_change, Y_change)+abs(X_change-Y_change), 2*g_i)
                 if hash_i in dict_closedf:
-                    cost = min(cost, dict_closedf[i.state_hash()].get_cost() + i.get_cost())
-                if hash_i in dict_closedb and i < dict_closedb[hash_i]:
+                    if observer is not None and dict_closedf[hash_i].get_cost() + p_i < cost:
+                        observer.meet(hash_i, (dict_closedf[hash_i].get_cost() + p_i)/2.0)
+                    cost = min(cost, dict_closedf[hash_i].get_cost() + p_i)
+                if hash_i in dict_closedb and p_i < dict_closedb[hash_i].get_cost():
                     # updating closed_hash and open_heap with new g value
-                    dict_closedb[hash_i].set_g(i.get_g())
+                    dict_closedb[hash_i].set_g(g_i)
                     #In this condition we dont update the parent  --- PATH isnt neccessary
-                    # heapify open_heap
-                    dict_closedb[hash_i].set_cost(i.get_cost())
-                    heapq.heapify(list_openb)
+                    # decrease-key in open_heap
+                    dict_closedb[hash_i].set_cost(p_i)
+                    if hash_i in list_openb:
+                        list_openb.decrease_key(hash_i, p_i)
+                    if observer is not None:
+                        observer.reopen(hash_i, g_i, 1)
                 if hash_i not in dict_closedb:
                     # adding i in open_heap and closed_hash
-                    heapq.heappush(list_openb, i)
+                    i = State(x_i, y_i)
+                    i.set_g(g_i)
+                    i.set_cost(p_i)
+                    list_openb.push(hash_i, p_i, i)
                     dict_closedb[hash_i] = i
+                    if observer is not None:
+                        observer.generate(hash_i, g_i, 1)
     #Plotting the map
     #graph.plot_map(dict_closedb, start_state, goal_state, 'solution-maps/Middle_Meet/' + str(bi_num))
     #bi_num += 1
+    if observer is not None:
+        observer.terminate(-1, expanded_Middle_Meet)
     return -1,expanded_Middle_Meet
 
+
+
+#Creating an code to implement NBS (Near-optimal Bidirectional Search, Chen et al. 2017) -- NBS expands pairs of nodes, one
+#from each direction, choosing the pair (u, v) with the smallest lower bound max(f_f(u), f_b(v), g_f(u) + g_b(v)) on the cost of
+#a solution through both of them. This guarantees at most twice the number of expansions that any admissible bidirectional
+#search needs on the same problem.
+#Every direction keeps its OPEN list in two queues: waiting, sorted by f, and ready, sorted by g, with the nodes whose f is at most
+#the current lower bound. The best pair is the two ready nodes with the smallest g -- the lower bound only increases, so a node
+#moves from waiting to ready once and the f-values are never computed again for the termination test.
+#buckets selects the queues as in A_star.
+def NBS(start_state,goal_state,graph,lazy=False,observer=None,buckets=False):
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    width = graph.width
+
+    #the octile distance to the goal of each direction
+    def func_heuristic(index, target):
+        X_change = abs(index % width - target.get_x())
+        Y_change = abs(index // width - target.get_y())
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    #forward and backward searches: waiting queue, ready queue, states reached, target of the heuristic
+    waiting = [BucketQueue() if buckets else IndexedHeap(lazy) for _ in range(2)]
+    ready = [BucketQueue() if buckets else IndexedHeap(lazy) for _ in range(2)]
+    dict_closed = [{}, {}]
+    targets = [goal_state, start_state]
+    for direction, state in enumerate((start_state, goal_state)):
+        state.set_g(0)
+        state.set_cost(func_heuristic(state.state_hash(), targets[direction]))
+        waiting[direction].push(state.state_hash(), state.get_cost(), state)
+        dict_closed[direction][state.state_hash()] = state
+
+    cost = 0 if start_state == goal_state else float('inf')
+    lower_bound = 0
+    expanded_nbs = 0
+
+    while True:
+        #finding the best pair -- moving the nodes with f <= lower_bound to ready and raising lower_bound until the two ready
+        #nodes with the smallest g have g_f + g_b <= lower_bound
+        while True:
+            for direction in (0, 1):
+                while len(waiting[direction]) != 0 and waiting[direction].top_priority() <= lower_bound:
+                    n = waiting[direction].pop()
+                    ready[direction].push(n.state_hash(), n.get_g(), n)
+            if len(ready[0]) != 0 and len(ready[1]) != 0 and ready[0].top_priority() + ready[1].top_priority() <= lower_bound:
+                break
+            next_bound = float('inf')
+            for direction in (0, 1):
+                if len(waiting[direction]) != 0:
+                    next_bound = min(next_bound, waiting[direction].top_priority())
+            #a direction without nodes in OPEN cannot meet the other one anymore
+            if len(waiting[0]) + len(ready[0]) == 0 or len(waiting[1]) + len(ready[1]) == 0:
+                next_bound = float('inf')
+            if len(ready[0]) != 0 and len(ready[1]) != 0:
+                next_bound = min(next_bound, ready[0].top_priority() + ready[1].top_priority())
+            if next_bound == float('inf') or cost <= next_bound:
+                lower_bound = next_bound
+                break
+            lower_bound = next_bound
+        #no pair can lead to a solution cheaper than the one found
+        if cost <= lower_bound:
+            if observer is not None:
+                observer.terminate(cost if cost != float('inf') else -1, expanded_nbs)
+            return (cost if cost != float('inf') else -1), expanded_nbs
+
+        #expanding the pair -- the forward node and then the backward node
+        for direction in (0, 1):
+            if len(ready[direction]) == 0:
+                continue
+            n = ready[direction].pop()
+            expanded_nbs += 1
+            if observer is not None:
+                observer.expand(n.state_hash(), n.get_g(), direction)
+            dict_open = dict_closed[direction]
+            dict_other = dict_closed[1 - direction]
+            for hash_i, step in graph.neighbors(n.state_hash()):
+                g_i = n.get_g() + step
+                if hash_i in dict_open:
+                    i = dict_open[hash_i]
+                    if g_i >= i.get_g():
+                        continue
+                    #updating the node with the new g value -- it goes back to waiting if it was expanded or ready
+                    i.set_g(g_i)
+                    i.set_cost(g_i + func_heuristic(hash_i, targets[direction]))
+                    if hash_i in waiting[direction]:
+                        waiting[direction].decrease_key(hash_i, i.get_cost())
+                    elif hash_i in ready[direction]:
+                        ready[direction].decrease_key(hash_i, g_i)
+                    else:
+                        waiting[direction].push(hash_i, i.get_cost(), i)
+                    if observer is not None:
+                        observer.reopen(hash_i, g_i, direction)
+                else:
+                    # adding i in waiting and dict_closed
+                    y_i, x_i = divmod(hash_i, width)
+                    i = State(x_i, y_i)
+                    i.set_g(g_i)
+                    i.set_cost(g_i + func_heuristic(hash_i, targets[direction]))
+                    waiting[direction].push(hash_i, i.get_cost(), i)
+                    dict_open[hash_i] = i
+                    if observer is not None:
+                        observer.generate(hash_i, g_i, direction)
+                if hash_i in dict_other and g_i + dict_other[hash_i].get_g() < cost:
+                    cost = g_i + dict_other[hash_i].get_g()
+                    if observer is not None:
+                        observer.meet(hash_i, cost)
+
+
+#Creating an code to implement Fringe Search -- the f-limited iterations of IDA* but without repeating the work of
+#the previous iterations: the nodes whose f-value is above the limit are kept in a "later" list and become the
+#"now" list of the next iteration. There is no heap (OPEN is two plain lists) and no State objects, only the g-values
+#of the nodes visited, which makes it lighter than A* on huge maps.
+def fringe_search(start_state, goal_state, graph, observer=None):
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    goal = goal_state.state_hash()
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    width = graph.width
+
+    #the octile distance, as in A_star
+    def func_heuristic(index):
+        X_change = abs(index % width - goal_x)
+        Y_change = abs(index // width - goal_y)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    start = start_state.state_hash()
+    #cache of the g-values of the nodes visited; an entry (index, g) of the lists is stale if cache[index] != g
+    cache = {start: 0}
+    now = [(start, 0)]
+    later = []
+    f_limit = func_heuristic(start)
+    expanded_fringe = 0
+
+    while now:
+        f_min = float('inf')
+        while now:
+            index, g = now.pop()
+            if cache[index] != g:
+                continue
+            f = g + func_heuristic(index)
+            if f > f_limit:
+                #the node waits for the next iteration
+                f_min = min(f_min, f)
+                later.append((index, g))
+                continue
+            if index == goal:
+                if observer is not None:
+                    observer.terminate(g, expanded_fringe)
+                return g, expanded_fringe
+            expanded_fringe += 1
+            if observer is not None:
+                observer.expand(index, g, 0)
+            #children are pushed on top of now, so that they are visited right after their parent
+            for hash_i, step in graph.neighbors(index):
+                g_i = g + step
+                if hash_i in cache and cache[hash_i] <= g_i:
+                    continue
+                if observer is not None:
+                    if hash_i in cache:
+                        observer.reopen(hash_i, g_i, 0)
+                    else:
+                        observer.generate(hash_i, g_i, 0)
+                cache[hash_i] = g_i
+                now.append((hash_i, g_i))
+        f_limit = f_min
+        later.reverse()
+        now, later = later, []
+    if observer is not None:
+        observer.terminate(-1, expanded_fringe)
+    return -1, expanded_fringe
+
+
+#Creating an code to implement IDA* -- a depth-first search bounded by an f-value threshold, repeated with the smallest
+#f-value above the previous threshold until the goal is found. The depth-first search is iterative (the paths can be
+#thousands of steps long) and only keeps the current path in memory, plus a transposition table of at most
+#table_size entries with the smallest g-value with which each node was reached in the current iteration: a node
+#reached again with a g-value that is not smaller is pruned. When the table is full new nodes are not stored, which
+#costs time (duplicate paths are searched again) but never memory or optimality.
+def IDA_star(start_state, goal_state, graph, table_size=1 << 20, observer=None):
+    #Rejecting the problems whose start and goal are in different components of the map
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    goal = goal_state.state_hash()
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    width = graph.width
+
+    #the octile distance, as in A_star
+    def func_heuristic(index):
+        X_change = abs(index % width - goal_x)
+        Y_change = abs(index // width - goal_y)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    start = start_state.state_hash()
+    #the goal is only detected on the children generated, so a problem already solved is answered here
+    if start == goal:
+        if observer is not None:
+            observer.terminate(0, 0)
+        return 0, 0
+    threshold = func_heuristic(start)
+    expanded_ida = 0
+
+    while threshold != float('inf'):
+        table = {start: 0}
+        on_path = {start}
+        next_threshold = float('inf')
+        #every entry of the stack is a node of the current path with its g-value and its children not yet visited
+        stack = [(start, 0, iter(graph.neighbors(start)))]
+        expanded_ida += 1
+        if observer is not None:
+            observer.expand(start, 0, 0)
+        while stack:
+            index, g, children = stack[-1]
+            for hash_i, step in children:
+                g_i = g + step
+                if hash_i in on_path:
+                    continue
+                if hash_i in table and table[hash_i] <= g_i:
+                    continue
+                f_i = g_i + func_heuristic(hash_i)
+                if f_i > threshold:
+                    next_threshold = min(next_threshold, f_i)
+                    continue
+                if hash_i == goal:
+                    if observer is not None:
+                        observer.terminate(g_i, expanded_ida)
+                    return g_i, expanded_ida
+                if hash_i in table or len(table) < table_size:
+                    table[hash_i] = g_i
+                on_path.add(hash_i)
+                stack.append((hash_i, g_i, iter(graph.neighbors(hash_i))))
+                expanded_ida += 1
+                if observer is not None:
+                    observer.expand(hash_i, g_i, 0)
+                break
+            else:
+                #all children visited -- backtracking
+                stack.pop()
+                on_path.discard(index)
+        threshold = next_threshold
+    if observer is not None:
+        observer.terminate(-1, expanded_ida)
+    return -1, expanded_ida
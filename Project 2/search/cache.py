@@ -0,0 +1,61 @@
+import os
+import numpy as np
+
+def sidecar_path(map_file, name):
+    """
+    Returns the path of the file that caches the data called name for the map stored in map_file.
+    Cached data is stored next to the map file, e.g., dao-map/brc000d.map.jps.npy
+    """
+    return map_file + "." + name + ".npy"
+
+def source_stamp(files):
+    """
+    Returns the size and the modification time (in nanoseconds) of every file in files, as an int64 array
+    """
+    stamp = []
+    for file_name in files:
+        status = os.stat(file_name)
+        stamp += [status.st_size, status.st_mtime_ns]
+    return np.array(stamp, dtype=np.int64)
+
+def load_sidecar(map_file, name, depends=()):
+    """
+    Returns the array cached for the map in map_file, memory-mapped in read-only mode, or None if the
+    cache does not exist or was not computed from the current map file. The size and the modification time
+    of the map file (and of the files in depends, if the data also comes from them) are stored next to the
+    cache when it is saved and must be the same, so a map replaced by another file is never served the
+    cache of the old one, even if the new file is older (e.g., copied with cp -p or checked out).
+    """
+    path = sidecar_path(map_file, name)
+    try:
+        stamp = np.load(sidecar_path(map_file, name + "-source"))
+        if not np.array_equal(stamp, source_stamp((map_file,) + tuple(depends))):
+            return None
+        return np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+def stamp_sidecar(map_file, name, depends=()):
+    """
+    Records that the cache called name was computed from the current map file (and the files in depends);
+    called by save_sidecar, or after writing a cache directly at sidecar_path
+    """
+    _save(sidecar_path(map_file, name + "-source"), source_stamp((map_file,) + tuple(depends)))
+
+def save_sidecar(map_file, name, data, depends=()):
+    """
+    Stores an array in the cache of the map in map_file (see load_sidecar). Failures to write the cache
+    (e.g., read-only folders) are ignored, as the data can always be recomputed.
+    """
+    try:
+        _save(sidecar_path(map_file, name), data)
+        # the stamp is written after the data, so a reader never pairs a new stamp with the old data
+        stamp_sidecar(map_file, name, depends)
+    except OSError:
+        pass
+
+def _save(path, data):
+    # writing to a temporary file first so that other processes never load a partial file
+    with open(path + ".tmp", 'wb') as cache_file:
+        np.save(cache_file, data)
+    os.replace(path + ".tmp", path)
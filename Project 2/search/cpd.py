@@ -0,0 +1,181 @@
+from bisect import bisect_right
+from multiprocessing import Pool
+import numpy as np
+from search.algorithms import State
+from search.cache import load_sidecar, save_sidecar
+from search.distances import one_to_all
+from search.map import Map
+
+# first move of the cells that are not reachable from the source (and of the source itself); these
+# cells are never queried, so they take the move of the run they fall in
+NO_MOVE = 8
+
+# map and distance backend of the current worker process of build_cpd; set once by _init_worker
+_worker_map = None
+_worker_backend = None
+
+def first_moves(graph, source, backend="wavefront"):
+    """
+    Runs a one-to-all search from source with the given backend of search.distances.one_to_all and
+    returns a uint8 array indexed by state_hash with the first move (an index of Map.moves) of a shortest
+    path from source to every cell, or NO_MOVE for unreachable cells and for the source.
+    """
+    distances, parent = one_to_all(graph, source, parents=True, backend=backend)
+    moves = np.full(len(distances), NO_MOVE, dtype=np.uint8)
+    reached = np.flatnonzero(np.isfinite(distances))
+    reached = reached[np.argsort(distances[reached], kind="stable")][1:]
+    if len(reached) == 0:
+        return moves
+
+    offsets = np.array([offset for _, _, offset, _ in graph.moves])
+    order = np.argsort(offsets)
+    children = reached[parent[reached] == source]
+    moves[children] = order[np.searchsorted(offsets, children - source, sorter=order)]
+
+    # a cell inherits the first move of its parent, which is closer to the source; the cells are
+    # processed in groups of equal distance so that every parent is done before its children
+    levels = distances[reached]
+    boundaries = np.flatnonzero(np.diff(levels)) + 1
+    for group in np.split(reached, boundaries):
+        group = group[parent[group] != source]
+        moves[group] = moves[parent[group]]
+    return moves
+
+def compress(moves):
+    """
+    Run-length encodes a row of first moves: returns the int32 array of the state_hashes where the runs
+    start and the uint8 array of the move of every run. Cells with NO_MOVE extend the run before them.
+    """
+    known = moves != NO_MOVE
+    if not known.any():
+        return np.zeros(1, dtype=np.int32), np.zeros(1, dtype=np.uint8)
+    last_known = np.maximum.accumulate(np.where(known, np.arange(len(moves)), -1))
+    filled = moves[np.maximum(last_known, np.argmax(known))]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(filled)) + 1))
+    return starts.astype(np.int32), filled[starts]
+
+def _init_worker(map_file, backend):
+    global _worker_map, _worker_backend
+    _worker_map = Map(map_file)
+    _worker_backend = backend
+
+def _build_rows(sources):
+    return [(source,) + compress(first_moves(_worker_map, source, _worker_backend)) for source in sources]
+
+def build_cpd(map_file, workers=None, chunk_size=32, backend="wavefront"):
+    """
+    Builds the compressed path database of the map in map_file on a pool of worker processes (workers=None
+    uses one worker per CPU), running a one-to-all search from every traversable cell with the given
+    backend of search.distances.one_to_all. The database is stored as three arrays cached next to the map
+    file: the run starts and run moves of all sources, and the offset of the runs of every source (indexed
+    by state_hash, with one extra entry at the end).
+    """
+    graph = Map(map_file)
+    size = graph.width * graph.height
+    sources = np.flatnonzero(np.asarray(graph.data_int).reshape(-1) == 0).tolist()
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+
+    rows = {}
+    with Pool(workers, initializer=_init_worker, initargs=(map_file, backend)) as pool:
+        for chunk in pool.imap_unordered(_build_rows, chunks):
+            for source, starts, moves in chunk:
+                rows[source] = (starts, moves)
+
+    lengths = np.zeros(size + 1, dtype=np.int64)
+    for source, (starts, _) in rows.items():
+        lengths[source + 1] = len(starts)
+    offsets = np.cumsum(lengths)
+    ordered = [rows[source] for source in sorted(rows)]
+    run_starts = np.concatenate([starts for starts, _ in ordered]) if ordered else np.zeros(0, dtype=np.int32)
+    run_moves = np.concatenate([moves for _, moves in ordered]) if ordered else np.zeros(0, dtype=np.uint8)
+    save_sidecar(map_file, "cpd-offsets", offsets)
+    save_sidecar(map_file, "cpd-starts", run_starts)
+    save_sidecar(map_file, "cpd-moves", run_moves)
+    return offsets, run_starts, run_moves
+
+class CPD:
+    """
+    Compressed path database: for every pair of traversable cells (s, t) it stores the first move of a
+    shortest path from s to t, as one run-length encoded row per source. Paths are extracted by moving
+    to the cell given by the first move from the current cell to t until t is reached, so queries do not
+    search; each lookup is a binary search in the runs of the current cell.
+
+    The database is built offline with build_cpd and memory-mapped from the cache next to the map file.
+    If the cache does not exist or was not built from the current map file (its size and modification time
+    differ from those stored with the cache), the constructor builds it with the given number of worker
+    processes and distance backend.
+
+    The database describes the map file, so it cannot follow the changes made in memory with
+    Map.set_traversable: the constructor and the queries raise ValueError if the map was changed (version
+    records the Map.version of the map it was loaded for).
+    """
+    def __init__(self, graph, workers=None, backend="wavefront"):
+        self.graph = graph
+        if graph.version != 0:
+            raise ValueError("%s was changed in memory, its path database cannot be built" % graph.file_name)
+        self.version = graph.version
+        offsets = load_sidecar(graph.file_name, "cpd-offsets")
+        starts = load_sidecar(graph.file_name, "cpd-starts")
+        moves = load_sidecar(graph.file_name, "cpd-moves")
+        if (offsets is None or starts is None or moves is None or offsets.shape != (graph.width * graph.height + 1,)
+                or len(starts) != offsets[-1] or len(moves) != offsets[-1]):
+            offsets, starts, moves = build_cpd(graph.file_name, workers, backend=backend)
+        self.offsets = offsets
+        self.starts = starts
+        self.moves = moves
+        self._offsets = memoryview(np.ascontiguousarray(offsets))
+        self._starts = memoryview(np.ascontiguousarray(starts))
+        self._moves = memoryview(np.ascontiguousarray(moves))
+
+    def _check_version(self):
+        if self.graph.version != self.version:
+            raise ValueError("%s was changed in memory, its path database no longer applies" % self.graph.file_name)
+
+    def first_move(self, index, goal):
+        """
+        Returns the index in Map.moves of the first move of a shortest path from the cell index to the
+        cell goal (both state_hashes), which must be in the same component.
+        """
+        row = bisect_right(self._starts, goal, self._offsets[index], self._offsets[index + 1]) - 1
+        return self._moves[row]
+
+    def find_path(self, start_state, goal_state):
+        """
+        Returns the cost of a shortest path from start_state to goal_state and the list of its states, or
+        -1 and None if there is no path.
+        """
+        self._check_version()
+        if not self.graph.same_component(start_state, goal_state):
+            return -1, None
+        width = self.graph.width
+        moves = self.graph.moves
+        index = start_state.state_hash()
+        goal = goal_state.state_hash()
+        cost = 0
+        path = [State(index % width, index // width)]
+        while index != goal:
+            _, _, offset, step = moves[self.first_move(index, goal)]
+            index += offset
+            cost += step
+            path.append(State(index % width, index // width))
+        return cost, path
+
+    def search(self, start_state, goal_state):
+        """
+        Returns the cost of a shortest path from start_state to goal_state (-1 if there is no path) and the
+        number of table lookups, which replaces the number of nodes expanded of the search algorithms.
+        """
+        self._check_version()
+        if not self.graph.same_component(start_state, goal_state):
+            return -1, 0
+        moves = self.graph.moves
+        index = start_state.state_hash()
+        goal = goal_state.state_hash()
+        cost = 0
+        lookups = 0
+        while index != goal:
+            _, _, offset, step = moves[self.first_move(index, goal)]
+            index += offset
+            cost += step
+            lookups += 1
+        return cost, lookups
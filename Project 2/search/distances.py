@@ -0,0 +1,108 @@
+import heapq
+from array import array
+import numpy as np
+
+def dijkstra_distances(graph, sources, parents=False):
+    """
+    One-to-all version of Dijkstra's algorithm (Project 1): instead of stopping at a goal, the search
+    runs until OPEN is empty. sources is a state_hash or a list of state_hashes, all with g-value 0.
+
+    Returns a float64 numpy array indexed by state_hash with the cost of the shortest path from the
+    closest source to every cell (np.inf for unreachable and non-traversable cells). If parents is True
+    it also returns an int32 array with the state_hash of the parent of every cell in the shortest-path
+    tree (-1 for the sources and for unreachable cells).
+    """
+    if isinstance(sources, int):
+        sources = [sources]
+    size = graph.width * graph.height
+    distances = array('d', [float('inf')]) * size
+    closed = bytearray(size)
+    parent = array('l', [-1]) * size if parents else None
+    neighbors = graph.neighbors
+
+    open_heap = []
+    for source in sources:
+        distances[source] = 0
+        open_heap.append((0, source))
+    heapq.heapify(open_heap)
+
+    while open_heap:
+        g, n = heapq.heappop(open_heap)
+        if closed[n]:
+            continue
+        closed[n] = 1
+        for child, step in neighbors(n):
+            g_child = g + step
+            if g_child < distances[child]:
+                distances[child] = g_child
+                if parents:
+                    parent[child] = n
+                heapq.heappush(open_heap, (g_child, child))
+
+    distances = np.frombuffer(distances, dtype=np.float64).copy()
+    if parents:
+        return distances, np.frombuffer(parent, dtype=np.dtype('l')).astype(np.int32)
+    return distances
+
+def wavefront_distances(graph, sources, parents=False):
+    """
+    Vectorized version of dijkstra_distances with the same arguments and results. All action costs are
+    multiples of 0.5, so the distances are computed as integer numbers of half units with a bucketed
+    wavefront (Dial's algorithm): the cells at distance d are all expanded at once with NumPy, one array
+    operation per move, which finalizes the cells at distances d + 2 (straight moves) and d + 3 (diagonal
+    moves) before the next bucket is processed.
+
+    The grid is padded with a border of non-traversable cells so that moves never leave the array.
+    """
+    if isinstance(sources, int):
+        sources = [sources]
+    map_width = graph.width
+    width = map_width + 2
+    passable = np.pad(np.asarray(graph.data_int) == 0, 1, constant_values=False).reshape(-1)
+    unreached = np.iinfo(np.int32).max
+    half = np.full(passable.size, unreached, dtype=np.int32)
+    parent = np.full(passable.size, -1, dtype=np.int32) if parents else None
+    # straight moves first, so that a cell reached by both kinds of move keeps the cheaper one
+    moves = sorted(((dy * width + dx, int(2 * cost)) for dx, dy, _, cost in graph.moves), key=lambda move: move[1])
+
+    frontier = np.array([(source // map_width + 1) * width + source % map_width + 1 for source in sources], dtype=np.int64)
+    half[frontier] = 0
+    buckets = {0: [frontier]}
+    level = 0
+    while buckets:
+        if level not in buckets:
+            level += 1
+            continue
+        cells = np.concatenate(buckets.pop(level))
+        # cells improved after being added to this bucket are expanded with their new distance
+        cells = cells[half[cells] == level]
+        for offset, cost in moves:
+            children = cells + offset
+            better = passable[children] & (half[children] > level + cost)
+            if not better.any():
+                continue
+            children = children[better]
+            half[children] = level + cost
+            if parents:
+                parent[children] = cells[better]
+            buckets.setdefault(level + cost, []).append(children)
+        level += 1
+
+    half = half.reshape(graph.height + 2, width)[1:-1, 1:-1].reshape(-1)
+    distances = np.where(half == unreached, np.inf, half / 2.0)
+    if parents:
+        parent = parent.reshape(graph.height + 2, width)[1:-1, 1:-1].reshape(-1)
+        parent = np.where(parent >= 0, (parent // width - 1) * map_width + parent % width - 1, -1).astype(np.int32)
+        return distances, parent
+    return distances
+
+BACKENDS = {"dijkstra": dijkstra_distances, "wavefront": wavefront_distances}
+
+def one_to_all(graph, sources, parents=False, backend="wavefront"):
+    """
+    Computes the distances from sources to every cell of the map (see dijkstra_distances) with the given
+    backend: "dijkstra" (heapq, one cell at a time) or "wavefront" (NumPy, one distance at a time).
+    """
+    if backend not in BACKENDS:
+        raise ValueError("Unknown distance backend: " + str(backend))
+    return BACKENDS[backend](graph, sources, parents)
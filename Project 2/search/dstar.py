@@ -0,0 +1,167 @@
+import heapq
+from search.algorithms import State
+
+class DStarLite:
+    """
+    D* Lite (Koenig and Likhachev, 2002): incremental replanning for an agent moving from start to goal
+    on a map whose cells change (see Map.set_traversable). The search runs backward from the goal, so
+    the g-values it keeps are distances to the goal and remain valid when the agent moves. After the map
+    changes, update_cells repairs only the g-values affected by the changed cells instead of searching
+    again from scratch.
+
+    Every state has a g-value and an rhs-value (the one-step lookahead min over successors s' of
+    c(s, s') + g(s')); the states whose values differ are in the priority queue U, ordered by the keys
+    [min(g, rhs) + h(start, s) + km, min(g, rhs)], where h is the octile distance and km accumulates the
+    distance moved by the agent since the search started.
+    """
+    def __init__(self, graph, start_state, goal_state):
+        self.graph = graph
+        self.start = start_state.state_hash()
+        self.goal = goal_state.state_hash()
+        self._last_start = self.start
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        # U is a heap with lazy deletion: an entry (key, state) is current only if _keys[state] == key
+        self._queue = []
+        self._keys = {}
+        self._insert(self.goal, self._calculate_key(self.goal))
+        self.expanded = 0
+        # cost returned by the last call to plan (None before the first one)
+        self.cost = None
+
+    def _h(self, index):
+        width = self.graph.width
+        X_change = abs(index % width - self.start % width)
+        Y_change = abs(index // width - self.start // width)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    def _calculate_key(self, index):
+        best = min(self.g.get(index, float('inf')), self.rhs.get(index, float('inf')))
+        return (best + self._h(index) + self.km, best)
+
+    def _insert(self, index, key):
+        self._keys[index] = key
+        heapq.heappush(self._queue, (key, index))
+
+    def _top(self):
+        queue = self._queue
+        while queue and self._keys.get(queue[0][1]) != queue[0][0]:
+            heapq.heappop(queue)
+        return queue[0] if queue else None
+
+    def _traversable(self, index):
+        width = self.graph.width
+        return self.graph.data_int[index // width][index % width] == 0
+
+    def _update_vertex(self, index):
+        if index != self.goal:
+            best = float('inf')
+            if self._traversable(index):
+                g = self.g
+                for child, step in self.graph.neighbors(index):
+                    cost = step + g.get(child, float('inf'))
+                    if cost < best:
+                        best = cost
+            self.rhs[index] = best
+        self._keys.pop(index, None)
+        if self.g.get(index, float('inf')) != self.rhs.get(index, float('inf')):
+            self._insert(index, self._calculate_key(index))
+
+    def _compute_shortest_path(self):
+        g = self.g
+        rhs = self.rhs
+        while True:
+            top = self._top()
+            if top is None:
+                return
+            start_g = g.get(self.start, float('inf'))
+            start_rhs = rhs.get(self.start, float('inf'))
+            if top[0] >= self._calculate_key(self.start) and start_rhs == start_g:
+                return
+            k_old, u = top
+            k_new = self._calculate_key(u)
+            if k_old < k_new:
+                self._insert(u, k_new)
+                continue
+            heapq.heappop(self._queue)
+            del self._keys[u]
+            self.expanded += 1
+            if g.get(u, float('inf')) > rhs[u]:
+                g[u] = rhs[u]
+                for neighbor, step in self.graph.neighbors(u):
+                    if neighbor != self.goal and step + g[u] < rhs.get(neighbor, float('inf')):
+                        rhs[neighbor] = step + g[u]
+                        self._keys.pop(neighbor, None)
+                        if g.get(neighbor, float('inf')) != rhs[neighbor]:
+                            self._insert(neighbor, self._calculate_key(neighbor))
+            else:
+                g[u] = float('inf')
+                self._update_vertex(u)
+                for neighbor, _ in self.graph.neighbors(u):
+                    self._update_vertex(neighbor)
+
+    def plan(self):
+        """
+        Computes (or repairs) the shortest path from the current start to the goal. Returns its cost (-1 if
+        the goal is not reachable) and the number of nodes expanded by this call.
+        """
+        expanded = self.expanded
+        width = self.graph.width
+        start_state = State(self.start % width, self.start // width)
+        goal_state = State(self.goal % width, self.goal // width)
+        #Rejecting the problems whose start and goal are in different components of the map
+        if not self.graph.same_component(start_state, goal_state):
+            self.cost = -1
+            return -1, 0
+        self._compute_shortest_path()
+        cost = self.g.get(self.start, float('inf'))
+        self.cost = cost if cost != float('inf') else -1
+        return self.cost, self.expanded - expanded
+
+    def path(self):
+        """
+        Returns the list of states of the path from the current start to the goal given by the g-values
+        (call plan first), or None if the last call to plan found no path.
+        """
+        # plan returns early when the start and the goal are disconnected, leaving the g-values of the
+        # previous plan, which do not lead to the goal
+        if self.cost is None or self.cost == -1:
+            return None
+        width = self.graph.width
+        g = self.g
+        index = self.start
+        if g.get(index, float('inf')) == float('inf'):
+            return None
+        path = [State(index % width, index // width)]
+        visited = {index}
+        while index != self.goal:
+            index = min(self.graph.neighbors(index), key=lambda move: move[1] + g.get(move[0], float('inf')))[0]
+            # a cell visited twice means the g-values are not the ones of a path to the goal
+            if index in visited or g.get(index, float('inf')) == float('inf'):
+                return None
+            visited.add(index)
+            path.append(State(index % width, index // width))
+        return path
+
+    def move_start(self, start_state):
+        """
+        Moves the agent to start_state (usually the next state of the path); the g-values are not changed.
+        """
+        self.start = start_state.state_hash()
+
+    def update_cells(self, cells):
+        """
+        Receives the (x, y) pairs of the cells whose traversability changed on the map (after the calls to
+        Map.set_traversable) and updates the rhs-values of these cells and their neighbors. The next call to
+        plan repairs the path.
+        """
+        self.km += self._h(self._last_start)
+        self._last_start = self.start
+        width = self.graph.width
+        for x, y in cells:
+            index = y * width + x
+            self._update_vertex(index)
+            for i, j, offset, _ in self.graph.moves:
+                if 0 <= x + i < width and 0 <= y + j < self.graph.height:
+                    self._update_vertex(index + offset)
@@ -0,0 +1,195 @@
+import heapq
+from array import array
+
+class SearchEngine:
+    """
+    Alternate implementation of A*, Dijkstra's, Bi-A*, and MM that stores the search data in flat arrays
+    indexed by state_hash instead of dictionaries of State objects. For each search direction the engine
+    keeps one array of g-values, one of priorities (f- or p-values), one with the generation in which the
+    cell was generated, and one with the generation in which the cell was closed.
+
+    The arrays are allocated once per map. Every query increments a generation counter, so a cell
+    counts as generated (or closed) only if its stamp equals the current generation; this resets the
+    arrays in O(1) between queries.
+
+    The OPEN lists are heapq lists of pairs (priority, state_hash). When a node is reached with a smaller
+    g-value a new pair is pushed (reopening the node if it was closed), and the old pair is discarded when
+    popped because its priority no longer matches the priority array.
+
+    The methods receive and return the same values as the functions in search.algorithms.
+    """
+    def __init__(self, graph):
+        """
+        Constructor - receives the map and allocates the arrays for the forward and backward searches.
+        """
+        self.graph = graph
+        size = graph.width * graph.height
+        self._g = [array('d', bytes(8 * size)), array('d', bytes(8 * size))]
+        self._priority = [array('d', bytes(8 * size)), array('d', bytes(8 * size))]
+        self._generated = [array('L', bytes(array('L').itemsize * size)) for _ in range(2)]
+        self._closed = [array('L', bytes(array('L').itemsize * size)) for _ in range(2)]
+        self._generation = 0
+
+    def _new_generation(self):
+        """
+        Starts a new query; the arrays are cleared only when the generation counter wraps around
+        """
+        self._generation += 1
+        if self._generation >= 2 ** (8 * array('L').itemsize) - 1:
+            for stamps in self._generated + self._closed:
+                for i in range(len(stamps)):
+                    stamps[i] = 0
+            self._generation = 1
+        return self._generation
+
+    def _octile(self, index, x, y):
+        """
+        Octile distance between the cell with the given state_hash and the cell (x, y)
+        """
+        X_change = abs(index % self.graph.width - x)
+        Y_change = abs(index // self.graph.width - y)
+        return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+    def A_star(self, start_state, goal_state):
+        """
+        A* with the octile distance heuristic. Returns the solution cost (-1 if the goal is not reachable)
+        and the number of nodes expanded.
+        """
+        return self._unidirectional(start_state, goal_state, True)
+
+    def dijkstra(self, start_state, goal_state):
+        """
+        Dijkstra's algorithm. Returns the solution cost (-1 if the goal is not reachable) and the
+        number of nodes expanded.
+        """
+        return self._unidirectional(start_state, goal_state, False)
+
+    def _unidirectional(self, start_state, goal_state, use_heuristic):
+        if not self.graph.same_component(start_state, goal_state):
+            return -1, 0
+        generation = self._new_generation()
+        g = self._g[0]
+        priority = self._priority[0]
+        generated = self._generated[0]
+        closed = self._closed[0]
+        neighbors = self.graph.neighbors
+        width = self.graph.width
+        goal_x = goal_state.get_x()
+        goal_y = goal_state.get_y()
+        goal = goal_state.state_hash()
+
+        start = start_state.state_hash()
+        g[start] = 0
+        priority[start] = self._octile(start, goal_x, goal_y) if use_heuristic else 0
+        generated[start] = generation
+        open_heap = [(priority[start], start)]
+        expanded = 0
+
+        while open_heap:
+            p, n = heapq.heappop(open_heap)
+            if closed[n] == generation or p != priority[n]:
+                continue
+            if n == goal:
+                return g[n], expanded
+            closed[n] = generation
+            expanded += 1
+            g_n = g[n]
+            for child, step in neighbors(n):
+                g_child = g_n + step
+                if generated[child] == generation and g_child >= g[child]:
+                    continue
+                if use_heuristic:
+                    X_change = abs(child % width - goal_x)
+                    Y_change = abs(child // width - goal_y)
+                    p_child = g_child + 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+                else:
+                    p_child = g_child
+                generated[child] = generation
+                closed[child] = 0
+                g[child] = g_child
+                priority[child] = p_child
+                heapq.heappush(open_heap, (p_child, child))
+        return -1, expanded
+
+    def bi_A_stars(self, start_state, goal_state):
+        """
+        Bidirectional A* with the octile distance heuristic. The search stops once the best solution
+        found is not larger than the smallest f-value of one of the OPEN lists. Returns the solution cost
+        (-1 if the goal is not reachable) and the number of nodes expanded.
+        """
+        return self._bidirectional(start_state, goal_state, False)
+
+    def Middle_Meet(self, start_state, goal_state):
+        """
+        Meet in the Middle: bidirectional search sorting both OPEN lists by p(n) = max(f(n), 2 × g(n)).
+        The search stops once the best solution found is not larger than the smallest p-value of the
+        OPEN lists. Returns the solution cost (-1 if the goal is not reachable) and the number of nodes
+        expanded.
+        """
+        return self._bidirectional(start_state, goal_state, True)
+
+    def _bidirectional(self, start_state, goal_state, use_p):
+        if not self.graph.same_component(start_state, goal_state):
+            return -1, 0
+        generation = self._new_generation()
+        neighbors = self.graph.neighbors
+        width = self.graph.width
+        start = start_state.state_hash()
+        goal = goal_state.state_hash()
+        # the heuristic of the forward search estimates the distance to the goal and vice versa
+        targets = [(goal_state.get_x(), goal_state.get_y()), (start_state.get_x(), start_state.get_y())]
+        open_heaps = [[], []]
+        for direction, root in ((0, start), (1, goal)):
+            self._g[direction][root] = 0
+            self._priority[direction][root] = self._octile(root, *targets[direction])
+            self._generated[direction][root] = generation
+            open_heaps[direction].append((self._priority[direction][root], root))
+
+        cost = 0 if start == goal else float('inf')
+        expanded = 0
+        while open_heaps[0] and open_heaps[1]:
+            for direction in (0, 1):
+                # discarding stale pairs so that the tops of the heaps are valid lower bounds
+                heap = open_heaps[direction]
+                while heap and (self._closed[direction][heap[0][1]] == generation or heap[0][0] != self._priority[direction][heap[0][1]]):
+                    heapq.heappop(heap)
+            if not open_heaps[0] or not open_heaps[1]:
+                break
+            if use_p:
+                if cost <= min(open_heaps[0][0][0], open_heaps[1][0][0]):
+                    return cost, expanded
+            elif cost <= max(open_heaps[0][0][0], open_heaps[1][0][0]):
+                return cost, expanded
+
+            direction = 0 if open_heaps[0][0][0] < open_heaps[1][0][0] else 1
+            g = self._g[direction]
+            priority = self._priority[direction]
+            generated = self._generated[direction]
+            closed = self._closed[direction]
+            g_other = self._g[1 - direction]
+            generated_other = self._generated[1 - direction]
+            target_x, target_y = targets[direction]
+
+            _, n = heapq.heappop(open_heaps[direction])
+            closed[n] = generation
+            expanded += 1
+            g_n = g[n]
+            for child, step in neighbors(n):
+                g_child = g_n + step
+                if generated[child] == generation and g_child >= g[child]:
+                    continue
+                X_change = abs(child % width - target_x)
+                Y_change = abs(child // width - target_y)
+                p_child = g_child + 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+                if use_p:
+                    p_child = max(p_child, 2*g_child)
+                generated[child] = generation
+                closed[child] = 0
+                g[child] = g_child
+                priority[child] = p_child
+                heapq.heappush(open_heaps[direction], (p_child, child))
+                if generated_other[child] == generation:
+                    cost = min(cost, g_child + g_other[child])
+        if cost < float('inf'):
+            return cost, expanded
+        return -1, expanded
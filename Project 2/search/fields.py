@@ -0,0 +1,130 @@
+from collections import OrderedDict
+import numpy as np
+from search.algorithms import State
+from search.distances import one_to_all
+
+class DistanceField:
+    """
+    Cost of the shortest path from every cell of the map to a fixed goal, computed with a single one-to-all
+    search from the goal (with the given backend of search.distances.one_to_all). The grid is undirected
+    (every action has the same cost in both directions), so the search from the goal gives the backward
+    distances to the goal.
+
+    The distances are stored as a float32 array indexed by state_hash (np.inf for cells that cannot reach
+    the goal); all costs are multiples of 0.5, so float32 represents them exactly. version is the Map.version
+    the field was computed for; a field is stale once the map changes (see Map.set_traversable).
+    """
+    def __init__(self, graph, goal_state, backend="wavefront"):
+        self.graph = graph
+        self.goal = goal_state.state_hash()
+        self.version = graph.version
+        self.distances = one_to_all(graph, self.goal, backend=backend).astype(np.float32)
+        self._distances = memoryview(self.distances)
+
+    def nbytes(self):
+        return self.distances.nbytes
+
+    def cost(self, start_state):
+        """
+        Returns the cost of the shortest path from start_state to the goal, or -1 if there is no path.
+        """
+        distance = self._distances[start_state.state_hash()]
+        if distance == float('inf'):
+            return -1
+        return float(distance)
+
+    def path(self, start_state):
+        """
+        Returns the list of states of a shortest path from start_state to the goal (both included), or None
+        if there is no path. The path is obtained by moving, at every step, to a neighbor whose distance plus
+        the cost of the action equals the distance of the current cell; None is also returned if no neighbor
+        does, which happens when the map changed after the field was computed.
+        """
+        distances = self._distances
+        index = start_state.state_hash()
+        if distances[index] == float('inf'):
+            return None
+        width = self.graph.width
+        path = [State(index % width, index // width)]
+        while index != self.goal:
+            for neighbor, cost in self.graph.neighbors(index):
+                if distances[neighbor] + cost == distances[index]:
+                    index = neighbor
+                    break
+            else:
+                return None
+            path.append(State(index % width, index // width))
+        return path
+
+class FieldCache:
+    """
+    Least-recently-used cache of DistanceFields for the goals queried most often. Fields are computed
+    on the first query to their goal and kept while the total size of the cached distance arrays fits
+    in max_bytes; the least recently used fields are evicted to make room for new ones. A field larger
+    than max_bytes is used to answer the query that computed it but is not cached.
+
+    Once the field of a goal is cached, the cost of a query to that goal is a lookup and its path takes
+    time proportional to the path length.
+    """
+    def __init__(self, graph, max_bytes=64 * 1024 * 1024, backend="wavefront"):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.fields = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __contains__(self, goal_state):
+        return goal_state.state_hash() in self.fields
+
+    def field(self, goal_state):
+        """
+        Returns the DistanceField of goal_state, from the cache if possible. A cached field computed before
+        the last change of the map is computed again.
+        """
+        goal = goal_state.state_hash()
+        field = self.fields.get(goal)
+        if field is not None and field.version == self.graph.version:
+            self.hits += 1
+            self.fields.move_to_end(goal)
+            return field
+        if field is not None:
+            del self.fields[goal]
+            self.size -= field.nbytes()
+        self.misses += 1
+        field = DistanceField(self.graph, goal_state, self.backend)
+        if field.nbytes() <= self.max_bytes:
+            while self.size + field.nbytes() > self.max_bytes:
+                _, evicted = self.fields.popitem(last=False)
+                self.size -= evicted.nbytes()
+                self.evictions += 1
+            self.fields[goal] = field
+            self.size += field.nbytes()
+        return field
+
+    def cost(self, start_state, goal_state):
+        """
+        Returns the cost of the shortest path between start_state and goal_state, or -1 if there is no
+        path. Unreachable goals are rejected with Map.same_component without computing a field.
+        """
+        if not self.graph.same_component(start_state, goal_state):
+            return -1
+        return self.field(goal_state).cost(start_state)
+
+    def path(self, start_state, goal_state):
+        """
+        Returns the list of states of a shortest path from start_state to goal_state, or None if there is
+        no path.
+        """
+        if not self.graph.same_component(start_state, goal_state):
+            return None
+        return self.field(goal_state).path(start_state)
+
+    def clear(self):
+        self.fields.clear()
+        self.size = 0
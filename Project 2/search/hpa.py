@@ -0,0 +1,350 @@
+import heapq
+import numpy as np
+from search.algorithms import State
+
+# Runs of crossable border cells shorter than this get a single entrance in the middle; longer runs
+# get one entrance at each end (Botea, Müller, and Schaeffer, 2004)
+MAX_ENTRANCE_WIDTH = 6
+
+class HPA:
+    """
+    Hierarchical Path-Finding A* (HPA*). The map is split into square clusters of cluster_size × cluster_size
+    cells. Every border between two clusters is divided into entrances, and each entrance adds a pair of
+    abstract nodes (the cells on both sides of the border) connected by an inter-cluster edge. The abstract
+    nodes of a cluster are connected by intra-cluster edges whose cost is the cost of the shortest path
+    between them that stays inside the cluster. A query connects the start and the goal to the abstract
+    nodes of their clusters, searches the abstract graph with A*, and refines each abstract edge into a path
+    on the map.
+
+    Diagonal moves are allowed whenever the target cell is traversable (see Map.successors), so a diagonal
+    move crossing a border whose two corner cells are blocked cannot be replaced by two straight moves; each
+    such crossing is an entrance of its own. This keeps the abstract graph complete: a path is found whenever
+    the start and the goal are in the same component of the map.
+
+    The paths found are not always optimal. With optimal=True, the refinement searches the whole corridor of
+    clusters visited by the abstract path (and the clusters around them) with A*, which returns the optimal
+    path within the corridor.
+    """
+    def __init__(self, graph, cluster_size=16):
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.columns = (graph.width + cluster_size - 1) // cluster_size
+        self.rows = (graph.height + cluster_size - 1) // cluster_size
+        self._free = (np.asarray(graph.data_int).reshape(-1) == 0).tolist()
+        # borders[(c1, c2)] is the list of entrances (cell of c1, cell of c2, cost) between clusters c1 < c2
+        self.borders = {}
+        # nodes[c] is the sorted list of the abstract nodes of cluster c
+        self.nodes = {}
+        # edges[n] maps every neighbor of abstract node n in the abstract graph to the cost of the edge
+        self.edges = {}
+        clusters = range(self.columns * self.rows)
+        for c in clusters:
+            for neighbor in self._adjacent_clusters(c):
+                if c < neighbor:
+                    self.borders[(c, neighbor)] = self._entrances(c, neighbor)
+        for c in clusters:
+            self.nodes[c] = self._cluster_nodes(c)
+        for c in clusters:
+            self._connect_cluster(c)
+
+    def cluster(self, index):
+        """
+        Returns the cluster of the cell with the given state_hash.
+        """
+        width = self.graph.width
+        return (index // width) // self.cluster_size * self.columns + (index % width) // self.cluster_size
+
+    def _bounds(self, c):
+        size = self.cluster_size
+        x0 = (c % self.columns) * size
+        y0 = (c // self.columns) * size
+        return x0, y0, min(x0 + size, self.graph.width), min(y0 + size, self.graph.height)
+
+    def _adjacent_clusters(self, c):
+        cx = c % self.columns
+        cy = c // self.columns
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if (dx != 0 or dy != 0) and 0 <= cx + dx < self.columns and 0 <= cy + dy < self.rows:
+                    yield (cy + dy) * self.columns + cx + dx
+
+    def _entrances(self, c1, c2):
+        """
+        Returns the entrances (cell of c1, cell of c2, cost) of the border between clusters c1 < c2.
+        """
+        width = self.graph.width
+        free = self._free
+        x0, y0, x1, y1 = self._bounds(c1)
+        dx = c2 % self.columns - c1 % self.columns
+        dy = c2 // self.columns - c1 // self.columns
+        if dx != 0 and dy != 0:
+            # the clusters only touch at a corner: the single diagonal move between the corner cells
+            a_x = x1 - 1 if dx > 0 else x0
+            a_y = y1 - 1 if dy > 0 else y0
+            a = a_y * width + a_x
+            b = a + dy * width + dx
+            if free[a] and free[b] and not free[a + dx] and not free[a + dy * width]:
+                return [(a, b, 1.5)]
+            return []
+        if dx == 1:
+            side_a = [y * width + x1 - 1 for y in range(y0, y1)]
+        else:
+            side_a = [(y1 - 1) * width + x for x in range(x0, x1)]
+        side_b = [cell + dy * width + dx for cell in side_a]
+
+        entrances = []
+        run = []
+        for i in range(len(side_a) + 1):
+            if i < len(side_a) and free[side_a[i]] and free[side_b[i]]:
+                run.append(i)
+                continue
+            if len(run) >= MAX_ENTRANCE_WIDTH:
+                entrances.append((side_a[run[0]], side_b[run[0]], 1))
+                entrances.append((side_a[run[-1]], side_b[run[-1]], 1))
+            elif run:
+                middle = run[len(run) // 2]
+                entrances.append((side_a[middle], side_b[middle], 1))
+            run = []
+        # diagonal moves across the border that cannot be replaced by two straight moves
+        for i in range(len(side_a)):
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(side_a) and free[side_a[i]] and free[side_b[j]] and not free[side_a[j]] and not free[side_b[i]]:
+                    entrances.append((side_a[i], side_b[j], 1.5))
+        return entrances
+
+    def _cluster_nodes(self, c):
+        nodes = set()
+        for neighbor in self._adjacent_clusters(c):
+            for a, b, _ in self.borders[(min(c, neighbor), max(c, neighbor))]:
+                nodes.add(a if c < neighbor else b)
+        return sorted(nodes)
+
+    def _connect_cluster(self, c):
+        """
+        Adds the inter-cluster edges of the entrances of cluster c and the intra-cluster edges between its
+        abstract nodes, computed with a Dijkstra search restricted to the cluster from every node.
+        """
+        for neighbor in self._adjacent_clusters(c):
+            for a, b, cost in self.borders[(min(c, neighbor), max(c, neighbor))]:
+                self.edges.setdefault(a, {})[b] = cost
+                self.edges.setdefault(b, {})[a] = cost
+        nodes = self.nodes[c]
+        for i, node in enumerate(nodes):
+            distances, _ = self._local_distances(node, c, nodes[i + 1:])
+            for other, cost in distances.items():
+                self.edges.setdefault(node, {})[other] = cost
+                self.edges.setdefault(other, {})[node] = cost
+
+    def _local_distances(self, source, c, targets):
+        """
+        Dijkstra's algorithm from source restricted to the cells of cluster c. Returns a dictionary with
+        the cost of the shortest path to every target reachable inside the cluster, and the number of
+        nodes expanded. The search stops once all targets are reached.
+        """
+        width = self.graph.width
+        x0, y0, x1, y1 = self._bounds(c)
+        remaining = set(targets)
+        remaining.discard(source)
+        found = {}
+        g = {source: 0}
+        closed = set()
+        open_heap = [(0, source)]
+        expanded = 0
+        while open_heap and remaining:
+            cost, n = heapq.heappop(open_heap)
+            if n in closed:
+                continue
+            closed.add(n)
+            expanded += 1
+            if n in remaining:
+                remaining.discard(n)
+                found[n] = cost
+            for child, step in self.graph.neighbors(n):
+                x = child % width
+                y = child // width
+                if x < x0 or x >= x1 or y < y0 or y >= y1:
+                    continue
+                g_child = cost + step
+                if g_child < g.get(child, float('inf')):
+                    g[child] = g_child
+                    heapq.heappush(open_heap, (g_child, child))
+        return found, expanded
+
+    def _local_search(self, source, target, allowed):
+        """
+        A* with the octile distance from source to target over the cells whose cluster is in allowed.
+        Returns the cost of the path, the list of its cells, and the number of nodes expanded.
+        """
+        width = self.graph.width
+        target_x = target % width
+        target_y = target // width
+
+        def h(index):
+            X_change = abs(index % width - target_x)
+            Y_change = abs(index // width - target_y)
+            return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+        g = {source: 0}
+        parent = {source: None}
+        closed = set()
+        open_heap = [(h(source), source)]
+        expanded = 0
+        while open_heap:
+            _, n = heapq.heappop(open_heap)
+            if n in closed:
+                continue
+            if n == target:
+                path = []
+                while n is not None:
+                    path.append(n)
+                    n = parent[n]
+                return g[target], path[::-1], expanded
+            closed.add(n)
+            expanded += 1
+            for child, step in self.graph.neighbors(n):
+                if child in closed or self.cluster(child) not in allowed:
+                    continue
+                g_child = g[n] + step
+                if g_child < g.get(child, float('inf')):
+                    g[child] = g_child
+                    parent[child] = n
+                    heapq.heappush(open_heap, (g_child + h(child), child))
+        return -1, None, expanded
+
+    def _abstract_search(self, start, goal):
+        """
+        Connects start and goal to the abstract nodes of their clusters and searches the abstract graph with
+        A*. Returns the cost and the list of abstract nodes of the path (None if there is no path), and the
+        number of nodes expanded by all searches.
+        """
+        width = self.graph.width
+        goal_x = goal % width
+        goal_y = goal // width
+        start_cluster = self.cluster(start)
+        goal_cluster = self.cluster(goal)
+
+        start_targets = list(self.nodes[start_cluster])
+        if goal_cluster == start_cluster:
+            start_targets.append(goal)
+        start_edges, expanded = self._local_distances(start, start_cluster, start_targets)
+        to_goal, goal_expanded = self._local_distances(goal, goal_cluster, self.nodes[goal_cluster])
+        expanded += goal_expanded
+        if start in self.edges:
+            start_edges.update(self.edges[start])
+
+        def h(index):
+            X_change = abs(index % width - goal_x)
+            Y_change = abs(index // width - goal_y)
+            return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+        g = {start: 0}
+        parent = {start: None}
+        closed = set()
+        open_heap = [(h(start), start)]
+        while open_heap:
+            _, n = heapq.heappop(open_heap)
+            if n in closed:
+                continue
+            if n == goal:
+                path = []
+                while n is not None:
+                    path.append(n)
+                    n = parent[n]
+                return g[goal], path[::-1], expanded
+            closed.add(n)
+            expanded += 1
+            children = list(start_edges.items()) if n == start else list(self.edges.get(n, {}).items())
+            if n in to_goal:
+                children.append((goal, to_goal[n]))
+            for child, step in children:
+                g_child = g[n] + step
+                if child not in closed and g_child < g.get(child, float('inf')):
+                    g[child] = g_child
+                    parent[child] = n
+                    heapq.heappush(open_heap, (g_child + h(child), child))
+        return -1, None, expanded
+
+    def find_path(self, start_state, goal_state, optimal=False):
+        """
+        Returns the cost of the path found from start_state to goal_state, the list of its states, and the
+        number of nodes expanded (abstract nodes and map cells). The cost is -1 and the path is None if
+        there is no path. See the class documentation for the meaning of optimal.
+        """
+        if not self.graph.same_component(start_state, goal_state):
+            return -1, None, 0
+        width = self.graph.width
+        start = start_state.state_hash()
+        goal = goal_state.state_hash()
+        if start == goal:
+            return 0, [State(start % width, start // width)], 0
+        cost, abstract_path, expanded = self._abstract_search(start, goal)
+        if abstract_path is None:
+            return -1, None, expanded
+
+        if optimal:
+            corridor = set()
+            for node in abstract_path:
+                c = self.cluster(node)
+                corridor.add(c)
+                corridor.update(self._adjacent_clusters(c))
+            cost, cells, refine_expanded = self._local_search(start, goal, corridor)
+            expanded += refine_expanded
+        else:
+            cells = [start]
+            for u, v in zip(abstract_path, abstract_path[1:]):
+                if self.cluster(u) != self.cluster(v):
+                    cells.append(v)
+                    continue
+                _, segment, refine_expanded = self._local_search(u, v, (self.cluster(u),))
+                cells.extend(segment[1:])
+                expanded += refine_expanded
+        return cost, [State(cell % width, cell // width) for cell in cells], expanded
+
+    def search(self, start_state, goal_state, optimal=False):
+        """
+        Returns the cost of the path found from start_state to goal_state (-1 if there is no path) and the
+        number of nodes expanded, like the search algorithms in search.algorithms. Only the abstract path
+        is computed unless optimal is True.
+        """
+        if not self.graph.same_component(start_state, goal_state):
+            return -1, 0
+        if optimal:
+            cost, _, expanded = self.find_path(start_state, goal_state, optimal=True)
+            return cost, expanded
+        if start_state.state_hash() == goal_state.state_hash():
+            return 0, 0
+        cost, _, expanded = self._abstract_search(start_state.state_hash(), goal_state.state_hash())
+        return cost, expanded
+
+    def rebuild(self, cells):
+        """
+        Updates the abstraction after the traversability of the given cells (a list of (x, y) pairs) has
+        changed on the map; the neighbor masks and components of the map must already be up to date. Only
+        the borders between the clusters around the cells are recomputed: every border of a cluster containing
+        a cell, and the corner borders between its adjacent clusters, whose diagonal entrances depend on the
+        corner cells of the cluster. The intra-cluster edges are recomputed for all these clusters.
+        """
+        width = self.graph.width
+        self._free = (np.asarray(self.graph.data_int).reshape(-1) == 0).tolist()
+        changed = {self.cluster(y * width + x) for x, y in cells}
+        affected = set(changed)
+        for c in changed:
+            affected.update(self._adjacent_clusters(c))
+
+        for c in affected:
+            for node in self.nodes[c]:
+                for neighbor in self.edges.pop(node, {}):
+                    if neighbor in self.edges:
+                        self.edges[neighbor].pop(node, None)
+        for c in changed:
+            around = set(self._adjacent_clusters(c))
+            around.add(c)
+            for c1 in around:
+                for c2 in self._adjacent_clusters(c1):
+                    if c1 < c2 and c2 in around:
+                        self.borders[(c1, c2)] = self._entrances(c1, c2)
+        for c in affected:
+            self.nodes[c] = self._cluster_nodes(c)
+        for c in affected:
+            self._connect_cluster(c)
+        return affected
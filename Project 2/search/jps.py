@@ -0,0 +1,248 @@
+import heapq
+import numpy as np
+from search.cache import load_sidecar, save_sidecar
+
+# The eight directions in the order of Map.moves: bit k of a neighbor mask refers to DIRECTIONS[k]
+DIRECTIONS = [(i, j) for i in range(-1, 2) for j in range(-1, 2) if i != 0 or j != 0]
+DIRECTION_INDEX = {d: k for k, d in enumerate(DIRECTIONS)}
+NO_DIRECTION = 8
+
+def _bit(dx, dy):
+    return 1 << DIRECTION_INDEX[(dx, dy)]
+
+def _forced(mask, dx, dy):
+    """
+    Returns the directions of the forced neighbors of a cell with the given neighbor mask when the cell
+    is reached by moving in direction (dx, dy).
+
+    Diagonal moves are allowed whenever the target cell is traversable (see Map.successors), so a
+    neighbor is forced only if the cell next to it that would offer a path of the same cost avoiding
+    the current cell is blocked.
+    """
+    forced = []
+    if dx == 0 or dy == 0:
+        for side in (-1, 1):
+            side_x, side_y = (side, 0) if dx == 0 else (0, side)
+            if not mask & _bit(side_x, side_y) and mask & _bit(dx + side_x, dy + side_y):
+                forced.append((dx + side_x, dy + side_y))
+    else:
+        if not mask & _bit(-dx, 0) and mask & _bit(-dx, dy):
+            forced.append((-dx, dy))
+        if not mask & _bit(0, -dy) and mask & _bit(dx, -dy):
+            forced.append((dx, -dy))
+    return forced
+
+def _pruned(mask, parent_direction):
+    """
+    Returns the indices of the directions that must be explored from a cell with the given neighbor mask
+    when the cell was reached by moving in DIRECTIONS[parent_direction]: the natural neighbors plus the
+    forced ones. All traversable neighbors are explored from the start state (NO_DIRECTION).
+    """
+    if parent_direction == NO_DIRECTION:
+        candidates = DIRECTIONS
+    else:
+        dx, dy = DIRECTIONS[parent_direction]
+        candidates = [(dx, dy)]
+        if dx != 0 and dy != 0:
+            candidates += [(dx, 0), (0, dy)]
+        candidates += _forced(mask, dx, dy)
+    return tuple(DIRECTION_INDEX[d] for d in candidates if mask & _bit(*d))
+
+# PRUNED[parent direction][mask] and HAS_FORCED[direction][mask] are precomputed for all 256 masks
+PRUNED = [[_pruned(mask, k) for mask in range(256)] for k in range(9)]
+HAS_FORCED = [bytes(len(_forced(mask, *d)) > 0 for mask in range(256)) for d in DIRECTIONS]
+
+def _octile(index, goal_x, goal_y, width):
+    X_change = abs(index % width - goal_x)
+    Y_change = abs(index // width - goal_y)
+    return 1.5*min(X_change, Y_change)+abs(X_change-Y_change)
+
+def _jump(graph, index, k, goal):
+    """
+    Moves from the cell index in direction DIRECTIONS[k] until it finds a jump point, i.e., the goal, a
+    cell with forced neighbors, or (for diagonal directions) a cell from which a straight jump in one of
+    the two components of the direction finds a jump point. Returns the jump point and the number of
+    steps taken, or None if an obstacle or the border of the map is reached first.
+    """
+    masks = graph.neighbor_mask
+    bit = 1 << k
+    offset = graph.moves[k][2]
+    forced = HAS_FORCED[k]
+    dx, dy = DIRECTIONS[k]
+    steps = 0
+    if dx == 0 or dy == 0:
+        while masks[index] & bit:
+            index += offset
+            steps += 1
+            if index == goal or forced[masks[index]]:
+                return index, steps
+        return None
+    k_x = DIRECTION_INDEX[(dx, 0)]
+    k_y = DIRECTION_INDEX[(0, dy)]
+    while masks[index] & bit:
+        index += offset
+        steps += 1
+        if index == goal or forced[masks[index]]:
+            return index, steps
+        if _jump(graph, index, k_x, goal) is not None or _jump(graph, index, k_y, goal) is not None:
+            return index, steps
+    return None
+
+def _search(start_state, goal_state, graph, successors, observer=None):
+    """
+    A* over jump points. successors(index, parent_direction) yields triples (jump point, direction,
+    steps); the cost of reaching a jump point is steps for straight directions and 1.5 × steps for
+    diagonal ones. Returns the solution cost (-1 if the goal is not reachable) and the number of nodes
+    expanded. observer (see search.trace.SearchObserver) receives the events of the search over jump
+    points.
+    """
+    if not graph.same_component(start_state, goal_state):
+        if observer is not None:
+            observer.terminate(-1, 0)
+        return -1, 0
+    width = graph.width
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    start = start_state.state_hash()
+    goal = goal_state.state_hash()
+
+    g = {start: 0}
+    parent_direction = {start: NO_DIRECTION}
+    closed = set()
+    open_heap = [(_octile(start, goal_x, goal_y, width), start)]
+    expanded = 0
+
+    while open_heap:
+        f, n = heapq.heappop(open_heap)
+        if n in closed:
+            continue
+        if n == goal:
+            if observer is not None:
+                observer.terminate(g[n], expanded)
+            return g[n], expanded
+        closed.add(n)
+        expanded += 1
+        if observer is not None:
+            observer.expand(n, g[n], 0)
+        for child, k, steps in successors(n, parent_direction[n]):
+            dx, dy = DIRECTIONS[k]
+            g_child = g[n] + (steps if dx == 0 or dy == 0 else 1.5 * steps)
+            if child in g and g_child >= g[child]:
+                continue
+            if observer is not None:
+                if child in g:
+                    observer.reopen(child, g_child, 0)
+                else:
+                    observer.generate(child, g_child, 0)
+            g[child] = g_child
+            parent_direction[child] = k
+            closed.discard(child)
+            heapq.heappush(open_heap, (g_child + _octile(child, goal_x, goal_y, width), child))
+    if observer is not None:
+        observer.terminate(-1, expanded)
+    return -1, expanded
+
+def jps(start_state, goal_state, graph, observer=None):
+    """
+    Jump Point Search: A* with the octile distance heuristic that only generates the jump points of the
+    grid, pruning the symmetric paths through the open areas of the map. Returns the solution cost
+    (-1 if the goal is not reachable) and the number of nodes expanded. observer is passed to _search.
+    """
+    masks = graph.neighbor_mask
+    goal = goal_state.state_hash()
+
+    def successors(index, parent_direction):
+        for k in PRUNED[parent_direction][masks[index]]:
+            jump_point = _jump(graph, index, k, goal)
+            if jump_point is not None:
+                yield jump_point[0], k, jump_point[1]
+
+    return _search(start_state, goal_state, graph, successors, observer)
+
+def compute_jump_table(graph):
+    """
+    Computes the JPS+ table of the map: an int32 array of shape (8, width × height) where entry [k][i]
+    is the number of steps from cell i to the next jump point in direction DIRECTIONS[k] if positive,
+    and minus the number of steps that can be taken in that direction before reaching an obstacle
+    otherwise. Jump points are computed without a goal; the goal is handled at query time.
+    """
+    masks = graph.neighbor_mask
+    size = graph.width * graph.height
+    table = [None] * 8
+    # straight directions first, as the diagonal jump points depend on them
+    order = sorted(range(8), key=lambda k: DIRECTIONS[k][0] != 0 and DIRECTIONS[k][1] != 0)
+    for k in order:
+        dx, dy = DIRECTIONS[k]
+        bit = 1 << k
+        offset = graph.moves[k][2]
+        forced = HAS_FORCED[k]
+        diagonal = dx != 0 and dy != 0
+        if diagonal:
+            straight_x = table[DIRECTION_INDEX[(dx, 0)]]
+            straight_y = table[DIRECTION_INDEX[(0, dy)]]
+        distances = [0] * size
+        # the next cell in direction k is always processed before the current one
+        cells = range(size - 1, -1, -1) if offset > 0 else range(size)
+        for i in cells:
+            if not masks[i] & bit:
+                continue
+            next_cell = i + offset
+            if forced[masks[next_cell]] or (diagonal and (straight_x[next_cell] > 0 or straight_y[next_cell] > 0)):
+                distances[i] = 1
+            else:
+                previous = distances[next_cell]
+                distances[i] = previous + 1 if previous > 0 else previous - 1
+        table[k] = distances
+    return np.array(table, dtype=np.int32)
+
+def jump_table(graph):
+    """
+    Returns the JPS+ table of the map, loading it from the cache next to the map file if possible and
+    computing (and caching) it otherwise.
+    """
+    table = load_sidecar(graph.file_name, "jps")
+    if table is None or table.shape != (8, graph.width * graph.height):
+        table = compute_jump_table(graph)
+        save_sidecar(graph.file_name, "jps", table)
+    return table
+
+def jps_plus(start_state, goal_state, graph, table=None, observer=None):
+    """
+    JPS+: Jump Point Search reading the jump distances from the table computed by compute_jump_table
+    instead of scanning the grid. If table is None it is obtained with jump_table(graph); callers
+    solving several problems on the same map should load the table once and pass it. Returns the
+    solution cost (-1 if the goal is not reachable) and the number of nodes expanded. observer is
+    passed to _search.
+    """
+    if table is None:
+        table = jump_table(graph)
+    rows = [memoryview(np.ascontiguousarray(table[k])) for k in range(8)]
+    masks = graph.neighbor_mask
+    width = graph.width
+    goal = goal_state.state_hash()
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+
+    def successors(index, parent_direction):
+        x = index % width
+        y = index // width
+        for k in PRUNED[parent_direction][masks[index]]:
+            dx, dy = DIRECTIONS[k]
+            distance = rows[k][index]
+            offset = dy * width + dx
+            if dx == 0 or dy == 0:
+                # the goal is on this line and can be reached before the jump point or the obstacle
+                to_goal = (goal_x - x) * dx if dy == 0 else (goal_y - y) * dy
+                if (goal_y == y if dy == 0 else goal_x == x) and 0 < to_goal <= abs(distance):
+                    yield goal, k, to_goal
+                elif distance > 0:
+                    yield index + distance * offset, k, distance
+            else:
+                # the diagonal crosses the row or column of the goal before the jump point or the obstacle
+                to_goal = min((goal_x - x) * dx, (goal_y - y) * dy)
+                if 0 < to_goal <= abs(distance):
+                    yield index + to_goal * offset, k, to_goal
+                elif distance > 0:
+                    yield index + distance * offset, k, distance
+
+    return _search(start_state, goal_state, graph, successors, observer)
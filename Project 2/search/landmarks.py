@@ -0,0 +1,170 @@
+import random
+import numpy as np
+from search.cache import load_sidecar, save_sidecar
+from search.distances import one_to_all
+
+# Distances are stored as uint16 numbers of half units (all action costs are multiples of 0.5);
+# UNREACHABLE marks cells that are not connected to the landmark
+UNREACHABLE = np.iinfo(np.uint16).max
+
+class Landmarks:
+    """
+    ALT (A*, Landmarks, and Triangle inequality) heuristic for a map. The class selects k landmarks and
+    stores the exact distance from every landmark to every cell, computed with Dijkstra's algorithm. For
+    a state n, a goal t, and a landmark L, the triangle inequality gives the lower bound
+    |d(L, n) - d(L, t)| on the distance between n and t; the heuristic is the largest of these bounds.
+
+    The landmarks are selected with one of two strategies:
+
+    - farthest: each landmark is the cell farthest from the landmarks already selected (within the
+      largest component of the map).
+    - avoid: each landmark is the leaf of the shortest-path tree of a random root whose subtree contains
+      the states for which the current heuristic is the least accurate (and no landmark).
+
+    The distance table is an array of shape (k, width × height), computed with the given backend of
+    search.distances.one_to_all. Distances are stored as uint16 numbers of half units when they fit and as
+    float32 otherwise. The table is cached next to the map file and memory-mapped when the same map, k,
+    strategy, and seed are used again.
+    """
+    def __init__(self, graph, k=8, strategy="farthest", seed=0, backend="wavefront"):
+        """
+        Constructor - loads the landmarks of the map from the cache or selects them with the given
+        strategy ("farthest" or "avoid") and computes their distance table.
+        """
+        if strategy not in ("farthest", "avoid"):
+            raise ValueError("Unknown landmark selection strategy: " + str(strategy))
+        self.graph = graph
+        self.k = k
+        self.strategy = strategy
+        self.backend = backend
+        name = "alt-" + strategy + "-" + str(k) + "-" + str(seed)
+
+        self.landmarks = load_sidecar(graph.file_name, name + "-cells")
+        self.table = load_sidecar(graph.file_name, name)
+        if self.landmarks is None or self.table is None or self.table.shape != (len(self.landmarks), graph.width * graph.height):
+            random_generator = random.Random(seed)
+            if strategy == "farthest":
+                self.landmarks, distances = self._select_farthest(random_generator)
+            else:
+                self.landmarks, distances = self._select_avoid(random_generator)
+            self.landmarks = np.array(self.landmarks, dtype=np.int64)
+            self.table = Landmarks.compress(distances)
+            save_sidecar(graph.file_name, name + "-cells", self.landmarks)
+            save_sidecar(graph.file_name, name, self.table)
+
+        self.landmarks = [int(landmark) for landmark in self.landmarks]
+        self._rows = [memoryview(np.ascontiguousarray(self.table[i])) for i in range(len(self.landmarks))]
+
+    @staticmethod
+    def compress(distances):
+        """
+        Receives a list of float64 distance arrays and returns them as a single uint16 array of half units
+        (UNREACHABLE for np.inf) if all finite distances fit, or as a float32 array otherwise.
+        """
+        table = np.array(distances)
+        finite = np.isfinite(table)
+        if not finite.any() or 2 * table[finite].max() < UNREACHABLE:
+            return np.where(finite, 2 * np.where(finite, table, 0), UNREACHABLE).astype(np.uint16)
+        return table.astype(np.float32)
+
+    def _traversable_cells(self):
+        return np.flatnonzero(self.graph.data_int.reshape(-1) == 0)
+
+    def _select_farthest(self, random_generator):
+        """
+        Farthest-point selection: the first landmark is the cell farthest from a random cell of the largest
+        component of the map and every other landmark is the cell of that component farthest from all
+        landmarks already selected. Problems in other components only use the octile distance.
+        """
+        labels = np.asarray(self.graph.components)
+        if not labels.any():
+            return [], []
+        largest = np.argmax(np.bincount(labels)[1:]) + 1
+        cells = np.flatnonzero(labels == largest)
+        seed_cell = int(cells[random_generator.randrange(len(cells))])
+        closest = one_to_all(self.graph, seed_cell, backend=self.backend)[cells]
+        landmarks = []
+        distances = []
+        for _ in range(min(self.k, len(cells))):
+            landmark = int(cells[np.argmax(closest)])
+            if landmark in landmarks:
+                break
+            landmarks.append(landmark)
+            distances.append(one_to_all(self.graph, landmark, backend=self.backend))
+            closest = np.minimum(closest, distances[-1][cells]) if len(landmarks) > 1 else distances[-1][cells]
+        return landmarks, distances
+
+    def _select_avoid(self, random_generator):
+        """
+        Avoid selection (Goldberg and Harrelson): for a random root r, the weight of a cell v is the error
+        d(r, v) - h(r, v) of the current heuristic, and the size of v is the sum of the weights of its
+        subtree in the shortest-path tree of r, or 0 if the subtree contains a landmark. The new landmark
+        is the leaf reached by descending from r to the child with the largest size.
+        """
+        cells = self._traversable_cells()
+        landmarks = []
+        distances = []
+        width = self.graph.width
+        for _ in range(min(self.k, len(cells))):
+            root = int(cells[random_generator.randrange(len(cells))])
+            from_root, parent = one_to_all(self.graph, root, parents=True, backend=self.backend)
+            reached = np.flatnonzero(np.isfinite(from_root))
+
+            X_change = np.abs(reached % width - root % width)
+            Y_change = np.abs(reached // width - root // width)
+            lower_bound = 1.5 * np.minimum(X_change, Y_change) + np.abs(X_change - Y_change)
+            for landmark_distances in distances:
+                if np.isfinite(landmark_distances[root]):
+                    lower_bound = np.maximum(lower_bound, np.abs(landmark_distances[reached] - landmark_distances[root]))
+            weight = np.zeros(len(from_root))
+            weight[reached] = from_root[reached] - lower_bound
+
+            # accumulating the weights bottom-up, processing the cells in decreasing order of distance
+            size = weight.copy()
+            has_landmark = np.zeros(len(from_root), dtype=bool)
+            has_landmark[landmarks] = True
+            children = {}
+            for cell in reached[np.argsort(-from_root[reached], kind="stable")].tolist():
+                parent_cell = int(parent[cell])
+                if has_landmark[cell]:
+                    size[cell] = 0
+                if parent_cell >= 0:
+                    size[parent_cell] += size[cell]
+                    has_landmark[parent_cell] |= has_landmark[cell]
+                    children.setdefault(parent_cell, []).append(cell)
+
+            landmark = root
+            while landmark in children:
+                landmark = max(children[landmark], key=lambda child: size[child])
+            if landmark in landmarks:
+                break
+            landmarks.append(landmark)
+            distances.append(one_to_all(self.graph, landmark, backend=self.backend))
+        return landmarks, distances
+
+    def heuristic_to(self, goal_state):
+        """
+        Returns a function that receives the state_hash of a cell and returns the ALT lower bound on the
+        cost of the path from the cell to goal_state. Landmarks not connected to the goal are ignored.
+        The function assumes the cell is in the same component as the goal (see Map.same_component).
+        """
+        goal = goal_state.state_hash()
+        half_units = self.table.dtype == np.uint16
+        active = []
+        for row in self._rows:
+            goal_distance = row[goal]
+            if (half_units and goal_distance != UNREACHABLE) or (not half_units and goal_distance != float("inf")):
+                active.append((row, goal_distance))
+        scale = 0.5 if half_units else 1.0
+
+        def heuristic(index):
+            best = 0
+            for row, goal_distance in active:
+                difference = row[index] - goal_distance
+                if difference < 0:
+                    difference = -difference
+                if difference > best:
+                    best = difference
+            return best * scale
+
+        return heuristic
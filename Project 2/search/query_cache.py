@@ -0,0 +1,202 @@
+import heapq
+from array import array
+from collections import OrderedDict
+from search.algorithms import State
+
+def find_path(start_state, goal_state, graph):
+    """
+    A* with the octile distance heuristic that keeps the parent of every node, so that the path can be
+    returned. Returns the solution cost (-1 if the goal is not reachable), the list of states of the path
+    from start_state to goal_state (None if there is no path), and the number of nodes expanded.
+    """
+    if not graph.same_component(start_state, goal_state):
+        return -1, None, 0
+    width = graph.width
+    goal_x = goal_state.get_x()
+    goal_y = goal_state.get_y()
+    start = start_state.state_hash()
+    goal = goal_state.state_hash()
+
+    g = {start: 0}
+    parent = {start: None}
+    closed = set()
+    open_heap = [(0, 0, start)]
+    expanded = 0
+    while open_heap:
+        _, _, n = heapq.heappop(open_heap)
+        if n in closed:
+            continue
+        if n == goal:
+            path = []
+            while n is not None:
+                path.append(State(n % width, n // width))
+                n = parent[n]
+            path.reverse()
+            return g[goal], path, expanded
+        closed.add(n)
+        expanded += 1
+        for child, step in graph.neighbors(n):
+            g_child = g[n] + step
+            if child in g and g_child >= g[child]:
+                continue
+            g[child] = g_child
+            parent[child] = n
+            closed.discard(child)
+            X_change = abs(child % width - goal_x)
+            Y_change = abs(child // width - goal_y)
+            # ties of f are broken toward the largest g
+            heapq.heappush(open_heap, (g_child + 1.5*min(X_change, Y_change)+abs(X_change-Y_change), -g_child, child))
+    return -1, None, expanded
+
+class QueryCache:
+    """
+    Least-recently-used cache of the optimal paths found for (start, goal) queries, placed in front of a
+    search function find_path(start_state, goal_state, graph) that returns (cost, states of the path, nodes
+    expanded), such as find_path above or, e.g., lambda s, g, graph: hpa.find_path(s, g, optimal=True).
+    The paths must be optimal for the sub-path answers to be.
+
+    Entries are keyed on the map (its file name and Map.version, so the paths of a map are not served after
+    its cells change) and on the pair of state_hashes of the endpoints. As the grid is undirected, the
+    query (goal, start) is answered with the reversed path of (start, goal). Every sub-path of an optimal
+    path is optimal too, so a query whose endpoints are both on a cached path is answered by slicing it: the
+    cache keeps an index from every cell on a cached path to the paths it is on and to its position there.
+
+    The cache holds the paths while their estimated size (path, cumulative costs, and index entries) fits in
+    max_bytes, evicting the least recently used ones. hits counts the queries answered by an entry with the
+    same endpoints (in any order), subpath_hits the ones answered by slicing a longer path, and misses the
+    ones that needed a search; unreachable goals are rejected with Map.same_component and not counted.
+    """
+    # approximate size in bytes of the index entries of one cell of a cached path
+    INDEX_BYTES = 150
+
+    def __init__(self, find_path=find_path, max_bytes=16 * 1024 * 1024):
+        self.find_path = find_path
+        self.max_bytes = max_bytes
+        # key -> (map key, path as an array of state_hashes, cumulative cost along the path)
+        self.entries = OrderedDict()
+        # (map key, state_hash) -> {key of an entry whose path contains the cell: position of the cell}
+        self._index = {}
+        self.size = 0
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _map_key(graph):
+        return (graph.file_name, graph.version)
+
+    def _entry_bytes(self, path):
+        return len(path) * (path.itemsize + 8 + QueryCache.INDEX_BYTES)
+
+    def _lookup(self, map_key, start, goal):
+        """
+        Returns (key, position of start, position of goal) of a cached path containing both cells, or None
+        """
+        at_start = self._index.get((map_key, start))
+        at_goal = self._index.get((map_key, goal))
+        if at_start is None or at_goal is None:
+            return None
+        if len(at_goal) < len(at_start):
+            for key, position in at_goal.items():
+                if key in at_start:
+                    return key, at_start[key], position
+            return None
+        for key, position in at_start.items():
+            if key in at_goal:
+                return key, position, at_goal[key]
+        return None
+
+    def _insert(self, map_key, states):
+        path = array('l', (state.state_hash() for state in states))
+        size = self._entry_bytes(path)
+        if size > self.max_bytes:
+            return
+        key = (map_key, min(path[0], path[-1]), max(path[0], path[-1]))
+        if key in self.entries:
+            return
+        while self.size + size > self.max_bytes:
+            self._evict()
+        cumulative = array('d', [0.0])
+        for a, b in zip(states, states[1:]):
+            diagonal = a.get_x() != b.get_x() and a.get_y() != b.get_y()
+            cumulative.append(cumulative[-1] + (1.5 if diagonal else 1))
+        self.entries[key] = (map_key, path, cumulative)
+        self.size += size
+        for position, index in enumerate(path):
+            self._index.setdefault((map_key, index), {})[key] = position
+
+    def _evict(self):
+        key, (map_key, path, _) = self.entries.popitem(last=False)
+        self.size -= self._entry_bytes(path)
+        self.evictions += 1
+        for index in path:
+            at_cell = self._index[(map_key, index)]
+            del at_cell[key]
+            if not at_cell:
+                del self._index[(map_key, index)]
+
+    def query(self, start_state, goal_state, graph):
+        """
+        Returns the cost of the shortest path between start_state and goal_state on graph (-1 if there is no
+        path) and the list of its states (None if there is no path), from the cache if possible.
+        """
+        if not graph.same_component(start_state, goal_state):
+            return -1, None
+        map_key = QueryCache._map_key(graph)
+        start = start_state.state_hash()
+        goal = goal_state.state_hash()
+        found = self._lookup(map_key, start, goal)
+        if found is None:
+            self.misses += 1
+            cost, states, _ = self.find_path(start_state, goal_state, graph)
+            if states is not None:
+                self._insert(map_key, states)
+            return cost, states
+        key, i, j = found
+        _, path, cumulative = self.entries[key]
+        self.entries.move_to_end(key)
+        if {i, j} == {0, len(path) - 1}:
+            self.hits += 1
+        else:
+            self.subpath_hits += 1
+        width = graph.width
+        indices = path[i:j + 1] if i <= j else path[j:i + 1][::-1]
+        return abs(cumulative[j] - cumulative[i]), [State(index % width, index // width) for index in indices]
+
+    def cost(self, start_state, goal_state, graph):
+        """
+        Returns the cost of the shortest path between start_state and goal_state, or -1 if there is no path
+        """
+        return self.query(start_state, goal_state, graph)[0]
+
+    def path(self, start_state, goal_state, graph):
+        """
+        Returns the list of states of a shortest path from start_state to goal_state, or None if there is
+        no path
+        """
+        return self.query(start_state, goal_state, graph)[1]
+
+    def hit_rate(self):
+        """
+        Returns the fraction of the queries answered from the cache (exact and sub-path hits)
+        """
+        queries = self.hits + self.subpath_hits + self.misses
+        return (self.hits + self.subpath_hits) / queries if queries else 0.0
+
+    def stats(self):
+        """
+        Returns a dictionary with the counters of the cache, its hit rate, the number of paths cached, and
+        their estimated size in bytes
+        """
+        return {"hits": self.hits, "subpath_hits": self.subpath_hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hit_rate(), "entries": len(self.entries),
+                "bytes": self.size}
+
+    def clear(self):
+        self.entries.clear()
+        self._index.clear()
+        self.size = 0
@@ -0,0 +1,146 @@
+import mmap
+import os
+import re
+import struct
+import tempfile
+import numpy as np
+from search.map import Map
+
+# header of a published map: magic string, width, height, and length of the path of the map file, which
+# follows the header (so that the sidecar caches of the map are still found by the processes attaching it)
+_HEADER = struct.Struct("<8sIII")
+_MAGIC = b"GRIDMAP1"
+
+def default_folder():
+    """
+    Folder where the maps are published: /dev/shm (memory, not disk) if the system has it, otherwise the
+    temporary folder
+    """
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+def _layout(width, height, path_length):
+    """
+    Returns the offsets of the grid, of the neighbor masks, and of the component labels in a published map,
+    and its size in bytes
+    """
+    cells = width * height
+    grid = _HEADER.size + path_length
+    masks = grid + cells
+    # the int32 labels are aligned to 8 bytes
+    components = (masks + cells + 7) // 8 * 8
+    return grid, masks, components, components + 4 * cells
+
+def _published_map_file(path):
+    """
+    Returns the path of the map file of the map published in path, or None if path is not a published map
+    """
+    try:
+        with open(path, "rb") as published:
+            header = published.read(_HEADER.size)
+            magic, _, _, path_length = _HEADER.unpack(header)
+            return published.read(path_length).decode() if magic == _MAGIC else None
+    except (OSError, struct.error):
+        return None
+
+def attach_map(name, folder=None):
+    """
+    Returns the Map published with the given name in folder (default_folder() if None), without reading or
+    converting the map file: its grid, neighbor masks, and component labels are read-only views of the
+    published copy, shared by every process that attaches it. Changes made with Map.set_traversable copy the
+    data first, so they are only seen by the process that made them. Raises KeyError if no map is published
+    with that name.
+    """
+    path = os.path.join(folder if folder is not None else default_folder(), MapRegistry.file_name(name))
+    try:
+        with open(path, "rb") as published:
+            mapping = mmap.mmap(published.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        raise KeyError(name) from None
+    magic, width, height, path_length = _HEADER.unpack_from(mapping, 0)
+    if magic != _MAGIC:
+        raise ValueError("%s is not a published map" % path)
+    map_file = mapping[_HEADER.size:_HEADER.size + path_length].decode()
+    cells = width * height
+    grid, masks, components, _ = _layout(width, height, path_length)
+    data_int = np.frombuffer(mapping, dtype=np.uint8, count=cells, offset=grid).reshape(height, width)
+    labels = np.frombuffer(mapping, dtype=np.int32, count=cells, offset=components)
+    return Map.from_arrays(map_file, data_int, memoryview(mapping)[masks:masks + cells], labels)
+
+class MapRegistry:
+    """
+    Publishes maps once, already converted (grid, neighbor masks, and component labels; 6 bytes per cell),
+    in memory-mapped files of folder (default_folder() if None) so that any number of processes attach them
+    by name with attach_map in a few milliseconds instead of each one reading the map file and computing its
+    own copy. The pages of a published map are shared by all the processes, so the memory used for the maps
+    does not grow with the number of workers.
+
+    The registry removes the maps it published when it is closed (it can be used in a with statement); maps
+    published by other registries with the same names are reused, not replaced, unless they are older than
+    their map file.
+    """
+    def __init__(self, folder=None):
+        self.folder = folder if folder is not None else default_folder()
+        # names of the maps published by this registry
+        self.published = set()
+
+    @staticmethod
+    def file_name(name):
+        """
+        Returns the name of the file of the map published as name
+        """
+        return "gridmap-" + re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+    def path(self, name):
+        return os.path.join(self.folder, MapRegistry.file_name(name))
+
+    def publish(self, map_file, name=None):
+        """
+        Publishes the map stored in map_file with the given name (the name of the file if None), unless it
+        is already published and up to date. Returns the name, to be passed to attach_map.
+        """
+        if name is None:
+            name = os.path.basename(map_file)
+        path = self.path(name)
+        map_path = os.path.abspath(map_file)
+        if _published_map_file(path) == map_path and os.path.getmtime(path) >= os.path.getmtime(map_file):
+            return name
+        graph = Map(map_file)
+        map_path = map_path.encode()
+        grid, masks, components, size = _layout(graph.width, graph.height, len(map_path))
+        data = bytearray(size)
+        _HEADER.pack_into(data, 0, _MAGIC, graph.width, graph.height, len(map_path))
+        data[_HEADER.size:grid] = map_path
+        data[grid:masks] = np.ascontiguousarray(graph.data_int, dtype=np.uint8).tobytes()
+        data[masks:masks + len(graph.neighbor_mask)] = graph.neighbor_mask
+        data[components:] = np.ascontiguousarray(graph.components, dtype=np.int32).tobytes()
+        # writing to a temporary file first so that other processes never attach a partial map
+        with open(path + ".%d.tmp" % os.getpid(), "wb") as published:
+            published.write(data)
+        os.replace(path + ".%d.tmp" % os.getpid(), path)
+        self.published.add(name)
+        return name
+
+    def attach(self, name):
+        return attach_map(name, self.folder)
+
+    def unpublish(self, name):
+        """
+        Removes a map published by this registry. The processes that attached it keep their views.
+        """
+        self.published.discard(name)
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        for name in list(self.published):
+            self.unpublish(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
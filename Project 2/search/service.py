@@ -0,0 +1,348 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from search.algorithms import A_star
+from search.algorithms import bi_A_stars
+from search.algorithms import State
+from search.engine import SearchEngine
+from search.fields import DistanceField
+from search.map import Map
+from search.registry import MapRegistry
+from search.registry import attach_map
+
+ALGORITHMS = ("A*", "Bi-A*", "Dijkstra")
+
+# maps (and SearchEngines for Dijkstra's) of the current worker process, by file name; attached once per worker
+_worker_folder = None
+_worker_registry_folder = None
+_worker_namespace = None
+_worker_maps = {}
+_worker_engines = {}
+
+def _init_worker(maps_folder, registry_folder, namespace, preload):
+    """
+    Initializer of the worker processes: the maps in preload are attached before the first request
+    """
+    global _worker_folder, _worker_registry_folder, _worker_namespace
+    _worker_folder = maps_folder
+    _worker_registry_folder = registry_folder
+    _worker_namespace = namespace
+    for map_name in preload:
+        _resident_map(map_name)
+
+def _resident_map(map_name):
+    """
+    Returns the map map_name of the current worker, attaching the copy published by the service the first
+    time (or loading the map file if it is not published)
+    """
+    graph = _worker_maps.get(map_name)
+    if graph is None:
+        try:
+            graph = attach_map(_worker_namespace + map_name, _worker_registry_folder)
+        except KeyError:
+            graph = Map(os.path.join(_worker_folder, map_name))
+        _worker_maps[map_name] = graph
+    return graph
+
+def solve_batch(map_name, algorithm, goal, starts, use_field):
+    """
+    Runs in the worker processes. Solves the queries from every (x, y) in starts to the (x, y) goal on the
+    map map_name with the given algorithm, or, if use_field is True, with a single DistanceField of the goal
+    (one search answers all the queries; the expanded count reported is then 0). Returns a list with one
+    (cost, nodes expanded, error message) triple per start; the error message is None unless the query is
+    invalid, e.g., a cell outside the map or an obstacle.
+    """
+    graph = _resident_map(map_name)
+    # State.map_width is shared by all maps; it must be the width of the map of this batch
+    State.map_width = graph.width
+    State.map_height = graph.height
+    if not graph.is_valid_pair(*goal):
+        return [(None, 0, "invalid goal %s" % list(goal))] * len(starts)
+    goal_state = State(*goal)
+    field = DistanceField(graph, goal_state) if use_field else None
+    results = []
+    for start in starts:
+        if not graph.is_valid_pair(*start):
+            results.append((None, 0, "invalid start %s" % list(start)))
+            continue
+        start_state = State(*start)
+        if field is not None:
+            results.append((field.cost(start_state), 0, None))
+        elif algorithm == "Dijkstra":
+            engine = _worker_engines.get(map_name)
+            if engine is None:
+                engine = _worker_engines[map_name] = SearchEngine(graph)
+            results.append(engine.dijkstra(start_state, State(*goal)) + (None,))
+        elif algorithm == "Bi-A*":
+            results.append(bi_A_stars(start_state, State(*goal), graph) + (None,))
+        else:
+            results.append(A_star(start_state, State(*goal), graph) + (None,))
+    return results
+
+class _Request:
+    __slots__ = ("id", "start", "deadline", "received", "future")
+
+    def __init__(self, request_id, start, deadline, received, future):
+        self.id = request_id
+        self.start = start
+        self.deadline = deadline
+        self.received = received
+        self.future = future
+
+class _StdoutWriter:
+    """
+    The part of the interface of asyncio.StreamWriter used by PathService, writing to the standard output
+    """
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+class PathService:
+    """
+    Long-running pathfinding service answering JSON queries, one per line, of the form
+
+        {"id": 7, "map": "brc000d.map", "algorithm": "A*", "start": [x, y], "goal": [x, y], "deadline": 0.5}
+
+    with one JSON line per query, in the order the answers are ready: {"id": 7, "cost": ..., "expanded": ...,
+    "batched": ..., "time": ...} or {"id": 7, "error": ...}. algorithm is one of ALGORITHMS (A* if omitted),
+    map is the name of a map file in maps_folder, and deadline (optional, default_deadline if omitted) is the
+    number of seconds after which the query is answered with an error instead of a cost. The line
+    {"stats": true} is answered with the counters of the service.
+
+    The queries are solved on a pool of worker processes. Every map is converted once, when it is first
+    queried (or when the service starts, for the maps in preload), and published with a MapRegistry; the
+    workers attach the published copy, so they share its memory and keep every map they have used without
+    loading it again. Queries are not sent to the workers one at a
+    time: the queries for the same map, algorithm, and goal that arrive within batch_window seconds are sent
+    together, and if there are at least field_batch of them they are answered with a single one-to-all
+    search from the goal (a DistanceField) instead of one search per query.
+
+    At most max_pending queries are in the service at a time; when this limit is reached the service stops
+    reading new queries until some are answered, so clients that send too fast are slowed down by the
+    transport (backpressure) instead of making every query wait longer.
+
+    Every query is answered, with an error if needed: a map file that cannot be loaded is reported to the
+    queries of that map, and if a worker process dies (e.g., killed for lack of memory) the queries of its
+    pool are answered with an error and the pool is replaced by a new one.
+    """
+    def __init__(self, maps_folder, workers=None, preload=(), max_pending=1024, batch_window=0.002,
+                 field_batch=8, default_deadline=None):
+        self.maps_folder = maps_folder
+        self.batch_window = batch_window
+        self.field_batch = field_batch
+        self.default_deadline = default_deadline
+        self.max_pending = max_pending
+        self.registry = MapRegistry()
+        # prefix of the names of the maps published by this service, so that services do not share maps
+        self.namespace = "service-%d-" % os.getpid()
+        for map_name in preload:
+            self._publish(map_name)
+        self.workers = workers
+        self.preload = tuple(preload)
+        self.executor = self._start_executor()
+        self._slots = None
+        # (map, algorithm, goal) -> requests waiting for the batch window to close
+        self._batches = {}
+        self.stats = {"received": 0, "answered": 0, "errors": 0, "expired": 0, "batches": 0, "field_batches": 0,
+                      "pending": 0, "restarts": 0}
+
+    def _start_executor(self):
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                   initargs=(self.maps_folder, self.registry.folder, self.namespace, self.preload))
+
+    def _replace_executor(self, broken):
+        """
+        Replaces the pool of workers broken by the death of one of its processes; the pools of the batches
+        that failed together are only replaced once
+        """
+        if self.executor is broken:
+            broken.shutdown(wait=False)
+            self.executor = self._start_executor()
+            self.stats["restarts"] += 1
+
+    def _publish(self, map_name):
+        name = self.namespace + map_name
+        if name not in self.registry.published:
+            self.registry.publish(os.path.join(self.maps_folder, map_name), name)
+
+    def _error(self, request_id, message):
+        self.stats["errors"] += 1
+        return {"id": request_id, "error": message}
+
+    async def handle(self, line):
+        """
+        Answers one query line; returns the answer as a dictionary
+        """
+        try:
+            query = json.loads(line)
+        except ValueError:
+            return self._error(None, "invalid JSON")
+        if not isinstance(query, dict):
+            return self._error(None, "a query must be a JSON object")
+        if query.get("stats"):
+            return dict(self.stats)
+        self.stats["received"] += 1
+        request_id = query.get("id")
+        try:
+            map_name = os.path.basename(str(query["map"]))
+            algorithm = query.get("algorithm", "A*")
+            start = (int(query["start"][0]), int(query["start"][1]))
+            goal = (int(query["goal"][0]), int(query["goal"][1]))
+            deadline = query.get("deadline", self.default_deadline)
+            deadline = float(deadline) if deadline is not None else None
+        except (KeyError, IndexError, TypeError, ValueError):
+            return self._error(request_id, "a query needs a map, a start [x, y], and a goal [x, y]")
+        if algorithm not in ALGORITHMS:
+            return self._error(request_id, "unknown algorithm %s" % algorithm)
+        if not os.path.exists(os.path.join(self.maps_folder, map_name)):
+            return self._error(request_id, "unknown map %s" % map_name)
+        try:
+            self._publish(map_name)
+        except Exception as error:
+            # a malformed map file can fail in many ways while it is parsed
+            return self._error(request_id, "cannot load map %s: %s" % (map_name, error))
+
+        loop = asyncio.get_running_loop()
+        received = loop.time()
+        request = _Request(request_id, start, received + deadline if deadline is not None else None, received,
+                           loop.create_future())
+        key = (map_name, algorithm, goal)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            loop.call_later(self.batch_window, self._flush, key)
+        batch.append(request)
+
+        if request.deadline is None:
+            answer = await request.future
+        else:
+            try:
+                answer = await asyncio.wait_for(asyncio.shield(request.future), max(0.0, request.deadline - loop.time()))
+            except asyncio.TimeoutError:
+                self.stats["expired"] += 1
+                return self._error(request_id, "deadline exceeded")
+        if "error" in answer:
+            self.stats["errors"] += 1
+        else:
+            self.stats["answered"] += 1
+        return answer
+
+    def _flush(self, key):
+        """
+        Sends the requests of a batch whose window closed to the workers, dropping the expired ones
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        requests = [request for request in self._batches.pop(key) if request.deadline is None or request.deadline > now]
+        if not requests:
+            return
+        map_name, algorithm, goal = key
+        use_field = len(requests) >= self.field_batch
+        self.stats["batches"] += 1
+        if use_field:
+            self.stats["field_batches"] += 1
+        starts = [request.start for request in requests]
+        executor = self.executor
+        try:
+            future = loop.run_in_executor(executor, solve_batch, map_name, algorithm, goal, starts, use_field)
+        except BrokenProcessPool:
+            # the pool broke after the last batch was answered
+            self._replace_executor(executor)
+            executor = self.executor
+            future = loop.run_in_executor(executor, solve_batch, map_name, algorithm, goal, starts, use_field)
+        future.add_done_callback(lambda done: self._answer(requests, done, use_field, executor))
+
+    def _answer(self, requests, done, use_field, executor):
+        now = asyncio.get_running_loop().time()
+        if done.exception() is not None:
+            if isinstance(done.exception(), BrokenProcessPool):
+                self._replace_executor(executor)
+            results = [(None, 0, "search failed: %s" % done.exception())] * len(requests)
+        else:
+            results = done.result()
+        for request, (cost, expanded, error) in zip(requests, results):
+            if request.future.done():
+                continue
+            if error is not None:
+                request.future.set_result({"id": request.id, "error": error})
+            else:
+                request.future.set_result({"id": request.id, "cost": cost, "expanded": expanded,
+                                           "batched": use_field, "time": now - request.received})
+
+    async def _serve(self, reader, writer):
+        """
+        Reads the queries of one client and writes their answers, keeping at most max_pending queries in the
+        service
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line):
+            try:
+                response = await self.handle(line)
+                async with lock:
+                    writer.write((json.dumps(response) + "\n").encode())
+                    await writer.drain()
+            finally:
+                self.stats["pending"] -= 1
+                self._slots.release()
+
+        while True:
+            await self._slots.acquire()
+            line = await reader.readline()
+            if not line:
+                self._slots.release()
+                break
+            if not line.strip():
+                self._slots.release()
+                continue
+            self.stats["pending"] += 1
+            task = asyncio.ensure_future(answer(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def serve_unix(self, socket_path):
+        """
+        Serves the clients that connect to the Unix socket socket_path until cancelled
+        """
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+        async def client(reader, writer):
+            try:
+                await self._serve(reader, writer)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(client, path=socket_path)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self):
+        """
+        Serves the queries read from the standard input, writing the answers to the standard output, until
+        the end of the input. The input is read by a thread (it can be a file, which asyncio cannot read
+        without blocking), so the number of queries in the service is bounded but the input is read ahead.
+        """
+        self._slots = asyncio.Semaphore(self.max_pending)
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+
+        def read_input():
+            for line in sys.stdin.buffer:
+                loop.call_soon_threadsafe(reader.feed_data, line)
+            loop.call_soon_threadsafe(reader.feed_eof)
+
+        threading.Thread(target=read_input, daemon=True).start()
+        await self._serve(reader, _StdoutWriter())
+
+    def close(self):
+        self.executor.shutdown()
+        self.registry.close()
@@ -0,0 +1,224 @@
+import os
+import random
+from collections import OrderedDict
+import numpy as np
+from search.algorithms import State
+from search.cache import load_sidecar, sidecar_path, stamp_sidecar
+from search.map import Map
+
+def read_header(file_name):
+    """
+    Returns the height and the width of the map stored in file_name (movingai.org format)
+    """
+    with open(file_name) as map_file:
+        map_file.readline()
+        height = int(map_file.readline().split(' ')[1])
+        width = int(map_file.readline().split(' ')[1])
+    return height, width
+
+def open_map(file_name, max_cells=16 * 1024 * 1024):
+    """
+    Returns a Map for the map stored in file_name, or a TiledMap if the map has more than max_cells cells
+    (a Map uses about 6 bytes per cell, plus the time to label its components)
+    """
+    height, width = read_header(file_name)
+    if height * width > max_cells:
+        return TiledMap(file_name)
+    return Map(file_name)
+
+def build_tiles(file_name, tile_size, tiles):
+    """
+    Converts the map stored in file_name into tiles, an array with one row of tile_size * tile_size / 8 bytes
+    per tile (tiles in row-major order), where every bit is 1 if the cell is traversable. The cells of a tile
+    are in row-major order, and the cells of the tiles on the border that are outside the map are not
+    traversable. The map file is read tile_size lines at a time, so the conversion never holds the whole map.
+    """
+    height, width = read_header(file_name)
+    tiles_x = -(-width // tile_size)
+    with open(file_name, "rb") as map_file:
+        line = map_file.readline()
+        while b'map' not in line:
+            line = map_file.readline()
+        for tile_y in range(-(-height // tile_size)):
+            rows = min(tile_size, height - tile_y * tile_size)
+            chars = np.frombuffer(b"".join(map_file.readline().rstrip(b"\r\n").ljust(width, b'@')[:width]
+                                           for _ in range(rows)), dtype=np.uint8).reshape(rows, width)
+            block = np.zeros((tile_size, tiles_x * tile_size), dtype=bool)
+            block[:rows, :width] = (chars == ord('.')) | (chars == ord('G'))
+            block = block.reshape(tile_size, tiles_x, tile_size).transpose(1, 0, 2).reshape(tiles_x, -1)
+            tiles[tile_y * tiles_x:(tile_y + 1) * tiles_x] = np.packbits(block, axis=1)
+
+class TiledMap:
+    """
+    Map for grids too large for Map: the cells are stored with 1 bit each, split into square tiles of
+    tile_size x tile_size cells that are memory-mapped from a cache next to the map file (see build_tiles),
+    so only the tiles that a search touches are read from disk. The neighbor masks (see
+    Map.compute_neighbor_masks) are computed for one tile at a time, when a search first reaches it, and
+    kept for the cached_tiles tiles used most recently.
+
+    A TiledMap can be passed to the algorithms that only use Map.width, Map.neighbors, and
+    Map.same_component (e.g., A*, Bi-A*, NBS, Fringe Search, IDA*). The components of the map are not
+    labelled, so same_component only checks that both cells are traversable and a problem without a solution
+    is only rejected after its search space is exhausted. The map cannot be changed.
+    """
+    def __init__(self, file_name, tile_size=256, cached_tiles=64):
+        if tile_size < 8 or tile_size & (tile_size - 1):
+            raise ValueError("the size of the tiles must be a power of 2 of at least 8")
+        self.file_name = file_name
+        self.height, self.width = read_header(file_name)
+        State.map_width = self.width
+        State.map_height = self.height
+
+        self.tile_size = tile_size
+        self.tile_shift = tile_size.bit_length() - 1
+        self.tiles_x = -(-self.width // tile_size)
+        self.tiles_y = -(-self.height // tile_size)
+        shape = (self.tiles_x * self.tiles_y, tile_size * tile_size // 8)
+        name = "tiles-%d" % tile_size
+        self.tiles = load_sidecar(file_name, name)
+        if self.tiles is None or self.tiles.shape != shape:
+            path = sidecar_path(file_name, name)
+            try:
+                # converting into a temporary file first so that other processes never load partial tiles
+                tiles = np.lib.format.open_memmap(path + ".tmp", mode='w+', dtype=np.uint8, shape=shape)
+                build_tiles(file_name, tile_size, tiles)
+                tiles.flush()
+                del tiles
+                os.replace(path + ".tmp", path)
+                stamp_sidecar(file_name, name)
+                self.tiles = load_sidecar(file_name, name)
+            except OSError:
+                # the tiles cannot be cached (e.g., read-only folders); they are kept in memory
+                self.tiles = np.zeros(shape, dtype=np.uint8)
+                build_tiles(file_name, tile_size, self.tiles)
+
+        self.moves = []
+        for i in range(-1, 2):
+            for j in range(-1, 2):
+                if i == 0 and j == 0:
+                    continue
+                self.moves.append((i, j, j * self.width + i, self.cost(i, j)))
+        self.move_table = []
+        for mask in range(256):
+            self.move_table.append(tuple((offset, cost) for bit, (_, _, offset, cost) in enumerate(self.moves) if mask & (1 << bit)))
+
+        self.cached_tiles = cached_tiles
+        # tile -> neighbor masks of its cells, least recently used first
+        self._masks = OrderedDict()
+        self._last_tile = None
+        self._last_masks = None
+        # number of times the neighbor masks of a tile were computed
+        self.tiles_decoded = 0
+        self.version = 0
+
+    def tile_passable(self, tile_x, tile_y):
+        """
+        Returns a (tile_size, tile_size) boolean array with the traversable cells of a tile; tiles outside the
+        map have no traversable cells
+        """
+        if not (0 <= tile_x < self.tiles_x and 0 <= tile_y < self.tiles_y):
+            return np.zeros((self.tile_size, self.tile_size), dtype=bool)
+        bits = np.unpackbits(self.tiles[tile_y * self.tiles_x + tile_x])
+        return bits.reshape(self.tile_size, self.tile_size).view(bool)
+
+    def compute_tile_masks(self, tile):
+        """
+        Returns the neighbor masks of the cells of a tile as bytes, indexed by the position of the cell in
+        the tile (row-major). The tiles around it are read for the cells on its border.
+        """
+        size = self.tile_size
+        tile_y, tile_x = divmod(tile, self.tiles_x)
+        # the tile with a border of one cell from the tiles around it
+        passable = np.zeros((size + 2, size + 2), dtype=bool)
+        source = {-1: slice(size - 1, size), 0: slice(0, size), 1: slice(0, 1)}
+        target = {-1: slice(0, 1), 0: slice(1, size + 1), 1: slice(size + 1, size + 2)}
+        for j in (-1, 0, 1):
+            for i in (-1, 0, 1):
+                if 0 <= tile_x + i < self.tiles_x and 0 <= tile_y + j < self.tiles_y:
+                    passable[target[j], target[i]] = self.tile_passable(tile_x + i, tile_y + j)[source[j], source[i]]
+        masks = np.zeros((size, size), dtype=np.uint8)
+        for bit, (i, j, _, _) in enumerate(self.moves):
+            masks |= passable[1 + j:1 + j + size, 1 + i:1 + i + size].astype(np.uint8) << bit
+        self.tiles_decoded += 1
+        return masks.tobytes()
+
+    def _tile_masks(self, tile):
+        masks = self._masks.get(tile)
+        if masks is None:
+            masks = self._masks[tile] = self.compute_tile_masks(tile)
+            if len(self._masks) > self.cached_tiles:
+                self._masks.popitem(last=False)
+        else:
+            self._masks.move_to_end(tile)
+        self._last_tile = tile
+        self._last_masks = masks
+        return masks
+
+    def is_valid_pair(self, x, y):
+        """
+        Verifies if an x-y pair is valid for a map.
+        """
+        if x < 0 or y < 0:
+            return False
+        if x >= self.width or y >= self.height:
+            return False
+        shift = self.tile_shift
+        low = self.tile_size - 1
+        bit = ((y & low) << shift) | (x & low)
+        return bool(self.tiles[(y >> shift) * self.tiles_x + (x >> shift), bit >> 3] >> (7 - (bit & 7)) & 1)
+
+    def same_component(self, a, b):
+        """
+        Returns True if states a and b are traversable; the components of a TiledMap are not labelled
+        """
+        return self.is_valid_pair(a.get_x(), a.get_y()) and self.is_valid_pair(b.get_x(), b.get_y())
+
+    def random_state(self):
+        """
+        Generates a valid random state for a given map.
+        """
+        x = random.randint(0, self.width - 1)
+        y = random.randint(0, self.height - 1)
+        while not self.is_valid_pair(x, y):
+            x = random.randint(0, self.width - 1)
+            y = random.randint(0, self.height - 1)
+        return State(x, y)
+
+    def cost(self, x, y):
+        """
+        Returns the cost of an action.
+
+        Diagonal moves cost 1.5; each action in the 4 cardinal directions costs 1.0
+        """
+        if x == 0 or y == 0:
+            return 1
+        else:
+            return 1.5
+
+    def neighbors(self, index):
+        """
+        Receives the state_hash of a traversable cell and yields a pair (state_hash, cost) for every
+        neighbor of the cell, where cost is the cost of the action that reaches the neighbor.
+        """
+        y, x = divmod(index, self.width)
+        shift = self.tile_shift
+        tile = (y >> shift) * self.tiles_x + (x >> shift)
+        masks = self._last_masks if tile == self._last_tile else self._tile_masks(tile)
+        low = self.tile_size - 1
+        for offset, cost in self.move_table[masks[((y & low) << shift) | (x & low)]]:
+            yield index + offset, cost
+
+    # the grid is undirected: the cells from which a cell is reached in one move are its neighbors (used by
+    # the backward searches, see search.roads.RoadGraph.predecessors)
+    predecessors = neighbors
+
+    def successors(self, state):
+        """
+        Transition function: receives a state and returns a list with the neighbors of that state in the space
+        """
+        children = []
+        for index, cost in self.neighbors(state.state_hash()):
+            s = State(index % self.width, index // self.width)
+            s.set_g(state.get_g() + cost)
+            children.append(s)
+        return children
@@ -0,0 +1,68 @@
+import asyncio
+import getopt
+import os
+from search.service import ALGORITHMS
+from search.service import PathService
+import sys
+
+def main():
+    """
+    Runs the pathfinding service of search.service, answering JSON queries (one per line) from the standard
+    input or from the clients of a Unix socket with the maps of a folder kept loaded. Run it with --help to
+    see the options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'maps=', 'socket=', 'workers=', 'preload=', 'max-pending=',
+                                                   'batch-window=', 'field-batch=', 'deadline='])
+
+    maps_folder = "dao-map"
+    socket_path = None
+    workers = None
+    preload = []
+    max_pending = 1024
+    batch_window = 0.002
+    field_batch = 8
+    deadline = None
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Answer the queries read from the standard input: serve.py < queries.jsonl")
+            print("Serve the clients of a Unix socket with 4 workers: serve.py --socket /tmp/paths.sock --workers 4")
+            print("Load maps when the workers start: serve.py --maps dao-map --preload brc000d.map,brc100d.map")
+            print("Batch the queries of the same goal for 5 ms and answer batches of 4 or more with one search: serve.py --batch-window 0.005 --field-batch 4")
+            print("Keep at most 256 queries in the service, each answered within 0.5 s: serve.py --max-pending 256 --deadline 0.5")
+            print('Query: {"id": 1, "map": "brc000d.map", "algorithm": "A*", "start": [10, 20], "goal": [200, 150], "deadline": 0.5}')
+            print('Counters of the service: {"stats": true}')
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--maps":
+            maps_folder = a
+        elif o == "--socket":
+            socket_path = a
+        elif o == "--workers":
+            workers = int(a)
+        elif o == "--preload":
+            preload = a.split(",")
+        elif o == "--max-pending":
+            max_pending = int(a)
+        elif o == "--batch-window":
+            batch_window = float(a)
+        elif o == "--field-batch":
+            field_batch = int(a)
+        elif o == "--deadline":
+            deadline = float(a)
+
+    service = PathService(maps_folder, workers, preload, max_pending, batch_window, field_batch, deadline)
+    try:
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            asyncio.run(service.serve_unix(socket_path))
+        else:
+            asyncio.run(service.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
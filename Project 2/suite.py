@@ -0,0 +1,79 @@
+import getopt
+from search.algorithms import A_star
+from search.algorithms import bi_A_stars
+from search.algorithms import Middle_Meet
+from search.algorithms import NBS
+from search.scenarios import compare
+from search.scenarios import load_baseline
+from search.scenarios import run_suite
+from search.scenarios import save_baseline
+import sys
+
+ALGORITHMS = {"A*": A_star, "Bi-A*": bi_A_stars, "MM": Middle_Meet, "NBS": NBS}
+
+def main():
+    """
+    Runs the algorithms over whole movingai.com scenario sets (.scen files) and reports, for every algorithm
+    and bucket, the nodes expanded, the expansions per second, and the percentiles of the wall time. The
+    results can be saved as a JSON baseline and compared with a previous one. Run it with --help to see the
+    options available.
+    """
+    optlist, args = getopt.getopt(sys.argv[1:], 'h', ['help', 'maps=', 'algorithms=', 'limit=', 'memory', 'save=', 'compare=', 'tolerance='])
+
+    maps_folder = None
+    algorithms = ALGORITHMS
+    limit = None
+    trace_memory = False
+    save_file = None
+    compare_file = None
+    tolerance = 0.1
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Solve the scenarios of two files with all algorithms: suite.py scenarios/brc000d.map.scen scenarios/brc100d.map.scen")
+            print("Load the maps from another folder (default: the folder of each .scen file): suite.py --maps dao-map scenarios/brc000d.map.scen")
+            print("Only A* and MM, and the first 100 problems of every file: suite.py --algorithms A*,MM --limit 100 scenarios/brc000d.map.scen")
+            print("Also record the peak memory allocated by the searches (slower): suite.py --memory scenarios/brc000d.map.scen")
+            print("Save a baseline: suite.py --save baseline.json scenarios/brc000d.map.scen")
+            print("Compare with a baseline, reporting values more than 20% above it: suite.py --compare baseline.json --tolerance 0.2 scenarios/brc000d.map.scen")
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--maps":
+            maps_folder = a
+        elif o == "--algorithms":
+            algorithms = {name: ALGORITHMS[name] for name in a.split(",")}
+        elif o == "--limit":
+            limit = int(a)
+        elif o == "--memory":
+            trace_memory = True
+        elif o == "--save":
+            save_file = a
+        elif o == "--compare":
+            compare_file = a
+        elif o == "--tolerance":
+            tolerance = float(a)
+
+    results = run_suite(args, algorithms, maps_folder, limit, trace_memory)
+    print("%-8s %6s %8s %10s %10s %12s %10s %10s %10s %10s" % ("algorithm", "bucket", "problems", "expanded", "time (s)",
+                                                             "expanded/s", "p50 (ms)", "p90 (ms)", "p99 (ms)", "peak (KB)"))
+    for algorithm, buckets in results["algorithms"].items():
+        for bucket, stats in buckets.items():
+            print("%-8s %6s %8d %10d %10.2f %12.0f %10.2f %10.2f %10.2f %10s" % (algorithm, bucket, stats["problems"], stats["expanded"],
+                  stats["time"], stats["expansions_per_second"], 1000 * stats["p50"], 1000 * stats["p90"], 1000 * stats["p99"],
+                  stats["peak_kb"] if trace_memory else "-"))
+    print("%d problems, %d with different costs among the algorithms, peak RSS %d KB" % (results["problems"], results["disagreements"], results["peak_rss_kb"]))
+
+    if save_file is not None:
+        save_baseline(results, save_file)
+    if compare_file is not None:
+        regressions = 0
+        for algorithm, bucket, metric, old, new, regression in compare(results, load_baseline(compare_file), tolerance):
+            if regression:
+                regressions += 1
+                print("Regression: %s bucket %s %s %.4g -> %.4g (%+.1f%%)" % (algorithm, bucket, metric, old, new, 100 * (new / old - 1) if old else float('inf')))
+        print("%d regressions with respect to %s" % (regressions, compare_file))
+        if regressions:
+            exit(1)
+
+if __name__ == "__main__":
+    main()
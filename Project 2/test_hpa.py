@@ -0,0 +1,68 @@
+import random
+from search.algorithms import State
+from search.hpa import HPA
+from search.map import Map
+
+def write_random_map(file_name, width, height, blocked, seed):
+    random_generator = random.Random(seed)
+    with open(file_name, "w") as map_file:
+        map_file.write("type octile\nheight %d\nwidth %d\nmap\n" % (height, width))
+        for _ in range(height):
+            map_file.write("".join("T" if random_generator.random() < blocked else "." for _ in range(width)) + "\n")
+
+def abstraction(hpa):
+    # the edges of removed abstract nodes can leave empty dictionaries behind
+    return hpa.borders, hpa.nodes, {node: edges for node, edges in hpa.edges.items() if edges}
+
+def test_rebuild_matches_fresh_build(tmp_path):
+    """
+    Toggles random cells (one or a few at a time, often next to the corners of the clusters, whose diagonal
+    entrances depend on the cells of the clusters around them) and checks that rebuild leaves the same
+    abstraction as building it again, and that both answer the same queries.
+    """
+    map_file = str(tmp_path / "random.map")
+    write_random_map(map_file, 45, 37, 0.3, 1)
+    graph = Map(map_file)
+    hpa = HPA(graph, cluster_size=8)
+    random_generator = random.Random(2)
+    for _ in range(40):
+        cells = []
+        for _ in range(random_generator.choice((1, 1, 3))):
+            if random_generator.random() < 0.5:
+                x = random_generator.choice((7, 8, 15, 16, 23, 24, 31, 32, 39, 40)) + random_generator.randint(-1, 1)
+                y = random_generator.choice((7, 8, 15, 16, 23, 24, 31, 32)) + random_generator.randint(-1, 1)
+            else:
+                x = random_generator.randrange(graph.width)
+                y = random_generator.randrange(graph.height)
+            graph.toggle(x, y)
+            cells.append((x, y))
+        hpa.rebuild(cells)
+        fresh = HPA(graph, cluster_size=8)
+        assert abstraction(hpa) == abstraction(fresh)
+
+        for _ in range(5):
+            start = graph.random_state()
+            goal = graph.random_state()
+            assert hpa.search(start, goal) == fresh.search(start, goal)
+
+def test_rebuild_keeps_paths_complete(tmp_path):
+    """
+    After every rebuild, HPA finds a path whenever the start and the goal are in the same component.
+    """
+    map_file = str(tmp_path / "random.map")
+    write_random_map(map_file, 32, 32, 0.35, 3)
+    graph = Map(map_file)
+    hpa = HPA(graph, cluster_size=4)
+    random_generator = random.Random(4)
+    for _ in range(40):
+        x = random_generator.randrange(graph.width)
+        y = random_generator.randrange(graph.height)
+        graph.toggle(x, y)
+        hpa.rebuild([(x, y)])
+        for _ in range(10):
+            start = graph.random_state()
+            goal = graph.random_state()
+            cost, _ = hpa.search(start, goal)
+            assert (cost != -1) == graph.same_component(start, goal)
+            if cost != -1:
+                assert hpa.find_path(State(start.get_x(), start.get_y()), State(goal.get_x(), goal.get_y()))[1] is not None
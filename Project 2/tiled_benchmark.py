@@ -0,0 +1,150 @@
+import getopt
+import os
+import random
+import resource
+import time
+import numpy as np
+from search.algorithms import A_star
+from search.algorithms import State
+from search.algorithms import bi_A_stars
+from search.map import Map
+from search.tiled import TiledMap
+import sys
+
+ALGORITHMS = {"A*": A_star, "Bi-A*": bi_A_stars}
+
+def write_synthetic_map(file_name, size, seed, block=16):
+    """
+    Writes a size x size map in the movingai.org format, block lines at a time. Every block x block square
+    of the map has a rectangular obstacle of random size that leaves at least 2 cells free on each side, so
+    every traversable cell is reachable from every other one.
+    """
+    random_generator = np.random.default_rng(seed)
+    blocks = -(-size // block)
+    with open(file_name, "w") as map_file:
+        map_file.write("type octile\nheight %d\nwidth %d\nmap\n" % (size, size))
+        for block_y in range(blocks):
+            x0, y0 = random_generator.integers(2, block // 2, (2, blocks))
+            x1 = x0 + random_generator.integers(0, block - 2 - x0)
+            y1 = y0 + random_generator.integers(0, block - 2 - y0)
+            rows = min(block, size - block_y * block)
+            row = np.arange(rows)[:, None]
+            column = np.arange(blocks * block)[None, :] % block
+            obstacle = (row >= np.repeat(y0, block)) & (row < np.repeat(y1, block)) & \
+                       (column >= np.repeat(x0, block)) & (column < np.repeat(x1, block))
+            chars = np.where(obstacle[:, :size], ord('T'), ord('.')).astype(np.uint8)
+            chars = np.concatenate([chars, np.full((rows, 1), ord('\n'), dtype=np.uint8)], axis=1)
+            map_file.write(chars.tobytes().decode())
+
+def main():
+    """
+    Runs searches on a synthetic map of size x size cells (100M cells by default) stored in a TiledMap,
+    reporting the time to convert the map into tiles, the size of the tiles, the time to open the map, and,
+    for every algorithm, the time of the searches, the nodes expanded, the number of tiles decoded, and the
+    peak resident memory of the process. With --dense the same searches are also run on a Map, to compare
+    the costs and the memory (only feasible for smaller maps). Run it with --help to see the options
+    available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'size=', 'tile=', 'cached=', 'queries=', 'distance=',
+                                                   'algorithms=', 'folder=', 'seed=', 'dense', 'keep'])
+
+    size = 10000
+    tile_size = 256
+    cached_tiles = 64
+    queries = 5
+    distance = 1000
+    algorithms = ["A*"]
+    folder = "."
+    seed = 0
+    dense = False
+    keep = False
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Run 5 searches of length about 1000 on a 10000 x 10000 map: tiled_benchmark.py")
+            print("Choose the size of the map, the number and length of the searches: tiled_benchmark.py --size 20000 --queries 10 --distance 3000")
+            print("Choose the size of the tiles and the number of tiles kept decoded: tiled_benchmark.py --tile 128 --cached 256")
+            print("Compare with a Map on a smaller map: tiled_benchmark.py --size 2000 --dense")
+            print("Write the map (and keep it) in another folder: tiled_benchmark.py --folder /tmp --keep")
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--size":
+            size = int(a)
+        elif o == "--tile":
+            tile_size = int(a)
+        elif o == "--cached":
+            cached_tiles = int(a)
+        elif o == "--queries":
+            queries = int(a)
+        elif o == "--distance":
+            distance = int(a)
+        elif o == "--algorithms":
+            algorithms = a.split(",")
+        elif o == "--folder":
+            folder = a
+        elif o == "--seed":
+            seed = int(a)
+        elif o == "--dense":
+            dense = True
+        elif o == "--keep":
+            keep = True
+
+    map_file = os.path.join(folder, "synthetic-%d-%d.map" % (size, seed))
+    tiles_file = map_file + ".tiles-%d.npy" % tile_size
+    if not os.path.exists(map_file):
+        begin = time.perf_counter()
+        write_synthetic_map(map_file, size, seed)
+        print("map of %d x %d cells written in %.1f s (%.0f MB)" % (size, size, time.perf_counter() - begin,
+                                                                    os.path.getsize(map_file) / 2 ** 20))
+    converted = os.path.exists(tiles_file)
+    begin = time.perf_counter()
+    graph = TiledMap(map_file, tile_size, cached_tiles)
+    print("%s in %.2f s (%.1f MB of tiles), peak RSS %.0f MB" % ("tiles opened" if converted else "map converted into tiles",
+                                                                 time.perf_counter() - begin, os.path.getsize(tiles_file) / 2 ** 20,
+                                                                 resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+    random_generator = random.Random(seed)
+    problems = []
+    while len(problems) < queries:
+        x = random_generator.randrange(size)
+        y = random_generator.randrange(size)
+        x_goal = min(size - 1, max(0, x + random_generator.randint(-distance, distance)))
+        y_goal = min(size - 1, max(0, y + random_generator.randint(-distance, distance)))
+        if graph.is_valid_pair(x, y) and graph.is_valid_pair(x_goal, y_goal):
+            problems.append((x, y, x_goal, y_goal))
+
+    costs = {}
+    print("%-8s %-8s %10s %12s %10s %14s" % ("map", "algorithm", "time (s)", "expanded", "tiles", "peak RSS (MB)"))
+    # the Map is loaded after the searches on the TiledMap, so that it does not count in their peak memory
+    for kind in ["tiled", "dense"] if dense else ["tiled"]:
+        searched = graph
+        if kind == "dense":
+            begin = time.perf_counter()
+            searched = Map(map_file)
+            print("Map loaded in %.2f s" % (time.perf_counter() - begin))
+        for algorithm in algorithms:
+            total_time = 0
+            total_expanded = 0
+            decoded = getattr(searched, "tiles_decoded", 0)
+            for problem, (x, y, x_goal, y_goal) in enumerate(problems):
+                State.map_width = searched.width
+                begin = time.perf_counter()
+                cost, expanded = ALGORITHMS[algorithm](State(x, y), State(x_goal, y_goal), searched)
+                total_time += time.perf_counter() - begin
+                total_expanded += expanded
+                costs.setdefault((problem, algorithm), set()).add(cost)
+            print("%-8s %-8s %10.2f %12d %10s %14.0f" % (kind, algorithm, total_time, total_expanded,
+                                                         getattr(searched, "tiles_decoded", 0) - decoded if kind == "tiled" else "-",
+                                                         resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+    different = sum(1 for found in costs.values() if len(found) > 1)
+    if different:
+        print("%d problems with different costs" % different)
+
+    if not keep:
+        # the map and its caches (the tiles, and the grid and components of the Map)
+        for file_name in os.listdir(folder or "."):
+            if file_name.startswith(os.path.basename(map_file)):
+                os.remove(os.path.join(folder, file_name))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from search.algorithms import State
+import getopt
+import random
+from search.algorithms import A_star
+from search.algorithms import ARA_star
+from search.algorithms import bi_A_stars
+from search.algorithms import fringe_search
+from search.algorithms import IDA_star
+from search.algorithms import Middle_Meet
+from search.algorithms import NBS
+from search.jps import jps
+from search.jps import jps_plus
+from search.map import Map
+from search.trace import BACKWARD
+from search.trace import FORWARD
+from search.trace import TraceRecorder
+from search.trace import direction_counts
+from search.trace import expansion_map
+from search.trace import hot_spots
+import sys
+
+ALGORITHMS = {"A*": A_star, "Bi-A*": bi_A_stars, "MM": Middle_Meet, "NBS": NBS, "ARA*": ARA_star, "Fringe": fringe_search,
+              "IDA*": IDA_star, "JPS": jps, "JPS+": jps_plus}
+
+def main():
+    """
+    Records the events of the searches of one problem (see search.trace) and reports the cells expanded the
+    most times and the number of events per direction of every algorithm. Run it with --help to see the
+    options available.
+    """
+    optlist, _ = getopt.getopt(sys.argv[1:], 'h', ['help', 'map=', 'algorithms=', 'start=', 'goal=', 'seed=', 'top=', 'save=', 'plot='])
+
+    map_file = "dao-map/brc000d.map"
+    algorithms = ["A*", "Bi-A*", "MM"]
+    start = None
+    goal = None
+    seed = 0
+    top = 10
+    save_prefix = None
+    plot_prefix = None
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print("Examples of Usage:")
+            print("Trace A*, Bi-A*, and MM on a random problem: trace_search.py")
+            print("Trace a given problem on another map: trace_search.py --map dao-map/brc000d.map --start 10,20 --goal 200,150")
+            print("Choose the algorithms and show the 20 cells expanded the most times: trace_search.py --algorithms A*,Fringe --top 20")
+            print("Save the traces as trace-<algorithm>.npy: trace_search.py --save trace")
+            print("Plot the number of expansions of every cell as trace-<algorithm>.png: trace_search.py --plot trace")
+            print("Algorithms available: " + ", ".join(ALGORITHMS))
+            exit()
+        elif o == "--map":
+            map_file = a
+        elif o == "--algorithms":
+            algorithms = a.split(",")
+        elif o == "--start":
+            start = [int(value) for value in a.split(",")]
+        elif o == "--goal":
+            goal = [int(value) for value in a.split(",")]
+        elif o == "--seed":
+            seed = int(a)
+        elif o == "--top":
+            top = int(a)
+        elif o == "--save":
+            save_prefix = a
+        elif o == "--plot":
+            plot_prefix = a
+
+    gridded_map = Map(map_file)
+    random.seed(seed)
+    start_state = State(*start) if start is not None else gridded_map.random_state()
+    goal_state = State(*goal) if goal is not None else gridded_map.random_state()
+    while goal is None and not gridded_map.same_component(start_state, goal_state):
+        goal_state = gridded_map.random_state()
+    print("Start state: %s, goal state: %s" % (start_state, goal_state))
+
+    for name in algorithms:
+        recorder = TraceRecorder()
+        cost, expanded = ALGORITHMS[name](State(start_state.get_x(), start_state.get_y()),
+                                          State(goal_state.get_x(), goal_state.get_y()), gridded_map, observer=recorder)
+        trace = recorder.to_array()
+        print()
+        print("%s: cost %s, %d nodes expanded, %d events (%d KB)" % (name, cost, expanded, len(trace), trace.nbytes // 1024))
+        for direction, counts in direction_counts(trace).items():
+            if counts["expand"] or counts["generate"]:
+                print("  %-8s %s" % (direction, ", ".join("%s %d" % item for item in counts.items() if item[1])))
+        for direction, label in ((FORWARD, "forward"), (BACKWARD, "backward")):
+            spots = hot_spots(trace, gridded_map.width, top, direction)
+            if spots:
+                print("  cells expanded more than once (%s): %s" % (label, ", ".join("%s x%d" % spot for spot in spots)))
+        file_name = name.replace("*", "_star").replace("+", "_plus").lower()
+        if save_prefix is not None:
+            recorder.save(save_prefix + "-" + file_name + ".npy")
+        if plot_prefix is not None:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            plt.figure()
+            plt.imshow(expansion_map(trace, gridded_map.width, gridded_map.height), cmap="hot", interpolation="nearest")
+            plt.colorbar()
+            plt.title(name)
+            plt.savefig(plot_prefix + "-" + file_name + ".png")
+            plt.close()
+
+if __name__ == "__main__":
+    main()